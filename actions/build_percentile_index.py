@@ -0,0 +1,104 @@
+"""
+Builds the per-course percentile index of the Individual IRA in the
+'ira_percentis' table, next to the 'ira' table.
+
+The input is a CSV with an 'ira_individual' column, such as the output of
+main.py in batch mode, and a 'curso' column or the --curso option. Only those
+two columns are read, so the files carry no student data beyond the IRA.
+
+Usage:
+    python actions/build_percentile_index.py resultados.csv --curso "ENGENHARIA DE COMPUTAÇÃO"
+    python actions/build_percentile_index.py novos.csv --curso "ENGENHARIA DE COMPUTAÇÃO" --incremental
+"""
+
+import argparse
+import csv
+import logging
+import sys
+from pathlib import Path
+
+from utils import get_connection
+
+# The sketches live in src/, which is not on the path of scripts run from actions/
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.percentiles import PercentileIndex
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+CREATE_TABLE = """
+    CREATE TABLE IF NOT EXISTS ira_percentis (
+        curso TEXT PRIMARY KEY,
+        pontos DOUBLE PRECISION[] NOT NULL,
+        pesos DOUBLE PRECISION[] NOT NULL,
+        estudantes INTEGER NOT NULL
+    );
+"""
+
+UPSERT = """
+    INSERT INTO ira_percentis (curso, pontos, pesos, estudantes)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (curso) DO UPDATE
+    SET pontos = EXCLUDED.pontos, pesos = EXCLUDED.pesos, estudantes = EXCLUDED.estudantes;
+"""
+
+
+def read_values(paths, course=None):
+    """Returns the Individual IRA values of the CSV files, grouped by course."""
+    values = {}
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                if row.get("error") or not row.get("ira_individual"):
+                    continue
+                name = (course or row.get("curso") or "").strip().upper()
+                if not name:
+                    raise ValueError(f"Linha sem curso em '{path}'; use --curso.")
+                values.setdefault(name, []).append(float(row["ira_individual"]))
+    return values
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("arquivos", nargs="+", help="CSVs com os valores de IRA-I.")
+    parser.add_argument("--curso", help="Curso de todos os valores dos arquivos.")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Soma os valores aos índices já salvos, em vez de substituí-los.",
+    )
+    args = parser.parse_args()
+
+    values = read_values(args.arquivos, args.curso)
+    if not values:
+        logging.info("Nenhum valor de IRA-I encontrado.")
+        sys.exit()
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(CREATE_TABLE)
+            index = PercentileIndex()
+            if args.incremental:
+                cur.execute(
+                    "SELECT curso, pontos, pesos FROM ira_percentis WHERE curso = ANY(%s)",
+                    (list(values),),
+                )
+                index = PercentileIndex.from_rows(cur.fetchall())
+
+            for course, course_values in values.items():
+                index.update(course, course_values)
+            cur.executemany(UPSERT, index.to_rows())
+
+            conn.commit()
+            for course, points, _, students in index.to_rows():
+                logging.info(
+                    f"Índice de '{course}' atualizado: {students} históricos em {len(points)} pontos."
+                )
+    except Exception as e:
+        logging.error(e)
+        conn.rollback()
+    finally:
+        conn.close()
@@ -0,0 +1,48 @@
+"""
+Exports the 'ira' table to the local course snapshot that the app reads at
+startup (src/course_snapshot.py). Run before `docker build` to bake the
+snapshot into the image, so that the first page never waits on the database.
+
+Usage:
+    python actions/export_courses_snapshot.py [caminho]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from utils import get_connection
+
+# The snapshot format lives in src/, which is not on the path of scripts run from actions/
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.course_snapshot import COURSES_SNAPSHOT_PATH, write_course_snapshot
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "caminho",
+        nargs="?",
+        type=Path,
+        default=COURSES_SNAPSHOT_PATH,
+        help=f"Arquivo do snapshot (padrão: {COURSES_SNAPSHOT_PATH}).",
+    )
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT curso, media, desvio FROM ira ORDER BY curso;")
+            courses = cur.fetchall()
+        write_course_snapshot(courses, args.caminho)
+        logging.info(f"Snapshot com {len(courses)} cursos salvo em '{args.caminho}'.")
+    except Exception as e:
+        logging.error(e)
+        sys.exit(1)
+    finally:
+        conn.close()
@@ -0,0 +1,143 @@
+"""
+Moves the proofs of the 'forms' table from the Base64 text column
+'print_base64' to the binary column 'comprovante', recompressed to the size
+budget of src/proofs.py, with their type, SHA-256 and size.
+
+The columns are created if needed, and the rows are converted in batches,
+each committed on its own, so the script can be interrupted and run again.
+It must run before the version of the app that writes 'comprovante' is
+deployed.
+
+Usage:
+    python actions/migrate_proofs.py [--lote 50]
+"""
+
+import argparse
+import base64
+import binascii
+import hashlib
+import logging
+import sys
+from pathlib import Path
+
+import psycopg2
+
+from utils import get_connection
+
+# The proofs are prepared in src/, which is not on the path of scripts run from actions/
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src.proofs import prepare_proof
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+# The images are already compressed, so STORAGE EXTERNAL keeps Postgres from
+# trying to compress them again
+ADD_COLUMNS = """
+    ALTER TABLE forms
+        ADD COLUMN IF NOT EXISTS comprovante BYTEA,
+        ADD COLUMN IF NOT EXISTS comprovante_tipo TEXT,
+        ADD COLUMN IF NOT EXISTS comprovante_sha256 TEXT,
+        ADD COLUMN IF NOT EXISTS comprovante_bytes INTEGER,
+        ALTER COLUMN comprovante SET STORAGE EXTERNAL,
+        ALTER COLUMN print_base64 DROP NOT NULL;
+"""
+
+# Paged by id, so that rows left in Base64 are not selected again
+SELECT_BATCH = """
+    SELECT id, print_base64 FROM forms
+    WHERE comprovante IS NULL AND print_base64 IS NOT NULL {after}
+    ORDER BY id
+    LIMIT %s;
+"""
+
+UPDATE_PROOF = """
+    UPDATE forms
+    SET comprovante = %s, comprovante_tipo = %s, comprovante_sha256 = %s,
+        comprovante_bytes = %s, print_base64 = NULL
+    WHERE id = %s;
+"""
+
+
+def migrate_batch(cur, batch_size: int, after=None):
+    """
+    Converts up to batch_size rows with an id greater than after. Returns the
+    number of rows read, the last id, the number of rows converted and their
+    sizes before and after.
+    """
+    if after is None:
+        cur.execute(SELECT_BATCH.format(after=""), (batch_size,))
+    else:
+        cur.execute(SELECT_BATCH.format(after="AND id > %s"), (after, batch_size))
+    rows = cur.fetchall()
+    converted = text_bytes = binary_bytes = 0
+    for form_id, base64_data in rows:
+        try:
+            image_bytes = base64.b64decode(base64_data)
+        except binascii.Error:
+            logging.warning(
+                f"Comprovante '{str(form_id)[:6]}...' não está em Base64; ele foi mantido."
+            )
+            continue
+        try:
+            proof = prepare_proof(image_bytes)
+            data, content_type, sha256 = proof.data, proof.content_type, proof.sha256
+        except ValueError:
+            # Kept as it was, with the type the Drive sync always assumed
+            logging.warning(
+                f"Comprovante '{str(form_id)[:6]}...' não é uma imagem válida; "
+                "ele foi copiado sem alterações."
+            )
+            data, content_type = image_bytes, "image/png"
+            sha256 = hashlib.sha256(data).hexdigest()
+        cur.execute(
+            UPDATE_PROOF,
+            (psycopg2.Binary(data), content_type, sha256, len(data), form_id),
+        )
+        converted += 1
+        text_bytes += len(base64_data)
+        binary_bytes += len(data)
+    last_id = rows[-1][0] if rows else after
+    return len(rows), last_id, converted, text_bytes, binary_bytes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--lote", type=int, default=50, help="Formulários convertidos por transação."
+    )
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(ADD_COLUMNS)
+            conn.commit()
+            logging.info("Colunas do comprovante binário criadas.")
+
+            total = text_total = binary_total = 0
+            last_id = None
+            while True:
+                count, last_id, converted, text_bytes, binary_bytes = migrate_batch(
+                    cur, args.lote, last_id
+                )
+                conn.commit()
+                if not count:
+                    break
+                total += converted
+                text_total += text_bytes
+                binary_total += binary_bytes
+                logging.info(f"{total} comprovantes convertidos até agora.")
+
+        logging.info(
+            f"Migração concluída: {total} comprovantes, de {text_total / 1e6:.1f} MB "
+            f"em Base64 para {binary_total / 1e6:.1f} MB em binário. "
+            "Rode 'VACUUM FULL forms' para devolver o espaço ao disco."
+        )
+    except Exception as e:
+        logging.error(e)
+        conn.rollback()
+    finally:
+        conn.close()
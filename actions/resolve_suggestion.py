@@ -17,12 +17,12 @@ if __name__ == "__main__":
     try:
         with conn.cursor() as cur:
             cur.execute(
-                "SELECT nome_curso, media, desvio, print_base64 FROM forms WHERE id = %s AND resolvido = false",
+                "SELECT nome_curso, media, desvio FROM forms WHERE id = %s AND resolvido = false",
                 (form_id,),
             )
             form = cur.fetchone()
             if form:
-                nome_curso, media, desvio, print_base64 = form
+                nome_curso, media, desvio = form
 
                 cur.execute(
                     "UPDATE forms SET resolvido = true WHERE id = %s", (form_id,)
@@ -32,6 +32,8 @@ if __name__ == "__main__":
                     "INSERT INTO ira (curso, media, desvio) VALUES (%s, %s, %s)",
                     (nome_curso, media, desvio),
                 )
+                # Delivered on commit; the app's course catalog (src/course_catalog.py) listens to it
+                cur.execute("NOTIFY ira_atualizada")
 
                 conn.commit()
                 logging.info(f"Sugestão do curso '{nome_curso}' resolvida com sucesso.")
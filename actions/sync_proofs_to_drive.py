@@ -1,9 +1,11 @@
 import os
 import base64
+import binascii
 import logging
 import psycopg2
 import io
 import json
+from typing import Optional
 from dotenv import load_dotenv
 
 from google.oauth2.credentials import Credentials
@@ -75,32 +77,64 @@ def list_existing_file_ids(service: Resource, folder_id: str) -> set:
         return existing_ids
 
 
-def get_unresolved_forms(conn: psycopg2.extensions.connection) -> list:
-    """Searches the 'forms' table for rows that have not been resolved yet."""
-    forms_to_process = []
+def get_unresolved_form_ids(conn: psycopg2.extensions.connection) -> list:
+    """Searches the 'forms' table for the ids of the rows that have not been resolved yet."""
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT id, print_base64 FROM forms WHERE resolvido = false;")
-            forms_to_process = cur.fetchall()
+            cur.execute("SELECT id FROM forms WHERE resolvido = false;")
+            form_ids = [row[0] for row in cur.fetchall()]
         logging.info(
-            f"Encontrados {len(forms_to_process)} formulários não resolvidos na base de dados."
+            f"Encontrados {len(form_ids)} formulários não resolvidos na base de dados."
         )
-        return forms_to_process
+        return form_ids
     except psycopg2.Error as e:
         logging.error(f"Erro ao buscar formulários no banco de dados.")
         return []
 
 
+def get_proof(conn: psycopg2.extensions.connection, form_id) -> Optional[tuple]:
+    """
+    Fetches the proof image of a form as (bytes, MIME type). Rows saved before
+    the 'comprovante' column existed and not migrated yet are decoded from Base64.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT comprovante, comprovante_tipo, print_base64 FROM forms WHERE id = %s;",
+                (form_id,),
+            )
+            row = cur.fetchone()
+    except psycopg2.Error as e:
+        logging.error(f"Erro ao buscar o comprovante '{str(form_id)[:6]}...'.")
+        return None
+
+    if row is None:
+        return None
+    proof, content_type, base64_data = row
+    if proof is not None:
+        return bytes(proof), content_type
+    if base64_data:
+        try:
+            return base64.b64decode(base64_data), "image/png"
+        except binascii.Error:
+            logging.error(f"Comprovante '{str(form_id)[:6]}...' não está em Base64.")
+    return None
+
+
 def upload_image_to_drive(
-    service: Resource, folder_id: str, form_id: str, base64_data: str
+    service: Resource,
+    folder_id: str,
+    form_id: str,
+    image_bytes: bytes,
+    content_type: str,
 ) -> bool:
-    """Uploads a decoded image to Google Drive."""
+    """Uploads an image to Google Drive."""
     try:
-        image_bytes = base64.b64decode(base64_data)
-        file_metadata = {"name": f"{form_id}.png", "parents": [folder_id]}
+        extension = ".jpg" if content_type == "image/jpeg" else ".png"
+        file_metadata = {"name": f"{form_id}{extension}", "parents": [folder_id]}
 
         fh = io.BytesIO(image_bytes)
-        media = MediaIoBaseUpload(fh, mimetype="image/png", resumable=True)
+        media = MediaIoBaseUpload(fh, mimetype=content_type, resumable=True)
 
         service.files().create(
             body=file_metadata, media_body=media, fields="id"
@@ -131,10 +165,13 @@ def main():
         gdrive_service = get_gdrive_service()
 
         existing_drive_ids = list_existing_file_ids(gdrive_service, gdrive_folder_id)
-        pending_forms = get_unresolved_forms(db_conn)
+        pending_form_ids = get_unresolved_form_ids(db_conn)
 
+        # Only the proofs missing from the Drive are fetched from the database
         new_forms_to_upload = [
-            form for form in pending_forms if str(form[0]) not in existing_drive_ids
+            form_id
+            for form_id in pending_form_ids
+            if str(form_id) not in existing_drive_ids
         ]
 
         if not new_forms_to_upload:
@@ -148,13 +185,16 @@ def main():
         )
 
         success_count = 0
-        for form in new_forms_to_upload:
-            form_id_uuid = form[0]
+        for form_id_uuid in new_forms_to_upload:
             form_id_str = str(form_id_uuid)
-            base64_image = form[1]
+            proof = get_proof(db_conn, form_id_uuid)
+            if proof is None:
+                logging.error(f"Comprovante '{form_id_str[:6]}...' não encontrado.")
+                continue
+            image_bytes, content_type = proof
 
             if upload_image_to_drive(
-                gdrive_service, gdrive_folder_id, form_id_str, base64_image
+                gdrive_service, gdrive_folder_id, form_id_str, image_bytes, content_type
             ):
                 success_count += 1
 
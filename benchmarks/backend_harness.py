@@ -0,0 +1,145 @@
+"""
+Runs every text extraction backend over a local corpus of transcripts and
+reports throughput, peak memory and field-level agreement with pdfplumber.
+
+Usage:
+    python -m benchmarks.backend_harness historicos/ --json resultados.json
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.batch import collect_pdf_paths
+from src.pdf_parser import parse_transcript
+from src.text_backends import TEXT_BACKENDS
+
+REFERENCE_BACKEND = "pdfplumber"
+
+
+def transcript_fields(pdf_path: Path, backend: str) -> Dict:
+    """Parses the transcript serially and returns its data as a dictionary."""
+    return parse_transcript(pdf_path, workers=1, backend=backend).to_dict()
+
+
+def compare_fields(reference: Dict, candidate: Dict) -> Tuple[int, int]:
+    """
+    Compares two parsed transcripts field by field (each discipline field,
+    each credit summary value and each pending course field).
+
+    Returns:
+        The number of matching fields and the number of fields compared.
+    """
+    matching = total = 0
+
+    for section in ("disciplines", "pending_courses"):
+        ref_rows, cand_rows = reference[section], candidate[section]
+        for i in range(max(len(ref_rows), len(cand_rows))):
+            ref_row = ref_rows[i] if i < len(ref_rows) else {}
+            cand_row = cand_rows[i] if i < len(cand_rows) else {}
+            for key in ref_row.keys() | cand_row.keys():
+                total += 1
+                matching += ref_row.get(key) == cand_row.get(key)
+
+    for key, value in reference["credit_summary"].items():
+        total += 1
+        matching += candidate["credit_summary"].get(key) == value
+
+    return matching, total
+
+
+def run_backend(backend: str, pdf_paths: List[Path], references: Dict) -> Dict:
+    # Timing and memory are measured in separate passes, since tracing
+    # allocations slows the parser down considerably.
+    outputs = {}
+    errors = 0
+    start = time.perf_counter()
+    for pdf_path in pdf_paths:
+        try:
+            outputs[pdf_path] = transcript_fields(pdf_path, backend)
+        except Exception:
+            errors += 1
+    elapsed = time.perf_counter() - start
+
+    peak_memory = 0
+    for pdf_path in pdf_paths:
+        tracemalloc.start()
+        try:
+            transcript_fields(pdf_path, backend)
+        except Exception:
+            pass
+        peak_memory = max(peak_memory, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    matching = total = 0
+    mismatched_files = []
+    for pdf_path, reference in references.items():
+        if pdf_path not in outputs:
+            mismatched_files.append(str(pdf_path))
+            continue
+        file_matching, file_total = compare_fields(reference, outputs[pdf_path])
+        matching += file_matching
+        total += file_total
+        if file_matching != file_total:
+            mismatched_files.append(str(pdf_path))
+
+    return {
+        "backend": backend,
+        "files": len(pdf_paths),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "files_per_second": round(len(pdf_paths) / elapsed, 2) if elapsed else None,
+        "peak_memory_mb": round(peak_memory / 2**20, 2),
+        "field_agreement": round(matching / total, 6) if total else None,
+        "mismatched_files": mismatched_files,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "corpus", nargs="+", help="Arquivos PDF, diretórios ou padrões glob."
+    )
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=list(TEXT_BACKENDS),
+        default=list(TEXT_BACKENDS),
+    )
+    parser.add_argument("--json", type=Path, help="Salva os resultados em JSON.")
+    args = parser.parse_args()
+
+    pdf_paths = collect_pdf_paths(args.corpus)
+    if not pdf_paths:
+        parser.error("Nenhum arquivo PDF encontrado.")
+
+    references = {}
+    for pdf_path in pdf_paths:
+        try:
+            references[pdf_path] = transcript_fields(pdf_path, REFERENCE_BACKEND)
+        except Exception:
+            pass
+
+    results = [run_backend(b, pdf_paths, references) for b in args.backends]
+
+    print(
+        f"{'backend':<12} {'arquivos/s':>10} {'pico (MB)':>10} {'concordância':>13} {'erros':>6}"
+    )
+    for result in results:
+        print(
+            f"{result['backend']:<12} {result['files_per_second']:>10} "
+            f"{result['peak_memory_mb']:>10} {result['field_agreement']:>13} "
+            f"{result['errors']:>6}"
+        )
+        for mismatched in result["mismatched_files"]:
+            print(f"    divergente: {mismatched}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
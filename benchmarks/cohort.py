@@ -0,0 +1,175 @@
+"""
+Times the cohort engine (src/cohort.py) on synthetic entry classes of growing
+size and checks a sample of its students against the per-student functions
+of src/calculations.py.
+
+Usage:
+    python -m benchmarks.cohort
+    python -m benchmarks.cohort --students 1000 10000 100000 200000
+"""
+
+import argparse
+import sys
+import time
+from typing import List
+
+import numpy as np
+
+from src.calculations import (
+    calculate_general_ira,
+    calculate_individual_ira,
+    calculate_semester_ira,
+)
+from src.cohort import (
+    Cohort,
+    calculate_cohort_general_ira,
+    calculate_cohort_individual_ira,
+    calculate_cohort_semester_ira,
+)
+from src.transcript import Status, Transcript, period_label
+
+DEFAULT_STUDENTS = [1000, 10000, 100000]
+COURSES = 40
+TOLERANCE = 1e-9
+
+
+def generate_cohort(
+    students: int, disciplines_per_semester: int = 6, seed: int = 0
+) -> Cohort:
+    """
+    Builds a cohort of students who entered between 2010 and 2019 and took 1 to
+    14 semesters, in the flat columnar form the engine takes.
+    """
+    rng = np.random.default_rng(seed)
+    start_semesters = rng.integers(2010 * 2 + 1, 2019 * 2 + 3, size=students)
+    semester_counts = rng.integers(1, 15, size=students)
+
+    rows_per_student = semester_counts * disciplines_per_semester
+    student_ids = np.repeat(np.arange(students), rows_per_student)
+    first_rows = np.repeat(
+        np.cumsum(rows_per_student) - rows_per_student, rows_per_student
+    )
+    offsets = (np.arange(len(student_ids)) - first_rows) // disciplines_per_semester
+    semesters = start_semesters[student_ids] + offsets
+    periods = (semesters - 1) // 2 * 10 + (semesters - 1) % 2 + 1
+
+    size = len(student_ids)
+    statuses = rng.choice(
+        [Status.APROVADO, Status.APROVADO_MEDIA, Status.REPROVADO, Status.TRANCADO],
+        p=[0.6, 0.2, 0.1, 0.1],
+        size=size,
+    )
+    grades = np.where(
+        statuses == Status.TRANCADO, 0.0, np.round(rng.uniform(0, 10, size), 1)
+    )
+    credit_hours = rng.choice([32.0, 64.0, 96.0], size=size)
+    return Cohort(student_ids, periods, statuses, grades, credit_hours)
+
+
+def check_sample(
+    cohort: Cohort,
+    individual_iras: np.ndarray,
+    general_iras: np.ndarray,
+    course_index: np.ndarray,
+    course_averages: np.ndarray,
+    course_deviations: np.ndarray,
+    samples: int,
+) -> List[str]:
+    """
+    Compares the engine's results for a sample of students with the
+    per-student functions and returns the differences found.
+    """
+    semester_iras = calculate_cohort_semester_ira(cohort)
+    problems = []
+    rng = np.random.default_rng(len(cohort))
+    for student in rng.choice(len(cohort.students), size=samples, replace=False):
+        rows = cohort.student_index == student
+        transcript = Transcript(
+            cohort.periods[rows],
+            cohort.statuses[rows],
+            cohort.grades[rows],
+            cohort.credit_hours[rows],
+        )
+        individual_ira = calculate_individual_ira(transcript)
+        general_ira = calculate_general_ira(
+            individual_ira,
+            course_averages[course_index[student]],
+            course_deviations[course_index[student]],
+        )
+        if abs(individual_ira - individual_iras[student]) > TOLERANCE:
+            problems.append(f"IRA individual do estudante {student}")
+        if abs(general_ira - general_iras[student]) > TOLERANCE:
+            problems.append(f"IRA geral do estudante {student}")
+
+        expected = calculate_semester_ira(transcript)
+        found = semester_iras[semester_iras["student"] == cohort.students[student]]
+        if list(expected) != [period_label(int(p)) for p in found["period"]] or any(
+            abs(a - b) > TOLERANCE for a, b in zip(expected.values(), found["ira"])
+        ):
+            problems.append(f"IRA por semestre do estudante {student}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--students", type=int, nargs="+", default=DEFAULT_STUDENTS)
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=200,
+        help="Estudantes de cada turma comparados com as funções por estudante.",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    course_averages = rng.uniform(6.0, 8.5, COURSES)
+    course_deviations = rng.uniform(0.8, 2.0, COURSES)
+    course_deviations[0] = 0.0
+
+    print(
+        f"{'estudantes':>10} {'disciplinas':>11} {'IRA-I (s)':>10} "
+        f"{'IRA-G (s)':>10} {'semestres (s)':>14}"
+    )
+    failed = False
+    for students in args.students:
+        cohort = generate_cohort(students, seed=students)
+        course_index = rng.integers(0, COURSES, size=len(cohort.students))
+
+        start = time.perf_counter()
+        individual_iras = calculate_cohort_individual_ira(cohort)
+        individual_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        general_iras = calculate_cohort_general_ira(
+            individual_iras, course_index, course_averages, course_deviations
+        )
+        general_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        calculate_cohort_semester_ira(cohort)
+        semester_seconds = time.perf_counter() - start
+
+        print(
+            f"{students:>10} {len(cohort):>11} {individual_seconds:>10.3f} "
+            f"{general_seconds:>10.3f} {semester_seconds:>14.3f}"
+        )
+
+        problems = check_sample(
+            cohort,
+            individual_iras,
+            general_iras,
+            course_index,
+            course_averages,
+            course_deviations,
+            min(args.samples, students),
+        )
+        for problem in problems:
+            print(f"    DIVERGENTE: {problem}")
+        failed = failed or bool(problems)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Simulates concurrent sessions querying the courses through the connection
+pool (src/db_pool.py) and prints its metrics for each pool size, to choose
+IRA_DB_POOL_MAX for the expected number of sessions.
+
+The database is read from the POSTGRES_* variables, as in actions/utils.py.
+
+Usage:
+    python -m benchmarks.db_pool --sessions 50 --sizes 2 5 10
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from src.database import fetch_courses
+from src.db_pool import ConnectionPool
+
+
+def connection_params():
+    """The psycopg2.connect arguments from the POSTGRES_* variables."""
+    return {
+        "user": os.getenv("POSTGRES_USER", "postgres"),
+        "password": os.getenv("POSTGRES_PASSWORD", "password"),
+        "host": os.getenv("POSTGRES_HOST", "localhost"),
+        "port": os.getenv("POSTGRES_PORT", "5432"),
+        "database": os.getenv("POSTGRES_DB", "postgres"),
+    }
+
+
+def run_sessions(pool: ConnectionPool, sessions: int, queries: int, think: float):
+    """Runs the sessions in threads, each querying the courses repeatedly."""
+    errors = []
+
+    def session():
+        for _ in range(queries):
+            try:
+                fetch_courses(pool)
+            except Exception as e:
+                errors.append(e)
+            time.sleep(think)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=20, help="Consultas por sessão.")
+    parser.add_argument(
+        "--think",
+        type=float,
+        default=0.01,
+        help="Segundos entre as consultas de uma sessão.",
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--timeout", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(
+        f"{'máximo':>6} {'tempo (s)':>9} {'abertas':>7} {'esperas':>7} "
+        f"{'timeouts':>8} {'recicladas':>10} {'média (ms)':>10} {'pior (ms)':>9} {'erros':>5}"
+    )
+    for size in args.sizes:
+        pool = ConnectionPool(
+            connection_params(), minconn=1, maxconn=size, timeout=args.timeout
+        )
+        start = time.perf_counter()
+        errors = run_sessions(pool, args.sessions, args.queries, args.think)
+        seconds = time.perf_counter() - start
+        metrics = pool.metrics()
+        pool.close()
+        print(
+            f"{size:>6} {seconds:>9.2f} {metrics['size']:>7} {metrics['waits']:>7} "
+            f"{metrics['timeouts']:>8} {metrics['recycled']:>10} "
+            f"{metrics['mean_checkout_ms']:>10.2f} {metrics['max_checkout_ms']:>9.2f} "
+            f"{len(errors):>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Compares the discipline parsers (DISCIPLINE_PARSERS in src/pdf_parser.py): the
+time each takes on adversarial text of growing size, and whether they find the
+same disciplines on synthetic transcripts and, optionally, on real ones.
+
+The "regex" parser can take minutes on some of these inputs, so each of its
+runs happens in a child process that is stopped after the time budget. The
+"lines" parser, the default, is first run the same way with --max-seconds as
+its budget. The command fails if the "lines" parser exceeds that bound on any
+input or does not scale linearly, or if the parsers disagree on any
+transcript.
+
+Usage:
+    python -m benchmarks.discipline_parsers
+    python -m benchmarks.discipline_parsers historicos/ --budget 5 --max-seconds 0.5
+"""
+
+import argparse
+import multiprocessing
+import queue
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.run import time_call
+from benchmarks.synthetic import generate_transcript
+from src.batch import collect_pdf_paths
+from src.pdf_parser import parse_disciplines, parse_transcript
+
+DEFAULT_SIZES = [250, 500, 1000, 2000]
+
+# Tokens of the garbled lines: pieces of rows in no particular order
+GARBLED_TOKENS = [
+    "CK0664",
+    "*CK0664",
+    "@",
+    "e",
+    "64.00",
+    "128.00",
+    "8.5",
+    "10",
+    "2022.1",
+    "T01",
+    "APROVADO",
+    "MÉDIA",
+    "TRANCADO",
+    "ÁLGEBRA",
+    "LINEAR",
+]
+
+
+def _garbled_lines(size: int) -> str:
+    rng = random.Random(size)
+    lines = []
+    for _ in range(size):
+        lines.append(" ".join(rng.choice(GARBLED_TOKENS) for _ in range(12)))
+    return "\n".join(lines)
+
+
+# Each case builds a text with the given number of repeated units
+ADVERSARIAL_CASES: Dict[str, Callable[[int], str]] = {
+    # A row that never gets a status: every token could be its grade
+    "notas sem situação": lambda size: "2022.1 CK0664 T01 64.00 "
+    + " ".join(["8.5"] * size),
+    # Every token could be the credit hours of the row
+    "cargas horárias": lambda size: "2022.1 CK0664 "
+    + " ".join(["64.00"] * size)
+    + " 8.5",
+    # Many course codes on one line, none of them completing a row
+    "códigos por linha": lambda size: "2022.1 " + " ".join(["CK0664 64.00"] * size),
+    "linhas corrompidas": _garbled_lines,
+}
+
+
+def _parse_in_child(text: str, parser: str, results: multiprocessing.Queue):
+    start = time.perf_counter()
+    parse_disciplines(text, parser)
+    results.put(time.perf_counter() - start)
+
+
+def time_with_budget(text: str, parser: str, budget: float) -> Optional[float]:
+    """
+    Parses the text once in a child process and returns the time it took, in
+    seconds, or None if it did not finish within the budget.
+    """
+    results = multiprocessing.Queue()
+    process = multiprocessing.Process(
+        target=_parse_in_child, args=(text, parser, results), daemon=True
+    )
+    process.start()
+    process.join(budget)
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return None
+    try:
+        return results.get(timeout=1)
+    except queue.Empty:
+        return None
+
+
+def run_adversarial(
+    sizes: List[int], budget: float, max_seconds: float, repeat: int
+) -> List[Dict]:
+    """
+    Times both parsers on every adversarial case and size. The "lines" parser
+    is timed only after a first run finishes within max_seconds, and its
+    lines_seconds is None otherwise. Once the regex exceeds the budget on a
+    case, the larger sizes of that case are skipped.
+    """
+    results = []
+    for case, build in ADVERSARIAL_CASES.items():
+        regex_exceeded = False
+        for size in sizes:
+            text = build(size)
+            lines_seconds = None
+            if time_with_budget(text, "lines", max_seconds) is not None:
+                lines_seconds = time_call(
+                    lambda: parse_disciplines(text, "lines"), repeat
+                )
+            regex_seconds = None
+            if not regex_exceeded:
+                regex_seconds = time_with_budget(text, "regex", budget)
+                regex_exceeded = regex_seconds is None
+            results.append(
+                {
+                    "case": case,
+                    "size": size,
+                    "characters": len(text),
+                    "lines_seconds": lines_seconds,
+                    "regex_seconds": regex_seconds,
+                }
+            )
+    return results
+
+
+def find_slow_cases(results: List[Dict]) -> List[str]:
+    """Returns the cases in which the "lines" parser exceeded its time bound."""
+    slow = []
+    for result in results:
+        if result["lines_seconds"] is None and result["case"] not in slow:
+            slow.append(result["case"])
+    return slow
+
+
+def find_superlinear_cases(results: List[Dict], max_growth: float) -> List[str]:
+    """
+    Returns the cases in which the "lines" parser's time per character at the
+    largest size exceeds max_growth times that at the smallest size.
+    """
+    superlinear = []
+    slow = find_slow_cases(results)
+    for case in ADVERSARIAL_CASES:
+        rows = sorted(
+            (r for r in results if r["case"] == case), key=lambda r: r["size"]
+        )
+        if case in slow or len(rows) < 2:
+            continue
+        smallest = rows[0]["lines_seconds"] / rows[0]["characters"]
+        largest = rows[-1]["lines_seconds"] / rows[-1]["characters"]
+        if largest > smallest * max_growth:
+            superlinear.append(case)
+    return superlinear
+
+
+def compare_synthetic(transcripts: int) -> List[int]:
+    """
+    Parses synthetic transcripts of varied shapes with both parsers and
+    returns the seeds of those on which they disagree.
+    """
+    disagreements = []
+    for seed in range(transcripts):
+        rng = random.Random(seed)
+        text = generate_transcript(
+            semesters=rng.randint(1, 16),
+            disciplines_per_semester=rng.randint(1, 8),
+            trancado_rate=rng.random() * 0.3,
+            symbol_rate=rng.random() * 0.5,
+            seed=seed,
+        ).text
+        if parse_disciplines(text, "regex") != parse_disciplines(text, "lines"):
+            disagreements.append(seed)
+    return disagreements
+
+
+def compare_corpus(pdf_paths: List[Path]) -> List[Path]:
+    """Returns the transcripts on which the parsers find different disciplines."""
+    disagreements = []
+    for pdf_path in pdf_paths:
+        parsed = [
+            parse_transcript(pdf_path, discipline_parser=parser).disciplines
+            for parser in ("regex", "lines")
+        ]
+        if parsed[0] != parsed[1]:
+            disagreements.append(pdf_path)
+    return disagreements
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "corpus", nargs="*", help="Arquivos PDF, diretórios ou padrões glob."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=2.0,
+        help="Tempo máximo, em segundos, de cada execução do parser regex.",
+    )
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=1.0,
+        help="Tempo máximo, em segundos, do parser lines em cada entrada adversarial.",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=3.0,
+        help="Crescimento máximo do tempo por caractere do parser lines.",
+    )
+    parser.add_argument(
+        "--transcripts",
+        type=int,
+        default=300,
+        help="Históricos sintéticos comparados entre os parsers.",
+    )
+    args = parser.parse_args()
+
+    results = run_adversarial(args.sizes, args.budget, args.max_seconds, args.repeat)
+    print(
+        f"{'caso':<20} {'tamanho':>8} {'caracteres':>11} {'lines (ms)':>11} {'regex (ms)':>11}"
+    )
+    for result in results:
+        lines = (
+            f"{result['lines_seconds'] * 1000:>11.3f}"
+            if result["lines_seconds"] is not None
+            else f"{'> ' + format(args.max_seconds, 'g') + ' s':>11}"
+        )
+        regex = (
+            f"{result['regex_seconds'] * 1000:>11.3f}"
+            if result["regex_seconds"] is not None
+            else f"{'> ' + format(args.budget, 'g') + ' s':>11}"
+        )
+        print(
+            f"{result['case']:<20} {result['size']:>8} {result['characters']:>11} "
+            f"{lines} {regex}"
+        )
+
+    failed = False
+    for case in find_slow_cases(results):
+        print(f"LENTO: parser lines passou de {args.max_seconds:g} s no caso '{case}'.")
+        failed = True
+    for case in find_superlinear_cases(results, args.max_growth):
+        print(f"CRESCIMENTO NÃO LINEAR: parser lines no caso '{case}'.")
+        failed = True
+
+    disagreements = compare_synthetic(args.transcripts)
+    print(
+        f"Históricos sintéticos: {args.transcripts - len(disagreements)} de "
+        f"{args.transcripts} iguais nos dois parsers."
+    )
+    for seed in disagreements:
+        print(f"    divergente: semente {seed}")
+    failed = failed or bool(disagreements)
+
+    if args.corpus:
+        pdf_paths = collect_pdf_paths(args.corpus)
+        corpus_disagreements = compare_corpus(pdf_paths)
+        print(
+            f"Históricos reais: {len(pdf_paths) - len(corpus_disagreements)} de "
+            f"{len(pdf_paths)} iguais nos dois parsers."
+        )
+        for pdf_path in corpus_disagreements:
+            print(f"    divergente: {pdf_path}")
+        failed = failed or bool(corpus_disagreements)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Checks that the discipline parsers scale linearly with the number of rows, on
+synthetic transcripts with thousands of rows. The text is parsed both at once
+(parse_disciplines) and page by page, as parse_transcript streams it.
+
+The check counts the lines of src/pdf_parser.py executed per row, which
+does not depend on the machine or its load: the command fails if that count
+at the largest size exceeds --max-growth times the count at the smallest
+size, or if a parser misses rows. Work done inside the regex engine is not
+counted. The time per row and the exponent of a power law fitted to the
+median timings are shown as well, and only fail the command with
+--max-exponent.
+
+Usage:
+    python -m benchmarks.discipline_scaling
+    python -m benchmarks.discipline_scaling --rows 500 4000 32000 --max-exponent 1.3
+"""
+
+import argparse
+import sys
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import src.pdf_parser
+from benchmarks.run import time_call
+from benchmarks.synthetic import LINES_PER_PAGE, generate_transcript
+from src.pdf_parser import DISCIPLINE_PARSERS, new_discipline_parser, parse_disciplines
+
+DEFAULT_ROWS = [500, 1000, 2000, 4000, 8000, 16000]
+DISCIPLINES_PER_SEMESTER = 6
+
+
+def parse_in_pages(pages: List[str], parser: str) -> List[Dict]:
+    """Feeds the text to the parser one page at a time."""
+    matcher = new_discipline_parser(parser)
+    for page in pages:
+        matcher.feed(page)
+    return matcher.finish()
+
+
+def count_lines(func: Callable, filename: str = src.pdf_parser.__file__) -> int:
+    """Runs the call once and returns the number of lines of filename it executed."""
+    count = 0
+
+    def trace_lines(frame, event, arg):
+        nonlocal count
+        if event == "line":
+            count += 1
+        return trace_lines
+
+    def trace_calls(frame, event, arg):
+        if frame.f_code.co_filename == filename:
+            return trace_lines
+        return None
+
+    sys.settrace(trace_calls)
+    try:
+        func()
+    finally:
+        sys.settrace(None)
+    return count
+
+
+def run_sizes(rows_list: List[int], repeat: int) -> List[Dict]:
+    """Measures every parser and mode on each size, returning one result per run."""
+    results = []
+    for rows in rows_list:
+        synthetic = generate_transcript(
+            semesters=max(1, rows // DISCIPLINES_PER_SEMESTER),
+            disciplines_per_semester=DISCIPLINES_PER_SEMESTER,
+            seed=rows,
+        )
+        text = synthetic.text
+        pages = [
+            "\n".join(synthetic.lines[i : i + LINES_PER_PAGE]) + "\n"
+            for i in range(0, len(synthetic.lines), LINES_PER_PAGE)
+        ]
+        for parser in DISCIPLINE_PARSERS:
+            modes = {
+                "texto inteiro": lambda: parse_disciplines(text, parser),
+                "por página": lambda: parse_in_pages(pages, parser),
+            }
+            for mode, func in modes.items():
+                found = len(func())
+                if found != synthetic.expected_disciplines:
+                    raise RuntimeError(
+                        f"O parser '{parser}' ({mode}) encontrou {found} "
+                        f"disciplinas, esperadas {synthetic.expected_disciplines}."
+                    )
+                results.append(
+                    {
+                        "case": f"{parser} ({mode})",
+                        "rows": synthetic.rows,
+                        "lines": count_lines(func),
+                        "seconds": time_call(func, repeat),
+                    }
+                )
+    return results
+
+
+def _by_case(results: List[Dict]) -> Dict[str, List[Dict]]:
+    by_case: Dict[str, List[Dict]] = {}
+    for result in results:
+        by_case.setdefault(result["case"], []).append(result)
+    return {
+        case: sorted(runs, key=lambda r: r["rows"]) for case, runs in by_case.items()
+    }
+
+
+def line_growth(results: List[Dict]) -> Dict[str, float]:
+    """
+    Returns, per case, the executed lines per row at the largest size divided
+    by those at the smallest size: 1 for linear work.
+    """
+    growth = {}
+    for case, runs in _by_case(results).items():
+        if len(runs) >= 2:
+            smallest = runs[0]["lines"] / runs[0]["rows"]
+            growth[case] = runs[-1]["lines"] / runs[-1]["rows"] / smallest
+    return growth
+
+
+def time_exponents(results: List[Dict]) -> Dict[str, float]:
+    """
+    Returns, per case, the exponent k of the power law time ~ rows^k fitted
+    to the timings by least squares in log-log scale: 1 for linear time.
+    """
+    exponents = {}
+    for case, runs in _by_case(results).items():
+        if len(runs) >= 2:
+            rows = np.log([r["rows"] for r in runs])
+            seconds = np.log([r["seconds"] for r in runs])
+            exponents[case] = float(np.polyfit(rows, seconds, 1)[0])
+    return exponents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=DEFAULT_ROWS,
+        help="Quantidades de linhas de disciplinas dos históricos gerados.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        default=1.1,
+        help="Crescimento máximo das linhas de código executadas por linha de "
+        "disciplina entre o menor e o maior histórico.",
+    )
+    parser.add_argument(
+        "--max-exponent",
+        type=float,
+        help="Expoente máximo do tempo ajustado; sem ele, o tempo só é exibido.",
+    )
+    args = parser.parse_args()
+
+    results = run_sizes(args.rows, args.repeat)
+
+    print(
+        f"{'caso':<24} {'linhas':>7} {'tempo (ms)':>11} {'µs/linha':>9} "
+        f"{'código/linha':>13}"
+    )
+    for result in results:
+        print(
+            f"{result['case']:<24} {result['rows']:>7} "
+            f"{result['seconds'] * 1000:>11.3f} "
+            f"{result['seconds'] * 1e6 / result['rows']:>9.2f} "
+            f"{result['lines'] / result['rows']:>13.2f}"
+        )
+
+    growth = line_growth(results)
+    exponents = time_exponents(results)
+    failed = False
+    print()
+    for case in growth:
+        print(
+            f"{case:<24} crescimento do código/linha {growth[case]:.3f}, "
+            f"expoente do tempo {exponents[case]:.2f}"
+        )
+        max_exponent: Optional[float] = args.max_exponent
+        if growth[case] > args.max_growth or (
+            max_exponent is not None and exponents[case] > max_exponent
+        ):
+            print(f"CRESCIMENTO NÃO LINEAR: {case}.")
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Checks that the calculations of src/calculations.py give exactly the results
+of their original implementations over lists of discipline dictionaries,
+kept below as the reference.
+
+The results are compared with ==, not within a tolerance: the columnar
+versions must add the same numbers in the same order. The inputs are the
+parsed synthetic transcripts, plus random transcripts whose rows are not
+sorted by period. calculate_semester_ira is exact on transcripts listed in
+period order, as SIGAA prints them, so it gets the random transcripts
+sorted by period (stably, keeping their order within each period).
+
+Usage:
+    python -m benchmarks.equivalence
+    python -m benchmarks.equivalence --transcripts 1000
+"""
+
+import argparse
+import random
+import sys
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_transcript
+from src.calculations import (
+    calculate_individual_ira,
+    calculate_mean_grade_per_semester,
+    calculate_semester_ira,
+    prepare_hourly_load_data,
+)
+from src.pdf_parser import parse_disciplines
+from src.transcript import STATUS_LABELS, Transcript
+
+
+def reference_individual_ira(disciplines: List[Dict]) -> float:
+    """The original calculate_individual_ira."""
+    if not disciplines:
+        return 0.0
+
+    first_period = min(d["period"] for d in disciplines)
+    start_year, start_semester = map(int, first_period.split("."))
+
+    dropped_hours_sum = sum(
+        d["credit_hours"] for d in disciplines if d["status"] == "TRANCADO"
+    )
+    total_hours_sum = sum(d["credit_hours"] for d in disciplines)
+
+    numerator = 0.0
+    denominator = 0.0
+
+    filtered_disciplines = [
+        d
+        for d in disciplines
+        if d["status"] in ["APROVADO", "APROVADO MÉDIA", "REPROVADO"]
+    ]
+
+    for discipline in filtered_disciplines:
+        credit_hours = discipline["credit_hours"]
+        grade = discipline["grade"]
+        year, semester = map(int, discipline["period"].split("."))
+
+        semester_number = (year - start_year) * 2 + (semester - start_semester) + 1
+        period_weight = min(6, semester_number)
+
+        numerator += period_weight * credit_hours * grade
+        denominator += period_weight * credit_hours
+
+    if total_hours_sum == 0:
+        return 0.0
+    penalty_factor = 1.0 - (0.5 * dropped_hours_sum) / total_hours_sum
+
+    if denominator == 0:
+        return 0.0
+    weighted_average = numerator / denominator
+
+    individual_ira = penalty_factor * weighted_average
+    return individual_ira
+
+
+def reference_semester_ira(disciplines: List[Dict]) -> Dict[str, float]:
+    """The original calculate_semester_ira."""
+    if not disciplines:
+        return {}
+
+    semester_iras = {}
+    completed_periods = sorted(list(set(d["period"] for d in disciplines)))
+
+    for period in completed_periods:
+        disciplines_until_period = [d for d in disciplines if d["period"] <= period]
+
+        ira_for_period = reference_individual_ira(disciplines_until_period)
+        semester_iras[period] = ira_for_period
+
+    return semester_iras
+
+
+def reference_mean_grade_per_semester(disciplines: List[Dict]) -> pd.Series:
+    """The original calculate_mean_grade_per_semester."""
+    if not disciplines:
+        return pd.Series(dtype=float)
+
+    df = pd.DataFrame(disciplines)
+    return df.groupby("period")["grade"].mean().sort_index()
+
+
+def reference_hourly_load_data(disciplines: List[Dict]) -> pd.Series:
+    """The original prepare_hourly_load_data."""
+    if not disciplines:
+        return pd.Series(dtype=float)
+
+    df = pd.DataFrame(disciplines)
+    return df.groupby("period")["credit_hours"].sum()
+
+
+def random_disciplines(rng: random.Random, size: int) -> List[Dict]:
+    """Returns disciplines of random periods, statuses and grades, in no order."""
+    statuses = list(STATUS_LABELS.values())
+    return [
+        {
+            "period": f"{rng.randint(2012, 2024)}.{rng.randint(1, 2)}",
+            "status": rng.choice(statuses),
+            "grade": round(rng.uniform(0, 10), rng.choice([1, 2])),
+            "credit_hours": float(rng.choice([16, 32, 48, 64, 96, 128])),
+        }
+        for _ in range(size)
+    ]
+
+
+def generate_cases(transcripts: int) -> List[List[Dict]]:
+    """Returns the parsed synthetic transcripts and as many random ones."""
+    rng = random.Random(0)
+    cases = []
+    for seed in range(transcripts):
+        synthetic = generate_transcript(semesters=1 + seed % 24, seed=seed)
+        cases.append(parse_disciplines(synthetic.text))
+        cases.append(random_disciplines(rng, rng.randint(1, 300)))
+    return cases
+
+
+def _same(result, expected) -> bool:
+    if isinstance(expected, pd.Series):
+        return list(result.index) == list(expected.index) and list(
+            result.to_numpy()
+        ) == list(expected.to_numpy())
+    return result == expected
+
+
+# Each checked function, with its reference and whether it needs the rows in
+# period order
+CHECKS: Dict[str, tuple] = {
+    "calculate_individual_ira": (
+        calculate_individual_ira,
+        reference_individual_ira,
+        False,
+    ),
+    "calculate_semester_ira": (calculate_semester_ira, reference_semester_ira, True),
+    "calculate_mean_grade_per_semester": (
+        calculate_mean_grade_per_semester,
+        reference_mean_grade_per_semester,
+        False,
+    ),
+    "prepare_hourly_load_data": (
+        prepare_hourly_load_data,
+        reference_hourly_load_data,
+        False,
+    ),
+}
+
+
+def count_differences(
+    cases: List[List[Dict]],
+    function: Callable,
+    reference: Callable,
+    period_order: bool = False,
+) -> int:
+    """Returns the number of cases where the function differs from its reference."""
+    differences = 0
+    for disciplines in cases:
+        if period_order:
+            disciplines = sorted(disciplines, key=lambda d: d["period"])
+        expected = reference(disciplines)
+        for argument in (disciplines, Transcript.from_disciplines(disciplines)):
+            if not _same(function(argument), expected):
+                differences += 1
+                break
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--transcripts",
+        type=int,
+        default=200,
+        help="Históricos sintéticos gerados, e outros tantos aleatórios.",
+    )
+    args = parser.parse_args()
+
+    cases = generate_cases(args.transcripts)
+    failed = False
+    for name, (function, reference, period_order) in CHECKS.items():
+        differences = count_differences(cases, function, reference, period_order)
+        print(f"{name:<36} {differences:>5} diferenças em {len(cases)} históricos")
+        failed = failed or bool(differences)
+    if failed:
+        print("RESULTADOS DIFERENTES DA IMPLEMENTAÇÃO ORIGINAL.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
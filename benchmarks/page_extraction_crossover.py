@@ -0,0 +1,142 @@
+"""
+Measures streaming vs. parallel parsing of transcripts of growing length to
+find the page count from which the process pool pays off
+(IRA_PARALLEL_PAGE_THRESHOLD, see src/pdf_parser.py).
+
+Each PDF is parsed through to the disciplines, the credit hour summary and
+the pending courses, both with parse_transcript(streaming=True) and with its
+pages laid out in the pool. The streaming mode stops at the page where the
+legend and the summary sections end; in the synthetic transcripts generated
+by default they are on the last page, the case most favorable to the pool.
+Pass real transcripts to measure the deployment's own.
+
+Usage:
+    python -m benchmarks.page_extraction_crossover --workers 4 --max-pages 20
+    python -m benchmarks.page_extraction_crossover historicos/*.pdf --workers 4
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.synthetic import LINES_PER_PAGE, generate_transcript, write_pdf
+from src.pdf_parser import (
+    PARALLEL_PAGE_THRESHOLD,
+    ParsedTranscript,
+    extract_page_texts,
+    parse_transcript,
+)
+from src.text_backends import open_pdf
+
+DISCIPLINES_PER_SEMESTER = 6
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """Returns the median wall time of the call, in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def parse_streaming(pdf_path: Path) -> ParsedTranscript:
+    """Parses the PDF as the app does with IRA_PAGE_WORKERS=1."""
+    transcript = parse_transcript(pdf_path, streaming=True, workers=1)
+    transcript.to_dict()
+    return transcript
+
+
+def parse_parallel(pdf_path: Path, workers: int) -> ParsedTranscript:
+    """Parses the PDF with its pages laid out in the pool, whatever its length."""
+    discipline_page_texts, page_texts = extract_page_texts(pdf_path, workers=workers)
+    transcript = ParsedTranscript(discipline_page_texts, page_texts)
+    transcript.to_dict()
+    return transcript
+
+
+def synthetic_pdfs(max_pages: int, workdir: Path) -> List[Path]:
+    """Writes synthetic transcripts of 1 to max_pages pages, one per length."""
+    paths = {}
+    semesters = 1
+    while True:
+        synthetic = generate_transcript(
+            semesters=semesters,
+            disciplines_per_semester=DISCIPLINES_PER_SEMESTER,
+            seed=semesters,
+        )
+        pages = -(-len(synthetic.lines) // LINES_PER_PAGE)
+        if pages > max_pages:
+            return [paths[p] for p in sorted(paths)]
+        if pages not in paths:
+            paths[pages] = write_pdf(synthetic, workdir / f"sintetico_{pages}.pdf")
+        semesters += 1
+
+
+def measure(pdf_paths: List[Path], workers: int, repeat: int) -> List[Dict]:
+    """Times both modes on every PDF, printing one row per PDF."""
+    # Start every pool worker before timing, as a long-lived process would have
+    parse_parallel(max(pdf_paths, key=lambda p: p.stat().st_size), workers)
+
+    results = []
+    print(
+        f"{'páginas':>8} {'lidas':>6} {'streaming (s)':>14} "
+        f"{'paralelo (s)':>13} {'ganho':>7}  arquivo"
+    )
+    for pdf_path in pdf_paths:
+        with open_pdf(pdf_path) as pdf:
+            page_count = len(pdf.pages)
+        pages_read = len(parse_streaming(pdf_path).page_texts)
+        streaming = time_call(lambda: parse_streaming(pdf_path), repeat)
+        parallel = time_call(lambda: parse_parallel(pdf_path, workers), repeat)
+        print(
+            f"{page_count:>8} {pages_read:>6} {streaming:>14.4f} "
+            f"{parallel:>13.4f} {streaming / parallel:>6.2f}x  {pdf_path.name}"
+        )
+        results.append({"pages": page_count, "speedup": streaming / parallel})
+    return results
+
+
+def find_crossover(results: List[Dict]) -> Optional[int]:
+    """Returns the smallest page count from which the pool was always faster."""
+    crossover = None
+    for result in sorted(results, key=lambda r: r["pages"], reverse=True):
+        if result["speedup"] <= 1.0:
+            break
+        crossover = result["pages"]
+    return crossover
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "pdfs", nargs="*", type=Path, help="Históricos (padrão: sintéticos)."
+    )
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--max-pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        pdf_paths = args.pdfs or synthetic_pdfs(args.max_pages, Path(workdir))
+        results = measure(pdf_paths, args.workers, args.repeat)
+
+    crossover = find_crossover(results)
+    if crossover is None:
+        print(
+            f"\nO modo paralelo não superou o streaming com {args.workers} processos."
+        )
+    else:
+        print(
+            f"\nPonto de virada: {crossover} páginas "
+            f"(IRA_PARALLEL_PAGE_THRESHOLD atual: {PARALLEL_PAGE_THRESHOLD})."
+        )
+
+
+if __name__ == "__main__":
+    main()
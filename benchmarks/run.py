@@ -0,0 +1,248 @@
+"""
+Times the parser and the calculations on synthetic transcripts of growing size
+and writes the results as JSON, optionally checking them against a baseline.
+
+Usage:
+    python -m benchmarks.run --json resultados.json
+    python -m benchmarks.run --baseline resultados.json --tolerance 1.5
+    python -m benchmarks.run --semesters 8 32 128 512 --max-growth 3
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_transcript, write_pdf
+from src.analytics import build_analytics
+from src.calculations import (
+    calculate_individual_ira,
+    calculate_mean_grade_per_semester,
+    calculate_semester_ira,
+    prepare_grade_distribution_data,
+    prepare_hourly_load_data,
+)
+from src.calculations import IraSums
+from src.pdf_parser import extract_disciplines, parse_disciplines
+from src.projection import GradeModel, project_ira
+from src.transcript import Transcript
+
+DEFAULT_SEMESTERS = [2, 8, 16, 32]
+DEFAULT_DISCIPLINES_PER_SEMESTER = 6
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """
+    Returns the median wall time of one call, in seconds. Fast calls are run
+    in loops of at least 0.2 s each (see timeit.Timer.autorange), so that the
+    sub-millisecond stages can be compared across runs.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return statistics.median(t / number for t in timer.repeat(repeat, number))
+
+
+def benchmark_size(
+    semesters: int, disciplines_per_semester: int, repeat: int, workdir: Path
+) -> List[Dict]:
+    """Times every stage on one transcript size, returning one result per stage."""
+    synthetic = generate_transcript(
+        semesters=semesters,
+        disciplines_per_semester=disciplines_per_semester,
+        seed=semesters,
+    )
+    pdf_path = write_pdf(synthetic, workdir / f"sintetico_{semesters}.pdf")
+    text = synthetic.text
+
+    disciplines = parse_disciplines(text)
+    if len(disciplines) != synthetic.expected_disciplines:
+        raise RuntimeError(
+            f"O parser encontrou {len(disciplines)} disciplinas, "
+            f"esperadas {synthetic.expected_disciplines}."
+        )
+    table = Transcript.from_disciplines(disciplines)
+    # Four disciplines planned for the two semesters after the transcript
+    planned_semesters = np.repeat(table.semesters.max() + np.arange(1, 3), 2)
+    planned_hours = np.full(4, 64.0)
+    sums = IraSums.from_transcript(table)
+    model = GradeModel.fit(table)
+
+    stages = {
+        "extract_disciplines": lambda: extract_disciplines(pdf_path),
+        "parse_disciplines": lambda: parse_disciplines(text),
+        "Transcript.from_disciplines": lambda: Transcript.from_disciplines(disciplines),
+        "calculate_individual_ira": lambda: calculate_individual_ira(table),
+        "calculate_semester_ira": lambda: calculate_semester_ira(table),
+        "calculate_mean_grade_per_semester": lambda: calculate_mean_grade_per_semester(
+            table
+        ),
+        "prepare_hourly_load_data": lambda: prepare_hourly_load_data(table),
+        "prepare_grade_distribution_data": lambda: prepare_grade_distribution_data(
+            table
+        ),
+        "build_analytics": lambda: build_analytics(table),
+        "project_ira": lambda: project_ira(
+            sums, model, planned_semesters, planned_hours, 7.0, 1.5
+        ),
+    }
+
+    results = []
+    for stage, func in stages.items():
+        seconds = time_call(func, repeat)
+        results.append(
+            {
+                "stage": stage,
+                "semesters": semesters,
+                "rows": synthetic.rows,
+                "disciplines": len(disciplines),
+                "seconds": seconds,
+                "rows_per_second": synthetic.rows / seconds if seconds else None,
+            }
+        )
+    return results
+
+
+def run_suite(
+    semesters_list: List[int], disciplines_per_semester: int, repeat: int
+) -> Dict:
+    """Runs every size and returns the results with a description of the host."""
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for semesters in semesters_list:
+            results.extend(
+                benchmark_size(
+                    semesters, disciplines_per_semester, repeat, Path(workdir)
+                )
+            )
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+        },
+        "results": results,
+    }
+
+
+def find_regressions(current: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """
+    Returns the stages that got slower than the baseline by more than the
+    tolerance factor, for the sizes present in both runs.
+    """
+    baseline_seconds = {
+        (r["stage"], r["semesters"]): r["seconds"] for r in baseline["results"]
+    }
+    regressions = []
+    for result in current["results"]:
+        previous: Optional[float] = baseline_seconds.get(
+            (result["stage"], result["semesters"])
+        )
+        if previous and result["seconds"] > previous * tolerance:
+            regressions.append(
+                {
+                    **result,
+                    "baseline_seconds": previous,
+                    "ratio": result["seconds"] / previous,
+                }
+            )
+    return regressions
+
+
+def find_superlinear_stages(report: Dict, max_growth: float) -> List[str]:
+    """
+    Returns the stages whose time per row at the largest size exceeds
+    max_growth times that at the smallest size.
+    """
+    rows_by_stage: Dict[str, List[Dict]] = {}
+    for result in report["results"]:
+        rows_by_stage.setdefault(result["stage"], []).append(result)
+
+    superlinear = []
+    for stage, results in rows_by_stage.items():
+        results = sorted(results, key=lambda r: r["rows"])
+        if len(results) < 2:
+            continue
+        smallest = results[0]["seconds"] / results[0]["rows"]
+        largest = results[-1]["seconds"] / results[-1]["rows"]
+        if largest > smallest * max_growth:
+            superlinear.append(stage)
+    return superlinear
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--semesters",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SEMESTERS,
+        help="Quantidades de semestres dos históricos gerados.",
+    )
+    parser.add_argument(
+        "--disciplines",
+        type=int,
+        default=DEFAULT_DISCIPLINES_PER_SEMESTER,
+        help="Disciplinas por semestre.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", type=Path, help="Salva os resultados em JSON.")
+    parser.add_argument(
+        "--baseline", type=Path, help="Resultados anteriores para comparação."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="Fator de lentidão, em relação à base, considerado regressão.",
+    )
+    parser.add_argument(
+        "--max-growth",
+        type=float,
+        help="Crescimento máximo do tempo por linha entre o menor e o maior "
+        "histórico; etapas acima dele falham.",
+    )
+    args = parser.parse_args()
+
+    report = run_suite(args.semesters, args.disciplines, args.repeat)
+
+    print(f"{'etapa':<36} {'semestres':>9} {'linhas':>7} {'tempo (ms)':>11}")
+    for result in report["results"]:
+        print(
+            f"{result['stage']:<36} {result['semesters']:>9} {result['rows']:>7} "
+            f"{result['seconds'] * 1000:>11.3f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+
+    failed = False
+    if args.max_growth is not None:
+        for stage in find_superlinear_stages(report, args.max_growth):
+            print(f"CRESCIMENTO NÃO LINEAR: {stage}.")
+            failed = True
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = find_regressions(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(
+                f"REGRESSÃO: {regression['stage']} com {regression['semesters']} "
+                f"semestres levou {regression['ratio']:.2f}x o tempo da base."
+            )
+        failed = failed or bool(regressions)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
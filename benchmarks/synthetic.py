@@ -0,0 +1,242 @@
+"""
+Generates synthetic SIGAA transcripts, as text and as PDF, for the benchmarks.
+
+The text mimics the layout that the parser sees: a header, the disciplines
+table grouped by period (with the course name on its own line before each
+row), the legend, the credit hour summary and the pending courses. Nothing is
+read from or sent to the network.
+
+Usage:
+    python -m benchmarks.synthetic historico_sintetico.pdf --semesters 12
+"""
+
+import argparse
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+STATUSES = [
+    "APROVADO",
+    "APROVADO MÉDIA",
+    "REPROVADO",
+    "TRANCADO",
+    "SUPRIMIDO",
+    "APROVT INTERNO",
+]
+# Relative frequency of each status, besides TRANCADO (see trancado_rate)
+STATUS_WEIGHTS = [60, 20, 12, 0, 4, 4]
+
+# Symbols printed before the course code. '@' and '§' rows are skipped by
+# the parser, '*' and '#' rows are kept.
+SYMBOLS = ["*", "#", "@", "§"]
+
+COURSE_NAMES = [
+    "FUNDAMENTOS DE PROGRAMAÇÃO",
+    "CÁLCULO FUNDAMENTAL I",
+    "CÁLCULO FUNDAMENTAL II",
+    "ÁLGEBRA LINEAR",
+    "ESTRUTURAS DE DADOS",
+    "FÍSICA GERAL I",
+    "MATEMÁTICA DISCRETA",
+    "SISTEMAS OPERACIONAIS",
+    "REDES DE COMPUTADORES",
+    "PROBABILIDADE E ESTATÍSTICA",
+    "BANCOS DE DADOS",
+    "TEORIA DA COMPUTAÇÃO",
+]
+
+HEADER_LINES = [
+    "UNIVERSIDADE FEDERAL DO CEARÁ",
+    "SIGAA - Sistema Integrado de Gestão de Atividades Acadêmicas",
+    "HISTÓRICO ESCOLAR",
+    "Componentes Curriculares Cursados/Cursando",
+    "Ano/Período Letivo Componente Curricular Turma CH Freq % Nota Situação",
+]
+
+FOOTER_LINES = [
+    "Legenda: * Equivalência # Reposição @ Cumpriu § Dispensa e Trancamento",
+    "Carga Horária Total 3200 2100 1100",
+    "Carga Horária Optativa 384 128 0 256",
+    "Componentes Curriculares Obrigatórios Pendentes",
+    "CK0255 ENGENHARIA DE SOFTWARE 64 h",
+    "CK0301 COMPILADORES 96 h",
+    "Equivalências:",
+]
+
+LINES_PER_PAGE = 45
+
+
+@dataclass
+class SyntheticTranscript:
+    """
+    The generated lines of a transcript and what the parser should find in them.
+
+    Attributes:
+        lines: The text lines, in page order.
+        rows: The number of discipline rows written.
+        expected_disciplines: The number of rows the parser keeps (rows
+            without an '@' or '§' symbol and not SUPRIMIDO or APROVT INTERNO).
+    """
+
+    lines: List[str]
+    rows: int
+    expected_disciplines: int
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def generate_transcript(
+    semesters: int = 8,
+    disciplines_per_semester: int = 6,
+    trancado_rate: float = 0.08,
+    symbol_rate: float = 0.2,
+    start_year: int = 2018,
+    seed: int = 0,
+) -> SyntheticTranscript:
+    """
+    Generates a transcript with the given shape. The same arguments always
+    produce the same transcript.
+
+    Args:
+        semesters: Number of periods, starting at start_year.1.
+        disciplines_per_semester: Number of discipline rows in each period.
+        trancado_rate: Fraction of rows with the TRANCADO status.
+        symbol_rate: Fraction of rows with a symbol before the course code.
+        start_year: The year of the first period.
+        seed: Seed of the random generator.
+    """
+    rng = random.Random(seed)
+    lines = list(HEADER_LINES)
+    rows = expected = 0
+
+    year, semester = start_year, 1
+    for _ in range(semesters):
+        for i in range(disciplines_per_semester):
+            if rng.random() < trancado_rate:
+                status = "TRANCADO"
+            else:
+                status = rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+            symbol = rng.choice(SYMBOLS) if rng.random() < symbol_rate else ""
+            grade = "0.0" if status == "TRANCADO" else f"{rng.uniform(0, 10):.1f}"
+
+            # SIGAA prints the period only on the first row of each period
+            period = f"{year}.{semester} " if i == 0 else ""
+            code = f"{symbol} " if symbol else ""
+            code += f"CK{rng.randint(100, 9999):04d}"
+            lines.append(rng.choice(COURSE_NAMES))
+            lines.append(
+                f"{period}{code} T0{rng.randint(1, 9)} "
+                f"{rng.choice([32, 64, 96, 128])}.00 {rng.uniform(70, 100):.2f} "
+                f"{grade} {status}"
+            )
+
+            rows += 1
+            if symbol not in ("@", "§") and status not in (
+                "SUPRIMIDO",
+                "APROVT INTERNO",
+            ):
+                expected += 1
+
+        year, semester = (year, 2) if semester == 1 else (year + 1, 1)
+
+    lines.extend(FOOTER_LINES)
+    return SyntheticTranscript(lines=lines, rows=rows, expected_disciplines=expected)
+
+
+def _pdf_string(line: str) -> str:
+    encoded = line.encode("cp1252")
+    for char in (b"\\", b"(", b")"):
+        encoded = encoded.replace(char, b"\\" + char)
+    return encoded.decode("latin-1")
+
+
+def render_pdf(lines: List[str], lines_per_page: int = LINES_PER_PAGE) -> bytes:
+    """
+    Writes the lines into a minimal PDF, one line of Helvetica text per row
+    and lines_per_page rows per page.
+    """
+    pages = [
+        lines[i : i + lines_per_page] for i in range(0, len(lines), lines_per_page)
+    ]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica "
+        b"/Encoding /WinAnsiEncoding >>",
+    }
+    page_ids = []
+    next_id = 4
+    for page_lines in pages:
+        content = ["BT /F1 12 Tf 14 TL 40 800 Td"]
+        content += [f"({_pdf_string(line)}) Tj T*" for line in page_lines]
+        content.append("ET")
+        stream = "\n".join(content).encode("latin-1")
+
+        objects[next_id] = (
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        objects[next_id + 1] = (
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 900 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % next_id
+        )
+        page_ids.append(next_id + 1)
+        next_id += 2
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(out)
+        out += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % next_id
+    for object_id in range(1, next_id):
+        out += b"%010d 00000 n \n" % offsets[object_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        next_id,
+        xref_offset,
+    )
+    return bytes(out)
+
+
+def write_pdf(transcript: SyntheticTranscript, path: Path) -> Path:
+    """Renders the transcript as a PDF file and returns its path."""
+    path = Path(path)
+    path.write_bytes(render_pdf(transcript.lines))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output", type=Path, help="Arquivo PDF (ou .txt) a gerar.")
+    parser.add_argument("--semesters", type=int, default=8)
+    parser.add_argument("--disciplines", type=int, default=6)
+    parser.add_argument("--trancado-rate", type=float, default=0.08)
+    parser.add_argument("--symbol-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    transcript = generate_transcript(
+        semesters=args.semesters,
+        disciplines_per_semester=args.disciplines,
+        trancado_rate=args.trancado_rate,
+        symbol_rate=args.symbol_rate,
+        seed=args.seed,
+    )
+    if args.output.suffix.lower() == ".txt":
+        args.output.write_text(transcript.text, encoding="utf-8")
+    else:
+        write_pdf(transcript, args.output)
+    print(
+        f"{args.output}: {transcript.rows} linhas de disciplinas, "
+        f"{transcript.expected_disciplines} válidas."
+    )
+
+
+if __name__ == "__main__":
+    main()
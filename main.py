@@ -1,22 +1,145 @@
+import argparse
 import sys
 from pathlib import Path
 from src.pdf_parser import extract_disciplines
 from src.calculations import calculate_individual_ira, calculate_general_ira
+from src.batch import (
+    collect_pdf_paths,
+    iter_batch_records,
+    load_course_parameters,
+    write_records,
+)
+from src.course_stats import CourseStats
+
+MEDIA_CURSO = 7.2652
+DESVIO_CURSO = 1.8389
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Calcula o IRA a partir de um ou mais históricos do SIGAA."
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Arquivos PDF, diretórios ou padrões glob. Use '-' para ler caminhos da entrada padrão.",
+    )
+    parser.add_argument(
+        "--media", type=float, default=MEDIA_CURSO, help="Média do curso (IRAm)."
+    )
+    parser.add_argument(
+        "--desvio", type=float, default=DESVIO_CURSO, help="Desvio padrão (IRAdp)."
+    )
+    parser.add_argument(
+        "--curso", help="Nome do curso a buscar no arquivo de cursos (--cursos)."
+    )
+    parser.add_argument(
+        "--cursos",
+        type=Path,
+        help="CSV com as colunas curso, media e desvio (formato da tabela 'ira').",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Número de processos (modo lote)."
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=4,
+        help="Históricos enviados por vez a cada processo (modo lote).",
+    )
+    parser.add_argument(
+        "--formato",
+        choices=["csv", "ndjson"],
+        default="csv",
+        help="Formato da saída no modo lote.",
+    )
+    parser.add_argument(
+        "--saida", type=Path, help="Arquivo de saída (padrão: saída padrão)."
+    )
+    parser.add_argument(
+        "--estatisticas",
+        type=Path,
+        help="Salva a média e o desvio padrão do IRA-I dos históricos, como o curso "
+        "dado em --curso: em CSV no formato da tabela 'ira' ou, se o arquivo "
+        "terminar em .json, como um agregado parcial para --mesclar.",
+    )
+    parser.add_argument(
+        "--mesclar",
+        type=Path,
+        nargs="+",
+        default=[],
+        help="Agregados parciais (.json) de outras execuções somados às estatísticas.",
+    )
+    return parser.parse_args(argv)
+
+
+def aggregate_records(records, course: str, stats: CourseStats):
+    """Adds the IRA-I of every record without errors to the course's statistics,
+    passing the records through."""
+    for record in records:
+        if not record["error"] and record["ira_individual"] is not None:
+            stats.add(course, record["ira_individual"])
+        yield record
+
+
+def write_statistics(stats: CourseStats, path: Path):
+    if path.suffix.lower() == ".json":
+        stats.save(path)
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as out:
+            stats.write_csv(out)
 
 
 def main():
-    try:
-        pdf_path = Path(sys.argv[1])
-    except IndexError:
-        pdf_path = Path(input("Digite o caminho para o arquivo PDF: "))
-
-    MEDIA_CURSO = 7.2652
-    DESVIO_CURSO = 1.8389
-
-    disciplinas = extract_disciplines(pdf_path)
-    ira_i = calculate_individual_ira(disciplinas)
-    ira_g = calculate_general_ira(ira_i, MEDIA_CURSO, DESVIO_CURSO)
-    print(f"IRA-I: {ira_i:.3f}, IRA-G: {ira_g:.3f}")
+    args = parse_args()
+
+    course_avg, course_dev = args.media, args.desvio
+    if args.estatisticas and not args.curso:
+        sys.exit("Informe com --curso o curso dos históricos.")
+    if args.curso and args.cursos:
+        course_avg, course_dev = load_course_parameters(args.cursos, args.curso)
+    elif args.curso and not args.estatisticas:
+        sys.exit("Informe o arquivo de cursos com --cursos.")
+
+    sources = args.paths
+    if sources == ["-"]:
+        sources = sys.stdin.read().splitlines()
+    elif not sources:
+        sources = [input("Digite o caminho para o arquivo PDF: ")]
+
+    # A single PDF keeps the original one-line output
+    if len(sources) == 1 and Path(sources[0]).is_file() and not args.estatisticas:
+        disciplinas = extract_disciplines(Path(sources[0]))
+        ira_i = calculate_individual_ira(disciplinas)
+        ira_g = calculate_general_ira(ira_i, course_avg, course_dev)
+        print(f"IRA-I: {ira_i:.3f}, IRA-G: {ira_g:.3f}")
+        return
+
+    pdf_paths = collect_pdf_paths(sources)
+    if not pdf_paths:
+        sys.exit("Nenhum arquivo PDF encontrado.")
+
+    records = iter_batch_records(
+        pdf_paths,
+        course_avg,
+        course_dev,
+        workers=args.workers,
+        chunksize=args.chunksize,
+    )
+    stats = CourseStats()
+    for partial in args.mesclar:
+        stats.merge(CourseStats.load(partial))
+    if args.estatisticas:
+        records = aggregate_records(records, args.curso, stats)
+
+    if args.saida:
+        with open(args.saida, "w", newline="", encoding="utf-8") as out:
+            write_records(records, out, args.formato)
+    else:
+        write_records(records, sys.stdout, args.formato)
+
+    if args.estatisticas:
+        write_statistics(stats, args.estatisticas)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,126 @@
+from dataclasses import dataclass
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+from src.calculations import (
+    IraSums,
+    aggregate_per_period,
+    cumulative_ira,
+    grade_range_counts,
+    period_groups,
+)
+from src.transcript import STATUS_LABELS, Status, Transcript, period_label
+
+# Column names of the CSV export, in the app's language
+EXPORT_COLUMNS = {
+    "period": "Periodo",
+    "code": "Codigo",
+    "name": "Disciplina",
+    "status": "Status",
+    "grade": "Nota",
+    "credit_hours": "CH",
+    "symbol": "Simbolo",
+}
+
+
+@dataclass(frozen=True)
+class TranscriptAnalytics:
+    """
+    Everything the dashboard shows about a transcript, computed once.
+
+    Attributes:
+        transcript: The disciplines the series were computed from.
+        frame: One row per discipline, with the columns of Transcript.to_frame;
+            "period" and "status" are ordered categoricals.
+        ira_sums: The sums behind the Individual IRA, which the simulator adds
+            its disciplines to.
+        semesters: One row per period, sorted and indexed by its label, with
+            the mean grade ("grade"), the sum of the credit hours
+            ("credit_hours") and the cumulative Individual IRA ("ira").
+        grade_distribution: The number of graded disciplines in each grade
+            range, as returned by prepare_grade_distribution_data.
+    """
+
+    transcript: Transcript
+    frame: pd.DataFrame
+    ira_sums: IraSums
+    semesters: pd.DataFrame
+    grade_distribution: pd.Series
+
+    def __bool__(self) -> bool:
+        return bool(len(self.transcript))
+
+    @property
+    def individual_ira(self) -> float:
+        """The Individual IRA with every discipline."""
+        return self.ira_sums.ira
+
+    def export_frame(self) -> pd.DataFrame:
+        """Returns the disciplines with the column names of the CSV export."""
+        return self.frame.rename(columns=EXPORT_COLUMNS)
+
+
+def build_analytics(disciplines: Union[List[Dict], Transcript]) -> TranscriptAnalytics:
+    """
+    Builds the typed frame of a transcript and every dashboard series from a
+    single grouping of its disciplines by period.
+
+    Args:
+        disciplines: A Transcript, or the parser's list of discipline dictionaries.
+
+    Returns:
+        The TranscriptAnalytics of the transcript. The series are empty if it
+        has no disciplines.
+    """
+    transcript = Transcript.coerce(disciplines)
+    periods, first_rows, inverse = period_groups(transcript)
+    labels = [period_label(int(period)) for period in periods]
+
+    status_labels = [STATUS_LABELS[status] for status in Status]
+    frame = pd.DataFrame(
+        {
+            "period": pd.Categorical.from_codes(
+                inverse, categories=labels, ordered=True
+            ),
+            "code": transcript.codes,
+            "name": transcript.names,
+            "status": pd.Categorical.from_codes(
+                transcript.statuses, categories=status_labels, ordered=True
+            ),
+            "grade": transcript.grades,
+            "credit_hours": transcript.credit_hours,
+            "symbol": transcript.symbols,
+        },
+        copy=False,
+    )
+
+    # The same reductions as calculate_mean_grade_per_semester and
+    # prepare_hourly_load_data, so the dashboard shows the same numbers
+    def per_period(values: np.ndarray, how: str) -> np.ndarray:
+        return aggregate_per_period(transcript, values, how).to_numpy()
+
+    semesters = pd.DataFrame(
+        {
+            "grade": per_period(transcript.grades, "mean"),
+            "credit_hours": per_period(transcript.credit_hours, "sum"),
+            "ira": cumulative_ira(transcript, first_rows, inverse),
+        },
+        index=pd.Index(labels, name="period", dtype=object),
+    )
+
+    graded_grades = transcript.grades[transcript.graded_mask()]
+    grade_distribution = (
+        grade_range_counts(graded_grades)
+        if len(graded_grades)
+        else pd.Series(dtype=int)
+    )
+
+    return TranscriptAnalytics(
+        transcript=transcript,
+        frame=frame,
+        ira_sums=IraSums.from_transcript(transcript),
+        semesters=semesters,
+        grade_distribution=grade_distribution,
+    )
@@ -0,0 +1,238 @@
+import csv
+import glob
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import (
+    Deque,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Tuple,
+)
+
+from src.pdf_parser import parse_transcript
+from src.pdf_sniffer import sniff_transcript
+from src.calculations import calculate_individual_ira, calculate_general_ira
+
+RECORD_FIELDS = [
+    "path",
+    "layout_version",
+    "ira_individual",
+    "ira_geral",
+    "disciplines",
+    "required_hours",
+    "completed_hours",
+    "optional_pending_hours",
+    "parse_seconds",
+    "error",
+]
+
+
+def collect_pdf_paths(sources: Iterable[str]) -> List[Path]:
+    """
+    Expands the given sources into a sorted list of PDF files.
+
+    Each source may be a PDF file, a directory (searched recursively for
+    "*.pdf" files) or a glob pattern. Duplicates are removed.
+    """
+    paths = set()
+    for source in sources:
+        source = source.strip()
+        if not source:
+            continue
+        path = Path(source)
+        if path.is_dir():
+            paths.update(p for p in path.rglob("*") if p.suffix.lower() == ".pdf")
+        elif path.exists():
+            paths.add(path)
+        else:
+            paths.update(Path(p) for p in glob.glob(source, recursive=True))
+    return sorted(paths)
+
+
+def load_course_parameters(courses_file: Path, course_name: str) -> Tuple[float, float]:
+    """
+    Reads a course's mean (IRAm) and standard deviation (IRAdp) from a CSV file
+    shaped like the 'ira' table, with the columns 'curso', 'media' and 'desvio'.
+
+    Raises:
+        KeyError: If the course is not in the file.
+    """
+    with open(courses_file, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row["curso"].strip().upper() == course_name.strip().upper():
+                return float(row["media"]), float(row["desvio"])
+    raise KeyError(f"Curso '{course_name}' não encontrado em {courses_file}")
+
+
+def process_transcript(pdf_path: Path, course_avg: float, course_dev: float) -> Dict:
+    """
+    Parses a single transcript and computes its IRA. Failures are reported in
+    the 'error' field of the record instead of being raised.
+    """
+    record = dict.fromkeys(RECORD_FIELDS)
+    record["path"] = str(pdf_path)
+
+    start = time.perf_counter()
+    try:
+        # Files that are not transcripts are rejected before the full extraction
+        sniff = sniff_transcript(pdf_path)
+        record["layout_version"] = sniff.layout_version
+        if not sniff.is_transcript:
+            raise ValueError(sniff.reason)
+
+        # The batch already runs one transcript per process
+        transcript = parse_transcript(pdf_path, workers=1)
+        disciplines = transcript.discipline_table
+        credit_summary = transcript.credit_summary
+
+        ira_i = calculate_individual_ira(disciplines)
+        record["ira_individual"] = round(ira_i, 4)
+        record["ira_geral"] = calculate_general_ira(ira_i, course_avg, course_dev)
+        record["disciplines"] = len(disciplines)
+        record["required_hours"] = credit_summary["required_hours"]
+        record["completed_hours"] = credit_summary["completed_hours"]
+        record["optional_pending_hours"] = credit_summary["optional_pending_hours"]
+        if not disciplines:
+            record["error"] = "Nenhuma disciplina válida encontrada"
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["parse_seconds"] = round(time.perf_counter() - start, 4)
+
+    return record
+
+
+def _process_chunk(
+    pdf_paths: List[Path], course_avg: float, course_dev: float
+) -> List[Dict]:
+    return [process_transcript(p, course_avg, course_dev) for p in pdf_paths]
+
+
+def _failed_record(pdf_path: Path, error: Exception) -> Dict:
+    record = dict.fromkeys(RECORD_FIELDS)
+    record["path"] = str(pdf_path)
+    record["error"] = f"{type(error).__name__}: {error}"
+    return record
+
+
+def _run_chunks(
+    chunks: Deque[List[Path]], course_avg: float, course_dev: float, workers: int
+) -> Generator[Dict, None, List[Path]]:
+    """
+    Runs the chunks in a new process pool, yielding their records, until they
+    are all done or a worker process dies. Returns the transcripts of the
+    chunks lost with the broken pool; the chunks never submitted are left in
+    the deque.
+    """
+    # Bounded, so that a broken pool only takes the chunks in flight with it
+    max_in_flight = 2 * workers
+    in_flight: Dict[Future, List[Path]] = {}
+    lost = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while chunks or in_flight:
+            while chunks and not lost and len(in_flight) < max_in_flight:
+                chunk = chunks.popleft()
+                future = executor.submit(_process_chunk, chunk, course_avg, course_dev)
+                in_flight[future] = chunk
+            if not in_flight:
+                break
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = in_flight.pop(future)
+                try:
+                    yield from future.result()
+                except BrokenProcessPool:
+                    # Every chunk still in flight fails the same way
+                    lost.extend(chunk)
+                except Exception as e:
+                    # The chunk's records could not be returned (e.g. pickling)
+                    for pdf_path in chunk:
+                        yield _failed_record(pdf_path, e)
+    return lost
+
+
+def _run_isolated(
+    pdf_paths: List[Path], course_avg: float, course_dev: float
+) -> Iterator[Dict]:
+    """
+    Runs the transcripts one at a time in a single worker process, so that a
+    crash is pinned on the transcript that caused it. The pool is replaced
+    after each crash.
+    """
+    executor = None
+    try:
+        for pdf_path in pdf_paths:
+            if executor is None:
+                executor = ProcessPoolExecutor(max_workers=1)
+            future = executor.submit(_process_chunk, [pdf_path], course_avg, course_dev)
+            try:
+                yield from future.result()
+            except BrokenProcessPool as e:
+                executor.shutdown(wait=True)
+                executor = None
+                yield _failed_record(pdf_path, e)
+            except Exception as e:
+                yield _failed_record(pdf_path, e)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+def iter_batch_records(
+    pdf_paths: List[Path],
+    course_avg: float,
+    course_dev: float,
+    workers: Optional[int] = None,
+    chunksize: int = 1,
+) -> Iterator[Dict]:
+    """
+    Processes the transcripts in a process pool, yielding one record per
+    transcript as soon as the chunk containing it finishes (so records are not
+    in input order).
+
+    A worker process that dies (e.g. out of memory, or a crash in a native
+    library) breaks the whole pool. The chunks that were in flight are then
+    run again one transcript at a time, so that only the transcript that
+    crashes is reported as failed, and the remaining chunks go to a new pool.
+
+    Args:
+        pdf_paths: The transcripts to process.
+        course_avg: The course mean (IRAm) used for the IRA Geral.
+        course_dev: The course standard deviation (IRAdp) used for the IRA Geral.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        chunksize: Number of transcripts sent to a worker at a time.
+    """
+    chunksize = max(1, chunksize)
+    chunks = deque(
+        pdf_paths[i : i + chunksize] for i in range(0, len(pdf_paths), chunksize)
+    )
+    workers = workers or os.cpu_count() or 1
+
+    while chunks:
+        lost = yield from _run_chunks(chunks, course_avg, course_dev, workers)
+        if lost:
+            yield from _run_isolated(lost, course_avg, course_dev)
+
+
+def write_records(records: Iterable[Dict], out: TextIO, output_format: str = "csv"):
+    """Writes the records to the stream as CSV or NDJSON, flushing after each one."""
+    writer = None
+    if output_format == "csv":
+        writer = csv.DictWriter(out, fieldnames=RECORD_FIELDS)
+        writer.writeheader()
+
+    for record in records:
+        if writer is not None:
+            writer.writerow(record)
+        else:
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
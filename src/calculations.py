@@ -1,63 +1,152 @@
-from typing import List, Dict
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
+from src.transcript import Transcript, Status, period_label
 
+# The calculations accept either the parser's list of dictionaries or a
+# Transcript. Callers that run several of them should build the Transcript
+# once and pass it to each.
+Disciplines = Union[List[Dict], Transcript]
 
-def calculate_individual_ira(disciplines: List[Dict]) -> float:
+
+@dataclass(frozen=True)
+class IraSums:
+    """
+    The sums the Individual IRA is computed from. Adding disciplines to a
+    transcript only adds to them, so the IRA of a transcript plus a few more
+    disciplines costs as much as those disciplines, not the whole history.
+
+    Attributes:
+        start_semester: The semester index of the first period, which anchors
+            the period weights, or None for an empty transcript.
+        numerator: The sum of weight * credit hours * grade of the graded
+            disciplines.
+        denominator: The sum of weight * credit hours of the graded disciplines.
+        dropped_hours: The credit hours of the dropped ('TRANCADO') disciplines.
+        total_hours: The credit hours of all disciplines.
+    """
+
+    start_semester: Optional[int] = None
+    numerator: float = 0.0
+    denominator: float = 0.0
+    dropped_hours: float = 0.0
+    total_hours: float = 0.0
+
+    @classmethod
+    def from_transcript(cls, disciplines: Disciplines) -> "IraSums":
+        transcript = Transcript.coerce(disciplines)
+        if not len(transcript):
+            return cls()
+
+        # Find the student's starting period for relative semester calculation
+        start_semester = int(transcript.semesters[transcript.periods.argmin()])
+
+        hours = transcript.credit_hours
+        graded = transcript.graded_mask()
+
+        # Relative semester number of each graded course, capped at 6
+        period_weights = np.minimum(
+            6, transcript.semesters[graded] - start_semester + 1
+        )
+        weighted_hours = period_weights * hours[graded]
+
+        return cls(
+            start_semester=start_semester,
+            numerator=_sequential_sum(weighted_hours * transcript.grades[graded]),
+            denominator=_sequential_sum(weighted_hours),
+            # T = Sum of credit hours for dropped courses ('TRANCADO')
+            dropped_hours=_sequential_sum(
+                hours[transcript.statuses == Status.TRANCADO]
+            ),
+            # C = Sum of credit hours for all attempted courses
+            total_hours=_sequential_sum(hours),
+        )
+
+    def add_graded(
+        self, semesters: np.ndarray, grades: np.ndarray, credit_hours: np.ndarray
+    ) -> "IraSums":
+        """
+        Returns the sums with graded disciplines added, in time proportional to
+        their number.
+
+        Args:
+            semesters: The semester index of each discipline's period (year * 2 +
+                semester), none of them before start_semester.
+            grades: The grade of each discipline.
+            credit_hours: The credit hours of each discipline.
+        """
+        semesters = np.asarray(semesters)
+        credit_hours = np.asarray(credit_hours, dtype=np.float64)
+        if not len(semesters):
+            return self
+
+        weighted_hours = self.period_weights(semesters) * credit_hours
+        start_semester = self.start_semester
+        if start_semester is None:
+            start_semester = int(semesters.min())
+        return IraSums(
+            start_semester=start_semester,
+            numerator=self.numerator + float(weighted_hours @ np.asarray(grades)),
+            denominator=self.denominator + float(weighted_hours.sum()),
+            dropped_hours=self.dropped_hours,
+            total_hours=self.total_hours + float(credit_hours.sum()),
+        )
+
+    def period_weights(self, semesters: np.ndarray) -> np.ndarray:
+        """
+        Returns the weight of disciplines added in the given semesters: their
+        semester number counted from the first period (the first of the given
+        semesters if the transcript is empty), capped at 6.
+
+        Raises:
+            ValueError: If a semester comes before the first period.
+        """
+        semesters = np.asarray(semesters)
+        if not len(semesters):
+            return np.zeros(0, dtype=int)
+        start_semester = self.start_semester
+        if start_semester is None:
+            start_semester = int(semesters.min())
+        elif semesters.min() < start_semester:
+            raise ValueError("Disciplines cannot be added before the first period")
+        return np.minimum(6, semesters - start_semester + 1)
+
+    @property
+    def ira(self) -> float:
+        """The Individual IRA of the disciplines summed."""
+        if self.total_hours == 0:
+            return 0.0
+        penalty_factor = 1.0 - (0.5 * self.dropped_hours) / self.total_hours
+
+        if self.denominator == 0:
+            return 0.0
+        weighted_average = self.numerator / self.denominator
+
+        individual_ira = penalty_factor * weighted_average
+        return float(individual_ira)
+
+
+def _sequential_sum(values: np.ndarray) -> float:
+    # Adds the values one at a time in row order, as a loop over the
+    # disciplines does. np.sum and np.dot add in blocks, which can change the
+    # last bits of the result.
+    return float(np.cumsum(values)[-1]) if len(values) else 0.0
+
+
+def calculate_individual_ira(disciplines: Disciplines) -> float:
     """
     Calculates the Individual Academic Performance Index (IRA).
 
     Args:
-        disciplines: A list of dictionaries, where each dictionary represents a course
-                     with keys 'period', 'status', 'grade', and 'credit_hours'.
+        disciplines: A Transcript, or a list of dictionaries where each dictionary
+                     represents a course with keys 'period', 'status', 'grade',
+                     and 'credit_hours'.
 
     Returns:
         The calculated Individual IRA as a float.
     """
-    if not disciplines:
-        return 0.0
-
-    # Find the student's starting period for relative semester calculation
-    first_period = min(d["period"] for d in disciplines)
-    start_year, start_semester = map(int, first_period.split("."))
-
-    # T = Sum of credit hours for dropped courses ('TRANCADO')
-    dropped_hours_sum = sum(
-        d["credit_hours"] for d in disciplines if d["status"] == "TRANCADO"
-    )
-    # C = Sum of credit hours for all attempted courses
-    total_hours_sum = sum(d["credit_hours"] for d in disciplines)
-
-    numerator = 0.0
-    denominator = 0.0
-
-    filtered_disciplines = [
-        d
-        for d in disciplines
-        if d["status"] in ["APROVADO", "APROVADO MÉDIA", "REPROVADO"]
-    ]
-
-    for discipline in filtered_disciplines:
-        credit_hours = discipline["credit_hours"]
-        grade = discipline["grade"]
-        year, semester = map(int, discipline["period"].split("."))
-
-        # Calculate the relative semester number
-        semester_number = (year - start_year) * 2 + (semester - start_semester) + 1
-        period_weight = min(6, semester_number)
-
-        numerator += period_weight * credit_hours * grade
-        denominator += period_weight * credit_hours
-
-    if total_hours_sum == 0:
-        return 0.0
-    penalty_factor = 1.0 - (0.5 * dropped_hours_sum) / total_hours_sum
-
-    if denominator == 0:
-        return 0.0
-    weighted_average = numerator / denominator
-
-    individual_ira = penalty_factor * weighted_average
-    return individual_ira
+    return IraSums.from_transcript(disciplines).ira
 
 
 def calculate_general_ira(
@@ -84,7 +173,116 @@ def calculate_general_ira(
     return round(capped_ira, 3)
 
 
-def calculate_semester_ira(disciplines: List[Dict]) -> Dict[str, float]:
+def calculate_general_iras(
+    individual_iras: np.ndarray,
+    course_average: Union[float, np.ndarray],
+    course_deviation: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    Calculates the General IRA of many Individual IRAs at once, as
+    calculate_general_ira does for one.
+
+    Args:
+        individual_iras: The Individual IRAs.
+        course_average: The average IRA for the course, or one per Individual IRA.
+        course_deviation: The standard deviation of the IRA for the course, or
+            one per Individual IRA.
+
+    Returns:
+        An array with the General IRA of each Individual IRA, capped between 0
+        and 10 and rounded to 3 decimal places.
+    """
+    averages = np.asarray(course_average, dtype=np.float64)
+    deviations = np.asarray(course_deviation, dtype=np.float64)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        general_iras = 6 + 2 * ((np.asarray(individual_iras) - averages) / deviations)
+    general_iras = np.where(deviations == 0, 6.0, general_iras)
+    return np.round(np.clip(general_iras, 0.0, 10.0), 3)
+
+
+def calculate_required_average(
+    current: IraSums,
+    semesters: np.ndarray,
+    credit_hours: np.ndarray,
+    target_ira: float,
+) -> Optional[float]:
+    """
+    Finds the uniform grade the planned disciplines need for the Individual
+    IRA to reach a target.
+
+    The IRA is linear in a grade shared by all the planned disciplines, so
+    the grade is solved for directly and then adjusted by the few units in
+    the last place lost to rounding.
+
+    Args:
+        current: The sums of the disciplines already taken.
+        semesters: The semester index (year * 2 + semester) of each planned
+            discipline's period.
+        credit_hours: The credit hours of each planned discipline.
+        target_ira: The Individual IRA to reach.
+
+    Returns:
+        The smallest grade, between 0 and 10, with which every planned
+        discipline brings the IRA to at least the target; 0.0 if any grades
+        will do, or None if not even 10 in all of them reaches the target.
+    """
+    semesters = np.asarray(semesters)
+    credit_hours = np.asarray(credit_hours, dtype=np.float64)
+
+    def ira_with(grade: float) -> float:
+        grades = np.full(len(semesters), grade)
+        return current.add_graded(semesters, grades, credit_hours).ira
+
+    if ira_with(0.0) >= target_ira:
+        return 0.0
+    if ira_with(10.0) < target_ira:
+        return None
+
+    # IRA(g) = penalty * (N + W * g) / (D + W), with W the weighted hours of
+    # the planned disciplines, which is positive here
+    planned = current.add_graded(semesters, np.zeros(len(semesters)), credit_hours)
+    weighted_hours = planned.denominator - current.denominator
+    penalty_factor = 1.0 - (0.5 * planned.dropped_hours) / planned.total_hours
+    grade = (
+        target_ira * planned.denominator / penalty_factor - current.numerator
+    ) / weighted_hours
+    grade = min(max(grade, 0.0), 10.0)
+
+    while ira_with(grade) < target_ira:
+        grade = float(np.nextafter(grade, np.inf))
+    while grade > 0 and ira_with(float(np.nextafter(grade, -np.inf))) >= target_ira:
+        grade = float(np.nextafter(grade, -np.inf))
+    return grade
+
+
+def calculate_required_individual_ira(
+    target_general_ira: float, course_average: float, course_deviation: float
+) -> Optional[float]:
+    """
+    Inverts calculate_general_ira: finds the Individual IRA whose General IRA
+    reaches a target.
+
+    Args:
+        target_general_ira: The General IRA to reach.
+        course_average: The average IRA for the course.
+        course_deviation: The standard deviation of the IRA for the course.
+
+    Returns:
+        The smallest Individual IRA with at least the target General IRA, or
+        None if no Individual IRA reaches it.
+    """
+    if target_general_ira > 10:
+        return None
+    if target_general_ira <= 0:
+        return 0.0
+    if course_deviation == 0:
+        # The General IRA is always 6 when the course has no deviation
+        return 0.0 if target_general_ira <= 6 else None
+    return max(0.0, course_average + (target_general_ira - 6) * course_deviation / 2)
+
+
+def calculate_semester_ira(disciplines: Disciplines) -> Dict[str, float]:
     """
     Calculates the cumulative Individual IRA at the end of each completed semester.
 
@@ -95,100 +293,209 @@ def calculate_semester_ira(disciplines: List[Dict]) -> Dict[str, float]:
         A dictionary where the key is the period (e.g., "2022.1") and the value is
         the Individual IRA calculated with all disciplines up to that point.
     """
-    if not disciplines:
+    transcript = Transcript.coerce(disciplines)
+    if not len(transcript):
         return {}
 
-    semester_iras = {}
-    completed_periods = sorted(list(set(d["period"] for d in disciplines)))
+    periods, first_rows, inverse = period_groups(transcript)
+    semester_iras = cumulative_ira(transcript, first_rows, inverse)
+    return {
+        period_label(int(period)): float(ira)
+        for period, ira in zip(periods, semester_iras)
+    }
 
-    for period in completed_periods:
-        disciplines_until_period = [d for d in disciplines if d["period"] <= period]
 
-        ira_for_period = calculate_individual_ira(disciplines_until_period)
-        semester_iras[period] = ira_for_period
+def period_groups(transcript: Transcript) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Groups the disciplines of a transcript by period.
 
-    return semester_iras
+    Args:
+        transcript: The disciplines to group.
 
+    Returns:
+        The sorted unique period codes, the first row of each period and, for
+        each row, the position of its period among the sorted ones.
+    """
+    return np.unique(transcript.periods, return_index=True, return_inverse=True)
+
+
+def cumulative_ira(
+    transcript: Transcript, first_rows: np.ndarray, inverse: np.ndarray
+) -> np.ndarray:
+    """
+    Calculates the Individual IRA with all disciplines up to each period, from
+    running sums over the rows sorted by period, read at the last row of each.
+
+    The rows keep their order within a period and each sum adds them one at a
+    time, so on a transcript listed in period order, as SIGAA prints it, every
+    value is exactly calculate_individual_ira of the disciplines up to that
+    period.
 
-def calculate_mean_grade_per_semester(disciplines: List[Dict]) -> pd.Series:
+    Args:
+        transcript: The disciplines of the transcript.
+        first_rows: The first row of each period, as returned by period_groups.
+        inverse: The position of each row's period, as returned by
+            period_groups.
+
+    Returns:
+        The cumulative Individual IRA of each period, in the sorted order of
+        the periods.
+    """
+    periods = len(first_rows)
+    if not periods:
+        return np.empty(0)
+
+    order = np.argsort(inverse, kind="stable")
+    last_rows = np.cumsum(np.bincount(inverse, minlength=periods)) - 1
+
+    hours = transcript.credit_hours[order]
+    graded = transcript.graded_mask()[order]
+    dropped = (transcript.statuses == Status.TRANCADO)[order]
+
+    # The period weights stay anchored to the first period, as in
+    # calculate_individual_ira
+    semesters = transcript.semesters[order]
+    period_weights = np.minimum(6, semesters - semesters[0] + 1)
+    weighted_hours = np.where(graded, period_weights * hours, 0.0)
+    weighted_grades = np.where(graded, weighted_hours * transcript.grades[order], 0.0)
+
+    numerators = np.cumsum(weighted_grades)[last_rows]
+    denominators = np.cumsum(weighted_hours)[last_rows]
+    dropped_hours_sums = np.cumsum(np.where(dropped, hours, 0.0))[last_rows]
+    total_hours_sums = np.cumsum(hours)[last_rows]
+
+    valid = (total_hours_sums != 0) & (denominators != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        penalty_factors = 1.0 - (0.5 * dropped_hours_sums) / total_hours_sums
+        iras = penalty_factors * (numerators / denominators)
+    return np.where(valid, iras, 0.0)
+
+
+def aggregate_per_period(
+    transcript: Transcript, values: np.ndarray, how: str
+) -> pd.Series:
+    """
+    Reduces a column of the transcript per period with a pandas groupby, so
+    that the sums match those of a DataFrame grouped by the period labels:
+    pandas adds the values of each group in row order with compensated
+    summation, whatever the type of the keys.
+
+    Args:
+        transcript: The disciplines of the transcript.
+        values: One value per discipline.
+        how: The name of the pandas aggregation, e.g. "sum" or "mean".
+
+    Returns:
+        A Series indexed by the sorted period labels (named "period").
+    """
+    # The period codes sort like the period labels
+    aggregated = pd.Series(values, copy=False).groupby(transcript.periods).agg(how)
+    aggregated.index = pd.Index(
+        [period_label(int(p)) for p in aggregated.index], name="period", dtype=object
+    )
+    return aggregated
+
+
+def calculate_mean_grade_per_semester(disciplines: Disciplines) -> pd.Series:
     """
     Calculates the mean grade for each semester.
 
     Args:
-        disciplines (List[Dict]): A list of course dictionaries. Each dictionary
-            must contain at least a 'period' (e.g., '2022.1') and a 'grade' key.
+        disciplines (Disciplines): A Transcript or a list of course dictionaries.
+            Each dictionary must contain at least a 'period' (e.g., '2022.1') and
+            a 'grade' key.
 
     Returns:
         pd.Series: A Pandas Series where the index contains the sorted semester
             periods (str) and the values are the corresponding mean grades (float).
             Returns an empty Series if the input list is empty.
     """
-    if not disciplines:
+    transcript = Transcript.coerce(disciplines)
+    if not len(transcript):
         return pd.Series(dtype=float)
 
-    df = pd.DataFrame(disciplines)
-    mean_grades_per_semester = df.groupby("period")["grade"].mean().sort_index()
+    mean_grades_per_semester = aggregate_per_period(
+        transcript, transcript.grades, "mean"
+    ).rename("grade")
     return mean_grades_per_semester
 
 
-def prepare_hourly_load_data(disciplines: List[Dict]) -> pd.Series:
+def prepare_hourly_load_data(disciplines: Disciplines) -> pd.Series:
     """
     Groups disciplines by period and sums their credit hours for plotting.
 
     Args:
-        disciplines: The full list of extracted disciplines.
+        disciplines: The full list of extracted disciplines, or a Transcript.
 
     Returns:
         A Pandas Series with the period as the index and the sum of credit hours
         as the value.
     """
-    if not disciplines:
+    transcript = Transcript.coerce(disciplines)
+    if not len(transcript):
         return pd.Series(dtype=float)
 
-    df = pd.DataFrame(disciplines)
-    hourly_load_per_semester = df.groupby("period")["credit_hours"].sum()
+    hourly_load_per_semester = aggregate_per_period(
+        transcript, transcript.credit_hours, "sum"
+    ).rename("credit_hours")
     return hourly_load_per_semester
 
 
-def prepare_grade_distribution_data(disciplines: List[Dict]) -> pd.Series:
+def prepare_grade_distribution_data(disciplines: Disciplines) -> pd.Series:
     """
     Calculates the distribution of grades by grouping them into bins.
 
     Args:
-        disciplines: The full list of extracted disciplines.
+        disciplines: The full list of extracted disciplines, or a Transcript.
 
     Returns:
         A Pandas Series with grade ranges as the index and the count of
         disciplines in each range as the value.
     """
-    if not disciplines:
+    transcript = Transcript.coerce(disciplines)
+    if not len(transcript):
         return pd.Series(dtype=int)
 
-    df = pd.DataFrame(disciplines)
+    valid_grades = transcript.grades[transcript.graded_mask()]
 
-    df_valid_grades = df[
-        df["status"].str.contains("APROVADO|REPROVADO", case=False, na=False)
-    ].copy()
-
-    if df_valid_grades.empty:
+    if not len(valid_grades):
         return pd.Series(dtype=int)
 
-    bins = [0, 5, 7, 8, 9, 10.1]
-    labels = [
-        "Ruim (<5)",
-        "Regular (5-7)",
-        "Bom (7-8)",
-        "Otimo (8-9)",
-        "Excelente (9-10)",
-    ]
-
-    df_valid_grades["Grade Range"] = pd.cut(
-        df_valid_grades["grade"],
-        bins=bins,
-        labels=labels,
-        right=False,
-        include_lowest=True,
-    )
+    return grade_range_counts(valid_grades)
 
-    grade_counts = df_valid_grades["Grade Range"].value_counts().sort_index()
-    return grade_counts
+
+# Grade ranges of the distribution chart: each includes its lower edge only
+GRADE_BINS = np.array([0, 5, 7, 8, 9, 10.1])
+GRADE_RANGE_LABELS = [
+    "Ruim (<5)",
+    "Regular (5-7)",
+    "Bom (7-8)",
+    "Otimo (8-9)",
+    "Excelente (9-10)",
+]
+
+
+def grade_range_counts(grades: np.ndarray) -> pd.Series:
+    """
+    Counts the grades in each range of the distribution chart (GRADE_BINS).
+
+    Args:
+        grades: The grades to count.
+
+    Returns:
+        A Series with the number of grades in each range, indexed by the
+        ordered GRADE_RANGE_LABELS. Grades outside every range are not
+        counted.
+    """
+    # The range of each grade is found by looking its bin index up in the
+    # sorted edges
+    bins = np.searchsorted(GRADE_BINS, grades, side="right") - 1
+    in_range = (bins >= 0) & (bins < len(GRADE_RANGE_LABELS))
+    counts = np.bincount(bins[in_range], minlength=len(GRADE_RANGE_LABELS))
+    index = pd.CategoricalIndex(
+        GRADE_RANGE_LABELS,
+        categories=GRADE_RANGE_LABELS,
+        ordered=True,
+        name="Grade Range",
+    )
+    return pd.Series(counts, index=index, name="count")
@@ -0,0 +1,282 @@
+from typing import Hashable, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.calculations import calculate_general_iras
+from src.transcript import GRADED_STATUSES, Status, Transcript, frozen_view
+
+# Period codes (see period_code) are below this bound, so that a student's
+# position times the bound plus a period code identifies a student's period
+PERIOD_CODE_BOUND = 100000
+
+
+class Cohort:
+    """
+    The disciplines of many students in one column-oriented table, one row
+    per discipline, so that the IRA of a whole entry class is computed with a
+    handful of grouped NumPy reductions instead of a Python loop per student.
+
+    The rows may come in any order. The students are numbered by the sorted
+    order of their ids, and every result of this module is aligned with
+    Cohort.students.
+
+    Attributes:
+        students: The sorted, unique student ids.
+        student_index: The position in students of each row's student.
+        periods: The period of each discipline, encoded by period_code.
+        semesters: The semester index of each period (year * 2 + semester).
+        statuses: The Status of each discipline.
+        grades: The grade of each discipline.
+        credit_hours: The credit hours of each discipline.
+    """
+
+    __slots__ = (
+        "students",
+        "student_index",
+        "periods",
+        "semesters",
+        "statuses",
+        "grades",
+        "credit_hours",
+    )
+
+    def __init__(
+        self,
+        student_ids: Iterable[Hashable],
+        periods: Iterable[int],
+        statuses: Iterable[int],
+        grades: Iterable[float],
+        credit_hours: Iterable[float],
+    ):
+        students, student_index = np.unique(
+            np.asarray(student_ids), return_inverse=True
+        )
+        self.students = frozen_view(students)
+        self.student_index = frozen_view(student_index.astype(np.int64).reshape(-1))
+        self.periods = frozen_view(np.asarray(periods, dtype=np.int32))
+        self.semesters = frozen_view(self.periods // 10 * 2 + self.periods % 10)
+        self.statuses = frozen_view(np.asarray(statuses, dtype=np.uint8))
+        self.grades = frozen_view(np.asarray(grades, dtype=np.float64))
+        self.credit_hours = frozen_view(np.asarray(credit_hours, dtype=np.float64))
+
+        size = len(self.student_index)
+        for column in (self.periods, self.statuses, self.grades, self.credit_hours):
+            if len(column) != size:
+                raise ValueError(
+                    "All the columns of a cohort must have the same length"
+                )
+
+    @classmethod
+    def from_transcripts(cls, transcripts: Mapping[Hashable, Transcript]) -> "Cohort":
+        """Builds the table from each student's Transcript, keyed by student id."""
+        transcripts = {
+            student: Transcript.coerce(transcript)
+            for student, transcript in transcripts.items()
+        }
+        ids = [
+            student
+            for student, transcript in transcripts.items()
+            for _ in range(len(transcript))
+        ]
+
+        def column(name: str) -> np.ndarray:
+            arrays = [getattr(t, name) for t in transcripts.values()]
+            return np.concatenate(arrays) if arrays else np.empty(0)
+
+        return cls(
+            ids,
+            column("periods"),
+            column("statuses"),
+            column("grades"),
+            column("credit_hours"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.student_index)
+
+    def __repr__(self) -> str:
+        return f"Cohort({len(self.students)} students, {len(self)} disciplines)"
+
+    def graded_mask(self) -> np.ndarray:
+        """Whether each discipline's grade counts towards the IRA."""
+        return np.isin(self.statuses, GRADED_STATUSES)
+
+    def period_weights(self) -> np.ndarray:
+        """
+        The weight of each discipline's period: its semester number counted
+        from the student's first period, capped at 6.
+        """
+        # Both arrays share a dtype, which keeps np.minimum.at on its fast path
+        start_semesters = np.full(
+            len(self.students), np.iinfo(np.int32).max, dtype=self.semesters.dtype
+        )
+        np.minimum.at(start_semesters, self.student_index, self.semesters)
+        return np.minimum(6, self.semesters - start_semesters[self.student_index] + 1)
+
+
+def _individual_ira(
+    numerator: np.ndarray,
+    denominator: np.ndarray,
+    dropped_hours: np.ndarray,
+    total_hours: np.ndarray,
+) -> np.ndarray:
+    # The IRA formula of calculate_individual_ira, on arrays of sums; the IRA
+    # is 0.0 where a student has no hours or no graded discipline
+    valid = (total_hours != 0) & (denominator != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        penalty_factor = 1.0 - (0.5 * dropped_hours) / total_hours
+        iras = penalty_factor * (numerator / denominator)
+    return np.where(valid, iras, 0.0)
+
+
+def calculate_cohort_individual_ira(cohort: Cohort) -> np.ndarray:
+    """
+    Calculates the Individual IRA of every student of the cohort, as
+    calculate_individual_ira does for one student.
+
+    Args:
+        cohort: The disciplines of the students.
+
+    Returns:
+        An array with the Individual IRA of each student, aligned with
+        cohort.students.
+    """
+    students = len(cohort.students)
+    hours = cohort.credit_hours
+    weighted_hours = np.where(cohort.graded_mask(), cohort.period_weights() * hours, 0)
+    dropped_hours = np.where(cohort.statuses == Status.TRANCADO, hours, 0)
+
+    def per_student(values: np.ndarray) -> np.ndarray:
+        return np.bincount(cohort.student_index, weights=values, minlength=students)
+
+    return _individual_ira(
+        per_student(weighted_hours * cohort.grades),
+        per_student(weighted_hours),
+        per_student(dropped_hours),
+        per_student(hours),
+    )
+
+
+def calculate_cohort_general_ira(
+    individual_iras: np.ndarray,
+    course_index: np.ndarray,
+    course_averages: np.ndarray,
+    course_deviations: np.ndarray,
+) -> np.ndarray:
+    """
+    Calculates the General IRA of every student, as calculate_general_ira
+    does for one student.
+
+    Args:
+        individual_iras: The Individual IRA of each student.
+        course_index: The position of each student's course in the course arrays.
+        course_averages: The average IRA of each course.
+        course_deviations: The standard deviation of the IRA of each course.
+
+    Returns:
+        An array with the General IRA of each student, capped between 0 and 10
+        and rounded to 3 decimal places.
+    """
+    course_index = np.asarray(course_index)
+    averages = np.asarray(course_averages, dtype=np.float64)[course_index]
+    deviations = np.asarray(course_deviations, dtype=np.float64)[course_index]
+    return calculate_general_iras(individual_iras, averages, deviations)
+
+
+def calculate_cohort_semester_ira(cohort: Cohort) -> pd.DataFrame:
+    """
+    Calculates the cumulative Individual IRA of every student at the end of
+    each of their periods, as calculate_semester_ira does for one student.
+
+    Args:
+        cohort: The disciplines of the students.
+
+    Returns:
+        A DataFrame with one row per student and period, sorted by both, and
+        the columns "student", "period" (encoded by period_code) and "ira".
+    """
+    if not len(cohort):
+        return pd.DataFrame(
+            {
+                "student": cohort.students[:0],
+                "period": np.empty(0, dtype=np.int32),
+                "ira": np.empty(0),
+            }
+        )
+
+    # One group per student and period, numbered in (student, period) order
+    keys = cohort.student_index * PERIOD_CODE_BOUND + cohort.periods
+    group_keys, group_index = np.unique(keys, return_inverse=True)
+    group_students = group_keys // PERIOD_CODE_BOUND
+    group_periods = (group_keys % PERIOD_CODE_BOUND).astype(np.int32)
+
+    # The position of each group among its student's periods, which lays the
+    # per-period sums out as a students x periods matrix
+    first_groups = np.searchsorted(group_students, np.arange(len(cohort.students)))
+    ranks = np.arange(len(group_keys)) - first_groups[group_students]
+    shape = (len(cohort.students), int(ranks.max()) + 1)
+
+    hours = cohort.credit_hours
+    weighted_hours = np.where(cohort.graded_mask(), cohort.period_weights() * hours, 0)
+    dropped_hours = np.where(cohort.statuses == Status.TRANCADO, hours, 0)
+
+    def cumulative(values: np.ndarray) -> np.ndarray:
+        sums = np.zeros(shape)
+        sums[group_students, ranks] = np.bincount(
+            group_index, weights=values, minlength=len(group_keys)
+        )
+        return np.cumsum(sums, axis=1)[group_students, ranks]
+
+    iras = _individual_ira(
+        cumulative(weighted_hours * cohort.grades),
+        cumulative(weighted_hours),
+        cumulative(dropped_hours),
+        cumulative(hours),
+    )
+    return pd.DataFrame(
+        {
+            "student": cohort.students[group_students],
+            "period": group_periods,
+            "ira": iras,
+        }
+    )
+
+
+def calculate_cohort_ira(
+    cohort: Cohort,
+    course_index: Optional[np.ndarray] = None,
+    course_averages: Optional[np.ndarray] = None,
+    course_deviations: Optional[np.ndarray] = None,
+    semesters: bool = False,
+) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Calculates the IRA of every student of the cohort.
+
+    Args:
+        cohort: The disciplines of the students.
+        course_index: The position of each student's course in the course
+            arrays. Without it, only the Individual IRA is calculated.
+        course_averages: The average IRA of each course.
+        course_deviations: The standard deviation of the IRA of each course.
+        semesters: Whether to also return the cumulative IRA per period (see
+            calculate_cohort_semester_ira).
+
+    Returns:
+        A DataFrame indexed by student with the column "ira_individual" and,
+        given the courses, "ira_general". With semesters, a tuple of that
+        DataFrame and the per-period one.
+    """
+    individual_iras = calculate_cohort_individual_ira(cohort)
+    result = pd.DataFrame(
+        {"ira_individual": individual_iras},
+        index=pd.Index(cohort.students, name="student"),
+    )
+    if course_index is not None:
+        result["ira_general"] = calculate_cohort_general_ira(
+            individual_iras, course_index, course_averages, course_deviations
+        )
+
+    if semesters:
+        return result, calculate_cohort_semester_ira(cohort)
+    return result
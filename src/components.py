@@ -1,9 +1,18 @@
-import time
-from typing import List, Dict
+import math
 import streamlit as st
+import numpy as np
 import pandas as pd
-from src.database import save_course_suggestion
-from src.calculations import calculate_individual_ira, calculate_general_ira
+import plotly.graph_objects as go
+from src.database import get_suggestion_ticket, submit_course_suggestion
+from src.analytics import TranscriptAnalytics
+from src.calculations import (
+    calculate_general_ira,
+    calculate_required_average,
+    calculate_required_individual_ira,
+)
+from src.projection import GradeModel, project_ira
+from src.suggestion_queue import SuggestionStatus
+from src.transcript import period_code
 
 
 @st.dialog("Sugerir Novo Curso")
@@ -40,15 +49,43 @@ def show_form():
         )
 
         if st.form_submit_button("Enviar Sugestão"):
-            if save_course_suggestion(
+            ticket_id = submit_course_suggestion(
                 course_name_sug, average_sug, deviation_sug, proof_file_sug
-            ):
-                st.success("Obrigado! Sua sugestão foi enviada para análise.")
-                time.sleep(2)
-                st.rerun()
+            )
+            if ticket_id is not None:
+                st.session_state.suggestion_ticket = ticket_id
             else:
                 st.error("Não foi possível enviar a sugestão. Verifique os campos.")
 
+    if "suggestion_result" in st.session_state:
+        _render_suggestion_result(st.session_state.pop("suggestion_result"))
+    elif "suggestion_ticket" in st.session_state:
+        _poll_suggestion_status(st.session_state.suggestion_ticket)
+
+
+@st.fragment(run_every=1)
+def _poll_suggestion_status(ticket_id: str):
+    """Shows that the last suggestion is being written, until it is done."""
+    ticket = get_suggestion_ticket(ticket_id)
+    if ticket is not None and ticket.status is SuggestionStatus.PENDING:
+        st.info("Enviando sua sugestão...")
+        return
+    # Only a full rerun stops the polling; render_header reopens the dialog
+    # to show the result
+    del st.session_state.suggestion_ticket
+    st.session_state.suggestion_result = ticket
+    st.rerun()
+
+
+def _render_suggestion_result(ticket):
+    """Shows whether the last suggestion was saved."""
+    if ticket is None:
+        return
+    if ticket.status is SuggestionStatus.SAVED:
+        st.success("Obrigado! Sua sugestão foi enviada para análise.")
+    else:
+        st.error(ticket.error)
+
 
 def render_header():
     """
@@ -88,19 +125,106 @@ def render_header():
         # st.page_link("pages/1_About.py", label="Sobre o IRA", icon="❓")
 
     with col_modal:
-        if st.button("Meu curso não está na lista"):
+        # Also reopened once to show the result of a suggestion sent from it
+        if (
+            st.button("Meu curso não está na lista")
+            or "suggestion_result" in st.session_state
+        ):
             show_form()
 
 
+# Modes of the simulator: the IRA for given grades, the grade for a given IRA,
+# or the range of IRAs for grades like the student's past ones
+SIMULATE_MODE = "Simular notas"
+SOLVE_MODE = "Descobrir nota necessária"
+PROJECT_MODE = "Projetar cenários"
+
+# A simulated period, e.g. "2025.2"
+SIMULATED_PERIOD_REGEX = r"\d{4}\.[12]"
+
+
+def _simulated_rows_error(
+    rows: pd.DataFrame, current: TranscriptAnalytics, require_grades: bool = True
+):
+    """
+    Checks every row of the simulator at once, returning the message about the
+    first invalid one, or None if they are all valid. The grades are only
+    checked with require_grades.
+    """
+    periods = rows["Período"].fillna("").astype(str).str.strip()
+    well_formed = periods.str.fullmatch(SIMULATED_PERIOD_REGEX)
+    codes = pd.to_numeric(periods.str.replace(".", "", regex=False), errors="coerce")
+    first_code = period_code(current.transcript.first_period)
+
+    checks = [
+        (
+            ~well_formed,
+            "Erro: O período '{period}' na linha {line} não está no formato "
+            "ano.semestre (ex: 2025.2).",
+        ),
+        (
+            periods.isin(current.semesters.index),
+            "Erro: O período '{period}' na linha {line} já foi cursado. Por favor, "
+            "insira um período novo.",
+        ),
+        (
+            codes < first_code,
+            "Erro: O período '{period}' na linha {line} é anterior ao início do "
+            "seu curso.",
+        ),
+        (
+            rows["CH"].isna(),
+            "Erro: Preencha a carga horária da linha {line}.",
+        ),
+    ]
+    if require_grades:
+        checks.append((rows["Nota"].isna(), "Erro: Preencha a nota da linha {line}."))
+    for invalid, message in checks:
+        if invalid.any():
+            index = invalid.idxmax()
+            return message.format(period=periods[index], line=index + 1)
+    return None
+
+
 @st.dialog("Simular IRA", width="large")
 def show_ira_simulator_dialog(
-    current_disciplines: List[Dict], course_avg: float, course_dev: float
+    current: TranscriptAnalytics, course_avg: float, course_dev: float
 ):
-    st.info(
-        "Adicione as disciplinas futuras, o período em que pretende cursá-las e as notas que espera obter."
+    mode = st.radio(
+        "Modo",
+        [SIMULATE_MODE, SOLVE_MODE, PROJECT_MODE],
+        horizontal=True,
+        label_visibility="collapsed",
     )
+    if mode == SIMULATE_MODE:
+        st.info(
+            "Adicione as disciplinas futuras, o período em que pretende cursá-las e as notas que espera obter."
+        )
+    elif mode == PROJECT_MODE:
+        st.info(
+            "Adicione as disciplinas que pretende cursar e o período de cada uma para "
+            "ver a faixa de IRA que pode alcançar, com notas sorteadas a partir do seu "
+            "histórico. A coluna de notas é ignorada."
+        )
+    else:
+        st.info(
+            "Adicione as disciplinas que pretende cursar e o período de cada uma para "
+            "descobrir a média de que precisa nelas para alcançar um IRA. A coluna "
+            "de notas é ignorada."
+        )
+        target_col, value_col = st.columns(2)
+        target_kind = target_col.radio(
+            "Meta", ["IRA Individual", "IRA Geral"], horizontal=True
+        )
+        target = value_col.number_input(
+            f"{target_kind} desejado",
+            min_value=0.0,
+            max_value=10.0,
+            value=round(current.individual_ira, 2),
+            format="%.4f",
+        )
 
-    last_period = max(d["period"] for d in current_disciplines)
+    last_period = current.transcript.last_period
     year, semester = map(int, last_period.split("."))
     default_next_period = f"{year}.2" if semester == 1 else f"{year + 1}.1"
 
@@ -139,78 +263,196 @@ def show_ira_simulator_dialog(
         key="simulator_editor",
     )
 
-    if st.button("Simular Novo IRA", type="primary"):
-        valid_simulated_courses = edited_df[edited_df["Componente"] != ""].copy()
-
-        if valid_simulated_courses.empty:
-            st.warning("Por favor, adicione pelo menos uma disciplina para simular.")
-        else:
-            future_disciplines = []
-            error_found = False
-            completed_periods = set(d["period"] for d in current_disciplines)
-
-            for index, row in valid_simulated_courses.iterrows():
-                period = row["Período"]
-                grade = float(row["Nota"])
-
-                if period in completed_periods:
-                    st.error(
-                        f"Erro: O período '{period}' na linha {index + 1} já foi cursado. Por favor, insira um período novo."
-                    )
-                    error_found = True
-                    break
-
-                future_disciplines.append(
-                    {
-                        "period": period,
-                        "status": "APROVADO" if grade >= 5.0 else "REPROVADO",
-                        "grade": grade,
-                        "credit_hours": float(row["CH"]),
-                    }
-                )
-
-            if not error_found:
-                combined_disciplines = current_disciplines + future_disciplines
-
-                current_ira = calculate_individual_ira(current_disciplines)
-                simulated_ira = calculate_individual_ira(combined_disciplines)
-
-                current_general_ira = calculate_general_ira(
-                    current_ira, course_avg, course_dev
-                )
-                simulated_general_ira = calculate_general_ira(
-                    simulated_ira, course_avg, course_dev
-                )
-
-                st.subheader("Resultados da Simulação")
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.metric(
-                        "IRA Individual Simulado",
-                        f"{simulated_ira:.4f}",
-                        delta=f"{simulated_ira - current_ira:.4f}",
-                    )
-                with col2:
-                    st.metric(
-                        "IRA Geral Simulado",
-                        f"{simulated_general_ira:.3f}",
-                        delta=f"{simulated_general_ira - current_general_ira:.3f}",
-                    )
+    # The projection follows every edit. Only the simulated rows are added to
+    # the sums of the current transcript, so its history is never recomputed.
+    valid_simulated_courses = edited_df[
+        edited_df["Componente"].fillna("").astype(str).str.strip() != ""
+    ]
+    if valid_simulated_courses.empty:
+        st.caption("Adicione pelo menos uma disciplina para ver a simulação.")
+        return
+
+    error = _simulated_rows_error(
+        valid_simulated_courses, current, require_grades=mode == SIMULATE_MODE
+    )
+    if error:
+        st.error(error)
+        return
+
+    periods = valid_simulated_courses["Período"].astype(str).str.strip()
+    semesters = (
+        periods.str[:4].astype(int) * 2 + periods.str[5:].astype(int)
+    ).to_numpy()
+    credit_hours = valid_simulated_courses["CH"].to_numpy(dtype=float)
+
+    if mode == SOLVE_MODE:
+        _render_required_average(
+            current,
+            semesters,
+            credit_hours,
+            target_kind,
+            target,
+            course_avg,
+            course_dev,
+        )
+        return
+    if mode == PROJECT_MODE:
+        _render_projection(current, semesters, credit_hours, course_avg, course_dev)
+        return
+
+    # Approved or failed, a simulated discipline always counts with its grade
+    simulated_sums = current.ira_sums.add_graded(
+        semesters,
+        valid_simulated_courses["Nota"].to_numpy(dtype=float),
+        credit_hours,
+    )
+
+    current_ira = current.individual_ira
+    simulated_ira = simulated_sums.ira
+
+    current_general_ira = calculate_general_ira(current_ira, course_avg, course_dev)
+    simulated_general_ira = calculate_general_ira(simulated_ira, course_avg, course_dev)
+
+    st.subheader("Resultados da Simulação")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(
+            "IRA Individual Simulado",
+            f"{simulated_ira:.4f}",
+            delta=f"{simulated_ira - current_ira:.4f}",
+        )
+    with col2:
+        st.metric(
+            "IRA Geral Simulado",
+            f"{simulated_general_ira:.3f}",
+            delta=f"{simulated_general_ira - current_general_ira:.3f}",
+        )
+
+
+def _render_required_average(
+    current: TranscriptAnalytics,
+    semesters: np.ndarray,
+    credit_hours: np.ndarray,
+    target_kind: str,
+    target: float,
+    course_avg: float,
+    course_dev: float,
+):
+    target_ira = target
+    if target_kind == "IRA Geral":
+        target_ira = calculate_required_individual_ira(target, course_avg, course_dev)
+        if target_ira is None:
+            st.error(
+                "Nenhum IRA Individual alcança esse IRA Geral no curso selecionado."
+            )
+            return
+
+    required_average = calculate_required_average(
+        current.ira_sums, semesters, credit_hours, target_ira
+    )
+
+    st.subheader("Resultado")
+    if required_average is None:
+        best_ira = current.ira_sums.add_graded(
+            semesters, np.full(len(semesters), 10.0), credit_hours
+        ).ira
+        st.error(
+            f"Meta inalcançável com essas disciplinas: mesmo com nota 10 em todas, o "
+            f"IRA Individual chegaria a {best_ira:.4f}, e seria preciso {target_ira:.4f}."
+        )
+    elif required_average == 0:
+        st.success("A meta será alcançada com qualquer nota nessas disciplinas.")
+    else:
+        # Rounded up, so that the grade shown is enough to reach the target
+        st.metric(
+            "Média necessária nas disciplinas planejadas",
+            f"{math.ceil(required_average * 100) / 100:.2f}",
+        )
+        if target_kind == "IRA Geral":
+            st.caption(f"Equivale a um IRA Individual de {target_ira:.4f}.")
+
+
+def _render_projection(
+    current: TranscriptAnalytics,
+    semesters: np.ndarray,
+    credit_hours: np.ndarray,
+    course_avg: float,
+    course_dev: float,
+):
+    model = GradeModel.fit(current.transcript)
+    if model is None:
+        st.warning("Seu histórico não tem notas para basear a projeção.")
+        return
+
+    projection = project_ira(
+        current.ira_sums, model, semesters, credit_hours, course_avg, course_dev
+    )
+    bands = projection.bands()
+
+    st.subheader("Projeção")
+    fig = go.Figure()
+    fig.add_trace(
+        go.Histogram(x=projection.individual_iras, name="Cenários", nbinsx=60)
+    )
+    # The central 90% and 50% of the scenarios
+    fig.add_vrect(
+        x0=bands.loc[5, "individual"],
+        x1=bands.loc[95, "individual"],
+        fillcolor="#26c2ed",
+        opacity=0.15,
+        line_width=0,
+    )
+    fig.add_vrect(
+        x0=bands.loc[25, "individual"],
+        x1=bands.loc[75, "individual"],
+        fillcolor="#26c2ed",
+        opacity=0.3,
+        line_width=0,
+    )
+    fig.add_vline(x=current.individual_ira, line_dash="dash", annotation_text="Atual")
+    fig.update_layout(
+        xaxis_title="IRA Individual",
+        yaxis_title="Cenários",
+        showlegend=False,
+        height=300,
+        margin=dict(t=20, b=20),
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(
+        bands.rename(
+            index=lambda percentile: f"{percentile}%",
+            columns={"individual": "IRA Individual", "general": "IRA Geral"},
+        ),
+        column_config={
+            "percentile": "Percentil",
+            "IRA Individual": st.column_config.NumberColumn(format="%.4f"),
+            "IRA Geral": st.column_config.NumberColumn(format="%.3f"),
+        },
+    )
+    improves = float(np.mean(projection.individual_iras > current.individual_ira))
+    st.caption(
+        f"{len(projection.individual_iras)} cenários, com notas sorteadas em torno das "
+        f"suas notas anteriores (média {model.grades.mean():.2f}) e "
+        f"{model.drop_rate:.0%} de chance de trancamento em cada disciplina. O IRA "
+        f"Individual sobe em {improves:.0%} deles."
+    )
 
 
 def render_ira_simulator(
-    current_disciplines: List[Dict], course_avg: float, course_dev: float
+    current: TranscriptAnalytics, course_avg: float, course_dev: float
 ):
     """
     Renders an interactive IRA simulator.
 
     Allows the user to input future courses, expected grades, and the specific
-    period for each course.
+    period for each course. The simulated IRA is updated on every edit.
 
     Args:
-        current_disciplines (list): The list of discipline dictionaries already extracted from the PDF.
+        current (TranscriptAnalytics): The analytics of the disciplines already
+            extracted from the PDF.
         course_avg (float): The average IRA of the selected course.
         course_dev (float): The standard deviation of the selected course.
     """
     if st.button("Simular IRA", icon="🔮", type="secondary"):
-        show_ira_simulator_dialog(current_disciplines, course_avg, course_dev)
+        show_ira_simulator_dialog(current, course_avg, course_dev)
@@ -0,0 +1,168 @@
+import math
+import os
+import select
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+import psycopg2
+
+from src.course_snapshot import read_course_snapshot, write_course_snapshot
+
+# Seconds a snapshot of the 'ira' table is served before it is refreshed
+COURSES_TTL = float(os.getenv("IRA_COURSES_TTL", 600))
+# Seconds before retrying a refresh that failed
+COURSES_RETRY = float(os.getenv("IRA_COURSES_RETRY", 30))
+# Whether to LISTEN for changes to the 'ira' table instead of relying on the TTL only
+COURSES_NOTIFY = os.getenv("IRA_COURSES_NOTIFY", "1") != "0"
+# Channel notified by actions/resolve_suggestion.py when it inserts a course
+COURSES_CHANNEL = "ira_atualizada"
+# Seconds the listener waits for a notification before checking it was closed
+LISTEN_TIMEOUT = 5.0
+
+
+class CourseCatalog:
+    """
+    A process-wide snapshot of the courses of the 'ira' table, shared by
+    every session.
+
+    Only the first call waits for the database, and not even that one if a
+    local snapshot file exists. Afterwards, courses always returns the
+    snapshot at once: when it is older than the TTL, a
+    background thread fetches a new one, and while the database is
+    unreachable the last good snapshot is kept.
+
+    With a listen connection, a background thread also waits for
+    notifications on COURSES_CHANNEL and refreshes the snapshot as soon as
+    a course is added, so the TTL only bounds how long a missed
+    notification goes unnoticed.
+
+    Attributes:
+        ttl: Seconds a snapshot is served before it is refreshed.
+        last_error: The error of the last failed fetch, or None if it succeeded.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], List[Tuple]],
+        ttl: float = COURSES_TTL,
+        listen_connect: Optional[Callable[[], "psycopg2.extensions.connection"]] = None,
+        snapshot_path: Optional[Path] = None,
+    ):
+        """
+        Args:
+            fetch: Returns the (curso, media, desvio) rows, raising psycopg2.Error
+                on failure.
+            ttl: Seconds a snapshot is served before it is refreshed.
+            listen_connect: Opens the connection used to LISTEN for changes, or
+                None to rely on the TTL only.
+            snapshot_path: A local snapshot of the courses (src/course_snapshot.py)
+                served until the first fetch, and rewritten after each fetch that
+                changes them, or None to start from the database.
+        """
+        self.ttl = ttl
+        self.last_error: Optional[Exception] = None
+        self._fetch = fetch
+        self._snapshot_path = snapshot_path
+        self._courses: Optional[List[Tuple]] = None
+        if snapshot_path is not None:
+            # Expired at once, so the first call returns it and refreshes it
+            self._courses = read_course_snapshot(snapshot_path)
+        self._expires_at = -math.inf
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._closed = threading.Event()
+        if listen_connect is not None:
+            threading.Thread(
+                target=self._listen,
+                args=(listen_connect,),
+                name="course-catalog-listener",
+                daemon=True,
+            ).start()
+
+    def courses(self) -> List[Tuple]:
+        """
+        Returns the courses as (curso, media, desvio) tuples, or an empty list
+        if they could never be fetched. After a failure, the database is not
+        queried again for COURSES_RETRY seconds.
+        """
+        if self._courses is None:
+            if time.monotonic() >= self._expires_at:
+                self.refresh()
+            return self._courses or []
+
+        with self._lock:
+            expired = time.monotonic() >= self._expires_at and not self._refreshing
+            if expired:
+                self._refreshing = True
+        if expired:
+            threading.Thread(
+                target=self.refresh, name="course-catalog-refresh", daemon=True
+            ).start()
+        return self._courses
+
+    def refresh(self):
+        """Fetches a new snapshot, keeping the current one if it fails."""
+        with self._refresh_lock:
+            try:
+                courses = self._fetch()
+            except psycopg2.Error as e:
+                print(f"Could not refresh the course catalog: {e}")
+                with self._lock:
+                    self.last_error = e
+                    self._expires_at = time.monotonic() + min(self.ttl, COURSES_RETRY)
+                    self._refreshing = False
+                return
+            changed = courses != self._courses
+            with self._lock:
+                self._courses = courses
+                self.last_error = None
+                self._expires_at = time.monotonic() + self.ttl
+                self._refreshing = False
+            if changed and self._snapshot_path is not None:
+                try:
+                    write_course_snapshot(courses, self._snapshot_path)
+                except (OSError, sqlite3.Error) as e:
+                    print(f"Could not write the course snapshot: {e}")
+
+    def invalidate(self):
+        """Marks the snapshot as expired, so that the next call refreshes it."""
+        with self._lock:
+            self._expires_at = -math.inf
+
+    def close(self):
+        """Stops the listener thread."""
+        self._closed.set()
+
+    def _listen(self, connect: Callable):
+        delay = 1.0
+        listened = False
+        while not self._closed.is_set():
+            conn = None
+            try:
+                conn = connect()
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {COURSES_CHANNEL};")
+                # Courses added while the listener was disconnected
+                if listened:
+                    self.refresh()
+                listened = True
+                delay = 1.0
+
+                while not self._closed.is_set():
+                    if select.select([conn], [], [], LISTEN_TIMEOUT)[0]:
+                        conn.poll()
+                        if conn.notifies:
+                            conn.notifies.clear()
+                            self.refresh()
+            except (psycopg2.Error, OSError) as e:
+                print(f"Course catalog listener disconnected: {e}")
+            finally:
+                if conn is not None:
+                    conn.close()
+            self._closed.wait(delay)
+            delay = min(delay * 2, 60.0)
@@ -0,0 +1,84 @@
+import os
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+# A copy of the 'ira' table read at startup, so that the course list does not
+# wait on the database. It is outside .cache/ so that a snapshot exported
+# before `docker build` is copied into the image.
+COURSES_SNAPSHOT_PATH = Path(
+    os.getenv("IRA_COURSES_SNAPSHOT_PATH", "courses_snapshot.sqlite3")
+)
+
+_SCHEMA = """
+CREATE TABLE ira (
+    curso TEXT NOT NULL,
+    media REAL NOT NULL,
+    desvio REAL NOT NULL
+);
+CREATE TABLE snapshot (
+    created_at REAL NOT NULL
+);
+"""
+
+
+def read_course_snapshot(
+    path: Union[str, Path] = COURSES_SNAPSHOT_PATH,
+) -> Optional[List[Tuple]]:
+    """
+    Reads the courses of a snapshot, opened read-only.
+
+    Returns:
+        The (curso, media, desvio) tuples in the order they were written, or
+        None if there is no readable snapshot.
+    """
+    path = Path(path)
+    if not path.is_file():
+        return None
+    try:
+        conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            return conn.execute(
+                "SELECT curso, media, desvio FROM ira ORDER BY rowid;"
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Could not read the course snapshot: {e}")
+        return None
+
+
+def write_course_snapshot(
+    courses: List[Tuple], path: Union[str, Path] = COURSES_SNAPSHOT_PATH
+):
+    """
+    Writes the courses to a new snapshot that replaces the old one at once, so
+    that readers in other processes never see it half-written.
+
+    Raises:
+        OSError, sqlite3.Error: If the snapshot could not be written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temporary = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(temporary)
+        try:
+            conn.executescript(_SCHEMA)
+            conn.executemany(
+                "INSERT INTO ira (curso, media, desvio) VALUES (?, ?, ?);",
+                [(course, float(avg), float(dev)) for course, avg, dev in courses],
+            )
+            conn.execute(
+                "INSERT INTO snapshot (created_at) VALUES (?);", (time.time(),)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
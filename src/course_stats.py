@@ -0,0 +1,145 @@
+import csv
+import json
+import math
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, TextIO, Tuple, Union
+
+import numpy as np
+
+# Columns of the 'ira' table, in order
+IRA_TABLE_FIELDS = ["curso", "media", "desvio"]
+
+
+@dataclass
+class RunningStats:
+    """
+    The count, mean and sum of squared deviations of a stream of values,
+    updated with Welford's algorithm, so that the mean and standard deviation
+    are available at any time without keeping the values.
+
+    Attributes:
+        count: The number of values seen.
+        mean: Their mean.
+        m2: The sum of the squared differences between each value and the mean.
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def add(self, value: float):
+        """Adds one value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def add_many(self, values: Iterable[float]):
+        """Adds a batch of values, summarizing it with NumPy before merging it."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        if not len(values):
+            return
+        mean = float(values.mean())
+        self.merge(RunningStats(len(values), mean, float(((values - mean) ** 2).sum())))
+
+    def merge(self, other: "RunningStats"):
+        """
+        Adds the values summarized by another RunningStats, as if they had been
+        added one by one (Chan et al.'s parallel variant of the algorithm).
+        """
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+
+    def deviation(self, ddof: int = 0) -> float:
+        """
+        The standard deviation of the values: the population one by default, or
+        the sample one with ddof=1. It is 0.0 with ddof values or fewer.
+        """
+        if self.count <= ddof:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / (self.count - ddof))
+
+
+class CourseStats:
+    """
+    Per-course mean (IRAm) and standard deviation (IRAdp) of the Individual
+    IRA, accumulated from a stream of (course, IRA) pairs in constant memory
+    per course.
+
+    Aggregates built separately, on other processes or machines, are combined
+    with merge; to_dict and from_dict carry them between processes as JSON.
+    Course names are compared in upper case, as in the 'ira' table.
+    """
+
+    def __init__(self):
+        self.courses: Dict[str, RunningStats] = {}
+
+    def _stats(self, course: str) -> RunningStats:
+        key = course.strip().upper()
+        if key not in self.courses:
+            self.courses[key] = RunningStats()
+        return self.courses[key]
+
+    def add(self, course: str, individual_ira: float):
+        """Adds one student's Individual IRA to the course."""
+        self._stats(course).add(individual_ira)
+
+    def add_many(self, course: str, individual_iras: Iterable[float]):
+        """Adds many students' Individual IRA to the course at once."""
+        self._stats(course).add_many(individual_iras)
+
+    def merge(self, other: "CourseStats"):
+        """Adds every course of another aggregate to this one."""
+        for course, stats in other.courses.items():
+            self._stats(course).merge(stats)
+
+    def to_rows(self, ddof: int = 0) -> List[Tuple[str, float, float]]:
+        """
+        Returns the courses as (curso, media, desvio) tuples sorted by name, the
+        shape returned by load_courses.
+        """
+        return [
+            (course, stats.mean, stats.deviation(ddof))
+            for course, stats in sorted(self.courses.items())
+        ]
+
+    def write_csv(self, out: TextIO, ddof: int = 0, decimals: int = 4):
+        """
+        Writes the courses as a CSV with the columns of the 'ira' table, which
+        load_course_parameters and main.py's --cursos option read.
+        """
+        writer = csv.writer(out)
+        writer.writerow(IRA_TABLE_FIELDS)
+        for course, average, deviation in self.to_rows(ddof):
+            writer.writerow(
+                [course, round(average, decimals), round(deviation, decimals)]
+            )
+
+    def to_dict(self) -> Dict:
+        """Returns the partial aggregate as a JSON-serializable dictionary."""
+        return {course: asdict(stats) for course, stats in self.courses.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CourseStats":
+        """Rebuilds an aggregate from the output of to_dict."""
+        aggregate = cls()
+        for course, stats in data.items():
+            aggregate._stats(course).merge(RunningStats(**stats))
+        return aggregate
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "CourseStats":
+        """Reads a partial aggregate saved by save."""
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, path: Union[str, Path]):
+        """Writes the partial aggregate as JSON, to be merged elsewhere."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
@@ -1,15 +1,29 @@
-import base64
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 import psycopg2
+from psycopg2.extras import execute_values
 import streamlit as st
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 
+from src.course_catalog import COURSES_NOTIFY, CourseCatalog
+from src.course_snapshot import COURSES_SNAPSHOT_PATH
+from src.db_pool import ConnectionPool
+from src.percentiles import PercentileIndex
+from src.suggestion_queue import CourseSuggestion, SuggestionQueue, SuggestionTicket
 
-def get_db_connection():
-    """Stabilish and return a connection with the PostgreSQL database using the Streamlit secrets."""
+
+@st.cache_resource
+def get_connection_pool() -> ConnectionPool:
+    """Return the database connection pool shared by every session of this process."""
+    return ConnectionPool(dict(st.secrets["postgres"]))
+
+
+def get_db_pool() -> Optional[ConnectionPool]:
+    """
+    Return the shared connection pool, from which connections are borrowed with
+    `pool.connection()`, or None if it could not be created from the Streamlit secrets.
+    """
     try:
-        conn = psycopg2.connect(**st.secrets["postgres"])
-        return conn
+        return get_connection_pool()
     except Exception as e:
         # st.error(f"Error connecting to the database: {e}")
         st.error(
@@ -18,40 +32,147 @@ def get_db_connection():
         return None
 
 
+def fetch_courses(pool: ConnectionPool) -> List[Tuple]:
+    """
+    Fetches the list of courses (name, average, deviation) from the 'ira' table.
+
+    Args:
+        pool: The pool to borrow the connection from.
+
+    Returns:
+        A list of tuples, where each tuple contains (course_name, average, deviation).
+
+    Raises:
+        psycopg2.Error: If the database could not be reached or queried.
+    """
+    with pool.connection() as conn, conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT curso, media, desvio FROM ira ORDER BY curso;")
+            return cur.fetchall()
+
+
+@st.cache_resource
+def get_course_catalog() -> CourseCatalog:
+    """Return the course catalog shared by every session of this process."""
+    pool = get_connection_pool()
+    # Read here, since the catalog's threads run outside of any Streamlit session
+    params = dict(st.secrets["postgres"])
+
+    def listen_connect():
+        # LISTEN holds its connection for good, so it is not borrowed from the pool
+        return psycopg2.connect(**params)
+
+    return CourseCatalog(
+        lambda: fetch_courses(pool),
+        listen_connect=listen_connect if COURSES_NOTIFY else None,
+        snapshot_path=COURSES_SNAPSHOT_PATH,
+    )
+
+
 def load_courses() -> List[Tuple]:
     """
-    Fetches and returns the list of courses (name, average, deviation) from the 'ira' table.
+    Returns the list of courses (name, average, deviation) from the 'ira' table,
+    served from the process-wide catalog, so that reruns don't query the database.
 
     Returns:
         A list of tuples, where each tuple contains (course_name, average, deviation).
-        Returns an empty list in case of an error.
+        Returns an empty list if the courses could never be fetched.
+    """
+    try:
+        catalog = get_course_catalog()
+    except Exception as e:
+        st.error(
+            f"Erro ao conectar com o banco de dados. Tente novamente ou use a opção customizada."
+        )
+        return []
+
+    courses = catalog.courses()
+    if not courses and isinstance(catalog.last_error, psycopg2.OperationalError):
+        st.error(
+            f"Erro ao conectar com o banco de dados. Tente novamente ou use a opção customizada."
+        )
+    elif not courses and catalog.last_error is not None:
+        st.error("Erro ao buscar cursos. Tente novamente.")
+    return courses
+
+
+def load_percentile_index() -> Optional[PercentileIndex]:
+    """
+    Fetches the per-course percentile sketches from the 'ira_percentis' table,
+    built by actions/build_percentile_index.py.
+
+    Returns:
+        The PercentileIndex of the courses, or None in case of an error.
     """
-    courses = []
-    conn = get_db_connection()
-    if conn is None:
-        return courses
+    pool = get_db_pool()
+    if pool is None:
+        return None
 
+    index = None
     try:
-        with conn:
+        with pool.connection() as conn, conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT curso, media, desvio FROM ira ORDER BY curso;")
-                courses = cur.fetchall()
+                cur.execute("SELECT curso, pontos, pesos FROM ira_percentis;")
+                index = PercentileIndex.from_rows(cur.fetchall())
     except psycopg2.Error as e:
-        # st.error(f"Error fetching courses: {e}")
-        st.error("Erro ao buscar cursos. Tente novamente.")
-    finally:
-        if conn:
-            conn.close()
+        # The percentile is an extra of the dashboard, so a missing table is not shown
+        print(f"Could not fetch the percentile index: {e}")
 
-    return courses
+    return index
+
+
+def insert_course_suggestions(
+    pool: ConnectionPool, suggestions: List[CourseSuggestion]
+):
+    """
+    Writes course suggestions to the 'forms' table in a single transaction,
+    with their proof image stored as binary, downscaled to the size budget of
+    src/proofs.py, with its SHA-256 and size.
 
+    Args:
+        pool: The pool to borrow the connection from.
+        suggestions: The suggestions, with their proofs prepared.
 
-def save_course_suggestion(
+    Raises:
+        psycopg2.Error: If the database could not be reached or written.
+    """
+    rows = [
+        (
+            suggestion.course_name,
+            suggestion.average,
+            suggestion.deviation,
+            psycopg2.Binary(suggestion.proof.data),
+            suggestion.proof.content_type,
+            suggestion.proof.sha256,
+            suggestion.proof.size,
+        )
+        for suggestion in suggestions
+    ]
+    with pool.connection() as conn, conn:
+        with conn.cursor() as cur:
+            query = """
+                INSERT INTO forms (
+                    nome_curso, media, desvio, comprovante, comprovante_tipo,
+                    comprovante_sha256, comprovante_bytes
+                )
+                VALUES %s;
+            """
+            execute_values(cur, query, rows)
+
+
+@st.cache_resource
+def get_suggestion_queue() -> SuggestionQueue:
+    """Return the suggestion write queue shared by every session of this process."""
+    pool = get_connection_pool()
+    return SuggestionQueue(lambda batch: insert_course_suggestions(pool, batch))
+
+
+def submit_course_suggestion(
     course_name: str, average: float, deviation: float, proof_file: UploadedFile
-) -> bool:
+) -> Optional[str]:
     """
-    Saves the course suggestion form data, including a proof image (screenshot)
-    encoded in Base64, to the 'forms' table.
+    Queues the course suggestion form data, including a proof image
+    (screenshot), to be written to the 'forms' table in the background.
 
     Args:
         course_name: The suggested course name.
@@ -60,38 +181,28 @@ def save_course_suggestion(
         proof_file: The file object uploaded via st.file_uploader.
 
     Returns:
-        True if the operation was successful, False otherwise.
+        The id of the ticket to poll with get_suggestion_ticket, or None if the
+        suggestion could not be queued.
     """
     if not all([course_name, average, deviation, proof_file]):
         st.warning("Preencha todos os campos.")
-        return False
-
-    conn = get_db_connection()
-    if conn is None:
-        return False
+        return None
 
-    success = False
     try:
-        # Encode to Base64
-        image_bytes = proof_file.getvalue()
-        base64_bytes = base64.b64encode(image_bytes)
-        base64_string = base64_bytes.decode("utf-8")
+        suggestions = get_suggestion_queue()
+    except Exception as e:
+        st.error(
+            f"Erro ao conectar com o banco de dados. Tente novamente ou use a opção customizada."
+        )
+        return None
 
-        with conn:
-            with conn.cursor() as cur:
-                query = """
-                    INSERT INTO forms (nome_curso, media, desvio, print_base64)
-                    VALUES (%s, %s, %s, %s);
-                """
-                cur.execute(query, (course_name, average, deviation, base64_string))
+    ticket = suggestions.submit(course_name, average, deviation, proof_file.getvalue())
+    if ticket is None:
+        st.error("Muitas sugestões sendo enviadas agora. Tente novamente em instantes.")
+        return None
+    return ticket.id
 
-        success = True
-    except psycopg2.Error as e:
-        # st.error(f"Error saving suggestion: {e}")
-        st.error("Erro ao tentar salvar sugestão.")
-        conn.rollback()
-    finally:
-        if conn:
-            conn.close()
-
-    return success
+
+def get_suggestion_ticket(ticket_id: str) -> Optional[SuggestionTicket]:
+    """Returns the status of a suggestion queued by submit_course_suggestion."""
+    return get_suggestion_queue().ticket(ticket_id)
@@ -0,0 +1,263 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+# Connections opened when the pool is created and kept open while idle
+POOL_MIN = int(os.getenv("IRA_DB_POOL_MIN", 1))
+# Connections open at most; further checkouts wait for one to be returned
+POOL_MAX = int(os.getenv("IRA_DB_POOL_MAX", 10))
+# Seconds a checkout waits for a free connection before failing
+POOL_TIMEOUT = float(os.getenv("IRA_DB_POOL_TIMEOUT", 10))
+# Seconds idle after which a connection is checked with a query before reuse
+POOL_PING_AFTER = float(os.getenv("IRA_DB_POOL_PING_AFTER", 30))
+# Seconds idle after which connections beyond POOL_MIN are closed
+POOL_IDLE_TIMEOUT = float(os.getenv("IRA_DB_POOL_IDLE_TIMEOUT", 300))
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """Raised when no connection is returned to the pool in time."""
+
+
+class ConnectionPool:
+    """
+    A thread-safe pool of PostgreSQL connections shared by every session of
+    the process, so that queries don't pay the TCP, TLS and authentication
+    handshake each time.
+
+    Connections are borrowed with connection(). A connection idle for more
+    than ping_after seconds is checked with a query before it is handed out,
+    and a broken one is replaced by a new one. A connection that raised a
+    connection error, or is left in a failed state, is closed instead of
+    returned to the pool.
+
+    The counters of metrics() tell whether the pool is sized for the
+    number of concurrent sessions: waits and timeouts mean it is too small.
+    """
+
+    def __init__(
+        self,
+        params: Dict,
+        minconn: int = POOL_MIN,
+        maxconn: int = POOL_MAX,
+        timeout: float = POOL_TIMEOUT,
+        ping_after: float = POOL_PING_AFTER,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+    ):
+        """
+        Args:
+            params: The keyword arguments of psycopg2.connect.
+            minconn: Connections opened up front, in the background, and kept
+                open while idle.
+            maxconn: Connections open at most.
+            timeout: Seconds a checkout waits for a free connection.
+            ping_after: Seconds idle after which a connection is checked.
+            idle_timeout: Seconds idle after which extra connections are closed.
+        """
+        if not 0 <= minconn <= maxconn or maxconn < 1:
+            raise ValueError("The pool needs 0 <= minconn <= maxconn and maxconn >= 1")
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.idle_timeout = idle_timeout
+        self._params = params
+        # Idle connections with the time they were returned, the latest last
+        self._idle: Deque[Tuple[psycopg2.extensions.connection, float]] = deque()
+        self._size = 0
+        self._in_use = 0
+        self._condition = threading.Condition()
+        self._checkouts = 0
+        self._waits = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._checkout_seconds = 0.0
+        self._max_checkout_seconds = 0.0
+
+        # Opened in the background, so that creating the pool never waits on
+        # the network
+        if minconn:
+            threading.Thread(
+                target=self._prewarm, name="db-pool-prewarm", daemon=True
+            ).start()
+
+    def _prewarm(self):
+        for _ in range(self.minconn):
+            with self._condition:
+                if self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except psycopg2.Error as e:
+                with self._condition:
+                    self._size -= 1
+                    self._condition.notify()
+                # The connections are opened on demand once the database is back
+                print(f"Could not open the initial pool connections: {e}")
+                return
+            with self._condition:
+                self._idle.append((conn, time.monotonic()))
+                self._condition.notify()
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        return psycopg2.connect(**self._params)
+
+    def _is_healthy(self, conn, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.ping_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def checkout(self) -> psycopg2.extensions.connection:
+        """
+        Borrows a healthy connection, waiting up to the timeout for one to be
+        returned if maxconn are in use. Prefer connection(), which returns it.
+
+        Raises:
+            PoolTimeout: If no connection was returned in time.
+            psycopg2.OperationalError: If a new connection could not be opened.
+        """
+        start = time.monotonic()
+        with self._condition:
+            if not self._idle and self._size >= self.maxconn:
+                self._waits += 1
+            while not self._idle and self._size >= self.maxconn:
+                remaining = start + self.timeout - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(
+                        f"No database connection was free after {self.timeout} s"
+                    )
+                self._condition.wait(remaining)
+            if self._idle:
+                conn, idle_since = self._idle.pop()
+            else:
+                # Reserve the slot; the connection is opened outside the lock
+                conn, idle_since = None, 0.0
+                self._size += 1
+            self._in_use += 1
+
+        try:
+            if conn is not None and not self._is_healthy(conn, idle_since):
+                conn.close()
+                conn = None
+                with self._condition:
+                    self._recycled += 1
+            if conn is None:
+                conn = self._connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._in_use -= 1
+                self._condition.notify()
+            raise
+
+        elapsed = time.monotonic() - start
+        with self._condition:
+            self._checkouts += 1
+            self._checkout_seconds += elapsed
+            self._max_checkout_seconds = max(self._max_checkout_seconds, elapsed)
+        return conn
+
+    def checkin(self, conn: psycopg2.extensions.connection, broken: bool = False):
+        """Returns a borrowed connection, closing it if it is broken."""
+        if not broken and not conn.closed:
+            try:
+                status = conn.info.transaction_status
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    broken = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                broken = True
+
+        expired = []
+        with self._condition:
+            self._in_use -= 1
+            if broken or conn.closed:
+                self._size -= 1
+                self._recycled += 1
+                expired.append(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            # The oldest idle connections beyond minconn
+            cutoff = time.monotonic() - self.idle_timeout
+            while (
+                len(self._idle) > self.minconn
+                and self._size > self.minconn
+                and self._idle[0][1] < cutoff
+            ):
+                expired.append(self._idle.popleft()[0])
+                self._size -= 1
+            self._condition.notify()
+
+        for conn in expired:
+            if not conn.closed:
+                conn.close()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrows a connection for the duration of a with block.
+
+        The block's transaction is not committed; use the connection itself as
+        a context manager for that, as in `with pool.connection() as conn, conn:`.
+        """
+        conn = self.checkout()
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.checkin(conn, broken)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Returns the pool's counters: open ("size"), borrowed ("in_use") and
+        idle connections; checkouts served, checkouts that had to wait
+        ("waits") or failed waiting ("timeouts"); broken connections replaced
+        ("recycled"); and the mean and maximum checkout latency in
+        milliseconds, waits and health checks included.
+        """
+        with self._condition:
+            return {
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "mean_checkout_ms": (
+                    1000 * self._checkout_seconds / self._checkouts
+                    if self._checkouts
+                    else 0.0
+                ),
+                "max_checkout_ms": 1000 * self._max_checkout_seconds,
+            }
+
+    def close(self):
+        """Closes the idle connections; borrowed ones are closed when returned."""
+        with self._condition:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self.minconn = 0
+            self.idle_timeout = -1.0
+        for conn in idle:
+            conn.close()
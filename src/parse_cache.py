@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src.pdf_parser import DEFAULT_DISCIPLINE_PARSER, PARSER_VERSION, ParsedTranscript
+from src.text_backends import DEFAULT_TEXT_BACKEND
+
+# The cache is a single SQLite file so that every Streamlit worker process on
+# the host can share it. WAL mode lets readers proceed while a writer commits.
+PARSE_CACHE_PATH = Path(os.getenv("IRA_PARSE_CACHE_PATH", ".cache/parse_cache.sqlite3"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("IRA_PARSE_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed_transcripts (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS parsed_transcripts_last_access
+    ON parsed_transcripts (last_access);
+"""
+
+
+def transcript_cache_key(pdf_bytes: bytes) -> str:
+    """Returns the cache key for a PDF: the parser version, text backend and
+    discipline parser plus the SHA-256 of its content."""
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    return (
+        f"v{PARSER_VERSION}-{DEFAULT_TEXT_BACKEND}-{DEFAULT_DISCIPLINE_PARSER}:{digest}"
+    )
+
+
+class ParseCache:
+    """
+    On-disk, size-bounded LRU cache of parsed transcripts.
+
+    Entries are stored as zlib-compressed JSON. A connection is opened per
+    operation, which keeps the cache safe to use from several threads and
+    processes at once; SQLite's locking serializes the writers.
+    """
+
+    def __init__(
+        self,
+        path: Path = PARSE_CACHE_PATH,
+        max_bytes: int = PARSE_CACHE_MAX_BYTES,
+        timeout: float = 5.0,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self._initialized = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._initialized:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.executescript(_SCHEMA)
+            self._initialized = True
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Returns the cached payload for the key, or None on a miss."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM parsed_transcripts WHERE key = ?;", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE parsed_transcripts SET last_access = ? WHERE key = ?;",
+                (time.time(), key),
+            )
+            return json.loads(zlib.decompress(row[0]))
+        finally:
+            conn.close()
+
+    def put(self, key: str, data: Dict):
+        """Stores the payload and evicts the least recently used entries if needed."""
+        payload = zlib.compress(
+            json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        if len(payload) > self.max_bytes:
+            return
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            conn.execute(
+                "INSERT OR REPLACE INTO parsed_transcripts (key, payload, size, last_access) "
+                "VALUES (?, ?, ?, ?);",
+                (key, payload, len(payload), time.time()),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT;")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
+            raise
+        finally:
+            conn.close()
+
+    def _evict(self, conn: sqlite3.Connection):
+        (total_size,) = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM parsed_transcripts;"
+        ).fetchone()
+        if total_size <= self.max_bytes:
+            return
+
+        stale_keys = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM parsed_transcripts ORDER BY last_access;"
+        ):
+            if total_size <= self.max_bytes:
+                break
+            stale_keys.append((key,))
+            total_size -= size
+        conn.executemany("DELETE FROM parsed_transcripts WHERE key = ?;", stale_keys)
+
+
+def load_transcript(
+    pdf_bytes: bytes,
+    parse: Callable[[], ParsedTranscript],
+    cache: Optional[ParseCache] = None,
+) -> ParsedTranscript:
+    """
+    Returns the parsed transcript for the given PDF, parsing it only on a cache miss.
+
+    Cache failures are reported and otherwise ignored, so an unavailable cache
+    never prevents a transcript from being analysed.
+
+    Args:
+        pdf_bytes: The raw content of the transcript PDF.
+        parse: Called on a cache miss to parse the transcript.
+        cache: The cache to use. Defaults to a ParseCache with the default settings.
+
+    Returns:
+        The ParsedTranscript, either rebuilt from the cache or freshly parsed.
+    """
+    cache = cache or ParseCache()
+    key = transcript_cache_key(pdf_bytes)
+
+    try:
+        data = cache.get(key)
+        if data is not None:
+            return ParsedTranscript.from_dict(data)
+    except (sqlite3.Error, zlib.error, ValueError) as e:
+        print(f"Could not read the parse cache: {e}")
+
+    transcript = parse()
+
+    try:
+        cache.put(key, transcript.to_dict())
+    except sqlite3.Error as e:
+        print(f"Could not write to the parse cache: {e}")
+
+    return transcript
@@ -1,103 +1,499 @@
+import multiprocessing
+import os
 import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
-import pdfplumber
-from typing import Dict, List
+from src.text_backends import (
+    PdfSource,
+    TextDocument,
+    TextPage,
+    open_pdf,
+    read_pdf_bytes,
+)
+from src.transcript import Transcript
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
 
+# Bump whenever a change to this module alters the extracted data, so results
+# cached from older parser versions are no longer reused.
+PARSER_VERSION = "1"
 
-def extract_disciplines(pdf_path: Path) -> List[Dict]:
-    """
-    Reads a student transcript PDF file and extracts course information.
+# Horizontal tolerance used when laying out the disciplines table. The default
+# pdfplumber tolerance merges adjacent columns (e.g. class and hours) together.
+DISCIPLINES_X_TOLERANCE = 2
 
-    This final version uses a multi-pass approach to ensure correct data
-    extraction, handling block separation issues and correctly identifying
-    which components should be ignored.
+# Page count from which parse_transcript lays out the pages in a process pool
+# when it is asked for more than one worker. Below it, streaming the pages
+# costs less than starting the workers and re-opening the PDF in each of them.
+# Set it to the crossover that benchmarks/page_extraction_crossover.py
+# measures on the target host.
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("IRA_PARALLEL_PAGE_THRESHOLD", 6))
 
-    Args:
-        pdf_path: The path to the transcript PDF file.
+PERIOD_REGEX = re.compile(r"\b(\d{4}\.\d)\b")
 
-    Returns:
-        A list of dictionaries, each representing a valid discipline for calculation.
+DATA_LINE_REGEX = re.compile(
+    r"""
+    ([*e&#@§]?)                                 # Group 1: Optional symbol (e.g., @, \#)
+    \s*                                         # Zero or more whitespace characters
+    ([A-Z]{2,3}\d{4,})                          # Group 2: Course code (e.g., CB0664)
+    \s+.*?                                      # Generic separator (skips text like class, frequency)
+    (\d+\.00)                                   # Group 3: Credit Hours (e.g., 128.00)
+    \s+.*?                                      # Another generic separator
+    (\d{1,2}(?:\.\d{1,2})?)                     # Group 4: Grade (e.g., 8.7 or 10)
+    \s+                                         # One or more whitespace characters
+    (                                           # Group 5: Course status
+        APROVADO\ MÉDIA|APROVADO|REPROVADO|
+        TRANCADO|SUPRIMIDO|APROVT\ INTERNO
+    )
+    """,
+    re.VERBOSE,
+)
+
+# A course name sits on its own line(s), in upper case, before its data line
+COURSE_NAME_REGEX = re.compile(r"\n([A-ZÁÀÂÃÉÊÍÎÓÔÕÚÇ\s]{3,})\n")
+
+# The disciplines table ends at the legend
+LEGEND_MARKER = "Legenda:"
+
+# Rows that do not count towards the IRA
+SKIPPED_SYMBOLS = ("@", "§")
+SKIPPED_STATUSES = ("APROVT INTERNO", "SUPRIMIDO")
+
+# Tokens recognized by LineDisciplineParser, mirroring DATA_LINE_REGEX and
+# COURSE_NAME_REGEX. Statuses are listed in the order the regex tries them.
+TOKEN_REGEX = re.compile(r"\S+")
+CODE_REGEX = re.compile(r"[A-Z]{2,3}\d{4}")
+ROW_SYMBOLS = "*e&#@§"
+ROW_STATUSES = (
+    "APROVADO MÉDIA",
+    "APROVADO",
+    "REPROVADO",
+    "TRANCADO",
+    "SUPRIMIDO",
+    "APROVT INTERNO",
+)
+GRADE_REGEX = re.compile(r"\d{1,2}(?:\.\d{1,2})?")
+COURSE_NAME_LINE_REGEX = re.compile(r"[A-ZÁÀÂÃÉÊÍÎÓÔÕÚÇ\s]*")
+
+TOTAL_HOURS_REGEX = re.compile(r"Carga Horária Total\s+(\d+)\s+(\d+)")
+OPTIONAL_HOURS_REGEX = re.compile(
+    r"Carga Horária Optativa\s+(\d+)\s+(\d+)\s+\d+\s+(\d+)"
+)
+
+PENDING_START_MARKER = "Componentes Curriculares Obrigatórios Pendentes"
+PENDING_END_MARKER = "Equivalências:"
+PENDING_COURSE_REGEX = re.compile(r"([A-Z]{2,3}\d{4,})\s+(.*?)\s+(\d+)\s*h")
+
+
+def _read_page_texts(
+    path_or_fp: PdfSource,
+    x_tolerance: Optional[float] = None,
+    backend: Optional[str] = None,
+) -> List[str]:
+    """Opens the PDF and returns the extracted text of each page, in order."""
+    kwargs = {} if x_tolerance is None else {"x_tolerance": x_tolerance}
+    with open_pdf(path_or_fp, backend) as pdf:
+        return [page.extract_text(**kwargs) or "" for page in pdf.pages]
+
+
+@dataclass
+class ParsedTranscript:
     """
-    disciplines = []
+    The text of a transcript PDF, laid out once and shared by every extractor.
 
-    with pdfplumber.open(pdf_path) as pdf:
-        # 1. Pre-processing
-        full_text = "".join(
-            [page.extract_text(x_tolerance=2) or "" for page in pdf.pages]
+    Attributes:
+        discipline_page_texts: Per-page text extracted with
+            DISCIPLINES_X_TOLERANCE, used for the disciplines table.
+        page_texts: Per-page text extracted with pdfplumber's default settings,
+            used for the credit hour summary and the pending courses.
+    """
+
+    discipline_page_texts: List[str] = field(repr=False)
+    page_texts: List[str] = field(repr=False)
+    discipline_parser: Optional[str] = None
+
+    @cached_property
+    def disciplines(self) -> List[Dict]:
+        """The valid disciplines for calculation (see extract_disciplines)."""
+        return parse_disciplines(
+            "".join(self.discipline_page_texts), self.discipline_parser
         )
-        try:
-            legend_pos = full_text.index("Legenda:")
-            full_text = full_text[:legend_pos]
-        except ValueError:
-            pass
 
-        # 2. Map the location of all period markers (like "2025.1")
-        period_regex = re.compile(r"\b(\d{4}\.\d)\b")
-        period_locations = {
-            m.start(): m.group(1) for m in period_regex.finditer(full_text)
+    @cached_property
+    def discipline_table(self) -> Transcript:
+        """The disciplines as a column-oriented Transcript, built once."""
+        return Transcript.from_disciplines(self.disciplines)
+
+    @cached_property
+    def credit_summary(self) -> Dict[str, int]:
+        """The credit hour summary (see extract_credit_hour_summary)."""
+        return parse_credit_hour_summary("".join(self.page_texts))
+
+    @cached_property
+    def pending_courses(self) -> List[Dict]:
+        """The pending mandatory courses (see extract_pending_courses)."""
+        return parse_pending_courses("".join(self.page_texts))
+
+    def to_dict(self) -> Dict:
+        """Returns the extracted data as a JSON-serializable dictionary."""
+        return {
+            "disciplines": self.disciplines,
+            "credit_summary": self.credit_summary,
+            "pending_courses": self.pending_courses,
         }
-        sorted_period_starts = sorted(period_locations.keys())
-
-        # 3. Find all disciplines
-        # data_line_regex = re.compile(
-        #     r"([*e&#@§]?)\s*([A-Z]{2,3}\d{4,})\s+.*?(\d+\.00)\s+.*?\s+(\d{1,2}(?:\.\d{1,2})?)\s+(APROVADO MÉDIA|APROVADO|REPROVADO|TRANCADO|SUPRIMIDO|APROVT INTERNO)"
-        # )
-        data_line_regex = re.compile(
-            r"""
-            ([*e&#@§]?)                                 # Group 1: Optional symbol (e.g., @, \#)
-            \s*                                         # Zero or more whitespace characters
-            ([A-Z]{2,3}\d{4,})                          # Group 2: Course code (e.g., CB0664)
-            \s+.*?                                      # Generic separator (skips text like class, frequency)
-            (\d+\.00)                                   # Group 3: Credit Hours (e.g., 128.00)
-            \s+.*?                                      # Another generic separator
-            (\d{1,2}(?:\.\d{1,2})?)                     # Group 4: Grade (e.g., 8.7 or 10)
-            \s+                                         # One or more whitespace characters
-            (                                           # Group 5: Course status
-                APROVADO\ MÉDIA|APROVADO|REPROVADO|
-                TRANCADO|SUPRIMIDO|APROVT\ INTERNO
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ParsedTranscript":
+        """
+        Rebuilds a transcript from the output of to_dict, without the page texts.
+        """
+        transcript = cls(discipline_page_texts=[], page_texts=[])
+        # Pre-populate the cached properties so they are never recomputed
+        transcript.__dict__.update(
+            disciplines=data["disciplines"],
+            credit_summary=data["credit_summary"],
+            pending_courses=data["pending_courses"],
+        )
+        return transcript
+
+
+def iter_pages(pdf: TextDocument) -> Iterator[TextPage]:
+    """
+    Yields the pages of an open PDF in order, releasing the cached layout
+    objects (characters, words, etc.) of each page as soon as it is consumed.
+    """
+    for page in pdf.pages:
+        try:
+            yield page
+        finally:
+            page.close()
+
+
+def _has_complete_match(pattern: re.Pattern, text: str) -> bool:
+    """Tells whether the pattern matches without touching the end of the text,
+    i.e. whether more text could no longer change its first match."""
+    match = pattern.search(text)
+    return match is not None and match.end() < len(text)
+
+
+def _summary_sections_complete(text: str) -> bool:
+    """Tells whether the text already holds everything read from the default layout."""
+    pending_start = text.find(PENDING_START_MARKER)
+    return (
+        _has_complete_match(TOTAL_HOURS_REGEX, text)
+        and _has_complete_match(OPTIONAL_HOURS_REGEX, text)
+        and pending_start != -1
+        and text.find(PENDING_END_MARKER, pending_start) != -1
+    )
+
+
+def _extract_page(page: TextPage) -> Tuple[str, str]:
+    """Returns the page text laid out for the disciplines and with the defaults."""
+    return (
+        page.extract_text(x_tolerance=DISCIPLINES_X_TOLERANCE) or "",
+        page.extract_text() or "",
+    )
+
+
+def _extract_page_range(
+    path_or_fp: PdfSource, start: int, stop: int, backend: Optional[str] = None
+) -> List[Tuple[str, str]]:
+    """Worker task: opens the PDF and extracts the pages in [start, stop)."""
+    with open_pdf(path_or_fp, backend, pages=range(start + 1, stop + 1)) as pdf:
+        return [_extract_page(page) for page in iter_pages(pdf)]
+
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+
+def _get_page_pool(workers: int) -> ProcessPoolExecutor:
+    """Returns the process pool shared by every parallel extraction in this process."""
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None or _page_pool._max_workers < workers:
+            if _page_pool is not None:
+                _page_pool.shutdown(wait=False)
+            # Spawned rather than forked, since forking a process that runs
+            # other threads (e.g. a web server) can copy locks held by them
+            _page_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
             )
-            """,
-            re.VERBOSE,
+        return _page_pool
+
+
+def _resolve_page_workers(workers: int, page_count: int) -> int:
+    if page_count < PARALLEL_PAGE_THRESHOLD:
+        return 1
+    return max(1, min(workers, page_count))
+
+
+def extract_page_texts(
+    path_or_fp: PdfSource,
+    workers: int = 1,
+    page_count: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> Tuple[List[str], List[str]]:
+    """
+    Extracts the text of the first page_count pages (all pages by default) with
+    both layouts needed by the extractors.
+
+    With more than one worker, the pages are split into contiguous ranges that
+    are laid out in a shared process pool, and the texts are reassembled in
+    page order.
+
+    Args:
+        path_or_fp: The transcript PDF, as a path, bytes or a binary file object.
+        workers: Number of worker processes. 1 extracts serially in this process.
+        page_count: How many pages to extract, from the first one.
+        backend: The text extraction backend (see src.text_backends).
+
+    Returns:
+        The per-page texts laid out for the disciplines, and with the defaults.
+    """
+    if page_count is None:
+        with open_pdf(path_or_fp, backend) as pdf:
+            page_count = len(pdf.pages)
+
+    workers = max(1, min(workers, page_count))
+    if workers == 1:
+        pages = _extract_page_range(path_or_fp, 0, page_count, backend)
+    else:
+        # File objects cannot be sent to the workers: they get a path or the
+        # PDF content, never a shared file name
+        if not isinstance(path_or_fp, (str, Path)):
+            path_or_fp = read_pdf_bytes(path_or_fp)
+        bounds = [page_count * i // workers for i in range(workers + 1)]
+        pool = _get_page_pool(workers)
+        futures = [
+            pool.submit(_extract_page_range, path_or_fp, start, stop, backend)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+        pages = [page for future in futures for page in future.result()]
+
+    return [page[0] for page in pages], [page[1] for page in pages]
+
+
+def parse_transcript(
+    path_or_fp: PdfSource,
+    streaming: bool = True,
+    workers: int = 1,
+    backend: Optional[str] = None,
+    discipline_parser: Optional[str] = None,
+) -> ParsedTranscript:
+    """
+    Opens a transcript PDF a single time and extracts the text of every page
+    with both layouts needed by the extractors.
+
+    In streaming mode the pages are laid out one at a time: the disciplines are
+    matched incrementally as each page arrives, each page's layout objects are
+    released once it has been read, and extraction stops as soon as the legend
+    and the summary sections have been seen. The page texts of the returned
+    transcript then only cover the pages that were read.
+
+    With more than one worker, transcripts with at least
+    PARALLEL_PAGE_THRESHOLD pages are instead laid out in parallel (see
+    extract_page_texts): every page is extracted before the regular
+    expressions run, so this only pays off for long transcripts whose
+    sections are near the end. Shorter ones are still parsed serially.
+
+    Args:
+        path_or_fp: The transcript PDF, as a path, bytes or a binary file
+            object (e.g. a Streamlit UploadedFile), so that uploads can be
+            parsed without writing them to disk.
+        streaming: Whether to parse page by page and stop early. Only applies
+            to serial extraction.
+        workers: Number of processes used to lay out long transcripts. 1
+            (the default) parses in this process.
+        backend: The text extraction backend (see src.text_backends). Defaults
+            to DEFAULT_TEXT_BACKEND.
+        discipline_parser: The discipline parser (see DISCIPLINE_PARSERS).
+            Defaults to DEFAULT_DISCIPLINE_PARSER.
+
+    Returns:
+        A ParsedTranscript exposing the disciplines, the credit hour summary and
+        the pending courses.
+    """
+    discipline_page_texts = []
+    page_texts = []
+
+    with open_pdf(path_or_fp, backend) as pdf:
+        page_count = len(pdf.pages)
+        workers = _resolve_page_workers(workers, page_count)
+
+        if workers == 1 and streaming:
+            return _parse_transcript_streaming(pdf, discipline_parser)
+
+        if workers == 1:
+            for page in iter_pages(pdf):
+                discipline_text, text = _extract_page(page)
+                discipline_page_texts.append(discipline_text)
+                page_texts.append(text)
+
+    if workers > 1:
+        discipline_page_texts, page_texts = extract_page_texts(
+            path_or_fp, workers=workers, page_count=page_count, backend=backend
         )
-        matches = list(data_line_regex.finditer(full_text))
 
-        last_match_end = 0
+    return ParsedTranscript(
+        discipline_page_texts=discipline_page_texts,
+        page_texts=page_texts,
+        discipline_parser=discipline_parser,
+    )
+
+
+def _parse_transcript_streaming(
+    pdf: TextDocument, discipline_parser: Optional[str] = None
+) -> ParsedTranscript:
+    discipline_page_texts = []
+    page_texts = []
+    matcher = new_discipline_parser(discipline_parser)
+    summary_text = ""
+    summary_complete = False
+
+    for page in iter_pages(pdf):
+        if not matcher.done:
+            text = page.extract_text(x_tolerance=DISCIPLINES_X_TOLERANCE) or ""
+            discipline_page_texts.append(text)
+            matcher.feed(text)
+
+        if not summary_complete:
+            text = page.extract_text() or ""
+            page_texts.append(text)
+            summary_text += text
+            summary_complete = _summary_sections_complete(summary_text)
+
+        if matcher.done and summary_complete:
+            break
+
+    transcript = ParsedTranscript(
+        discipline_page_texts=discipline_page_texts,
+        page_texts=page_texts,
+        discipline_parser=discipline_parser,
+    )
+    transcript.__dict__["disciplines"] = matcher.finish()
+    return transcript
+
+
+class DisciplineMatcher:
+    """
+    Incrementally extracts the disciplines from the transcript text.
+
+    The text may be fed in any number of chunks (e.g. one per page); the
+    current period and the pending course name are carried across chunk
+    boundaries. Since a row may continue in the next chunk, only the text up
+    to the last complete line is matched until more text (or the end) arrives.
+    Matching stops at the legend, after which further text is ignored.
+
+    Attributes:
+        disciplines: The valid disciplines found so far.
+        done: Whether the legend has been seen (or finish has been called).
+    """
+
+    def __init__(self):
+        self.disciplines: List[Dict] = []
+        self.done = False
+        # Unconsumed text. Positions below are relative to it.
+        self._buffer = ""
+        # Where the next data line search starts (end of the last match)
+        self._scan_pos = 0
+        # Where the course name search starts (end of the last valid discipline)
+        self._name_pos = 0
+        # Where the next period marker search starts
+        self._period_pos = 0
+        self._current_period: Optional[str] = None
+
+    def feed(self, text: str):
+        """Adds the next chunk of text and matches every row known to be complete."""
+        if self.done:
+            return
+
+        legend_search_start = max(0, len(self._buffer) - len(LEGEND_MARKER) + 1)
+        self._buffer += text
+
+        legend_pos = self._buffer.find(LEGEND_MARKER, legend_search_start)
+        if legend_pos != -1:
+            self._match(legend_pos)
+            self._close()
+            return
+
+        last_line_end = self._buffer.rfind("\n")
+        if last_line_end > self._scan_pos:
+            self._match(last_line_end)
+        self._discard_consumed()
+
+    def finish(self) -> List[Dict]:
+        """Matches the remaining text and returns every valid discipline."""
+        if not self.done:
+            self._match(len(self._buffer))
+            self._close()
+        return self.disciplines
+
+    def _close(self):
+        self.done = True
+        self._buffer = ""
+        self._scan_pos = self._name_pos = self._period_pos = 0
+
+    def _discard_consumed(self):
+        # Keep one character before the earliest position still needed, so
+        # that word boundaries (\b) at that position are evaluated correctly.
+        cut = min(self._scan_pos, self._name_pos, self._period_pos) - 1
+        if cut <= 0:
+            return
+        self._buffer = self._buffer[cut:]
+        self._scan_pos -= cut
+        self._name_pos -= cut
+        self._period_pos -= cut
+
+    def _match(self, end: int):
+        buffer = self._buffer
+
+        # Period markers (like "2025.1") in text order, resolved against the
+        # matches with a single forward sweep
+        period_starts = []
+        period_values = []
+        for period_match in PERIOD_REGEX.finditer(buffer, self._period_pos, end):
+            period_starts.append(period_match.start())
+            period_values.append(period_match.group(1))
+        next_period = 0
+
+        for match in DATA_LINE_REGEX.finditer(buffer, self._scan_pos, end):
+            self._scan_pos = match.end()
 
-        # 4. Iterate over the found disciplines to process each block
-        for _, match in enumerate(matches):
             symbol, course_code, hours, grade, status = match.groups()
             symbol = symbol.strip()
 
-            if symbol in ["@", "§"] or status in ["APROVT INTERNO", "SUPRIMIDO"]:
+            if symbol in SKIPPED_SYMBOLS or status in SKIPPED_STATUSES:
                 continue
 
             current_match_start = match.start()
-            search_region = full_text[last_match_end:current_match_start]
 
-            name_candidates = re.findall(
-                r"\n([A-ZÁÀÂÃÉÊÍÎÓÔÕÚÇ\s]{3,})\n", search_region
-            )
-            course_name = (
-                name_candidates[-1].strip()
-                if name_candidates
-                else "NOME NÃO ENCONTRADO"
-            )
+            course_name = "NOME NÃO ENCONTRADO"
+            for name_match in COURSE_NAME_REGEX.finditer(
+                buffer, self._name_pos, current_match_start
+            ):
+                course_name = name_match.group(1)
+            course_name = course_name.strip()
 
-            last_match_end = match.end()
+            self._name_pos = match.end()
 
-            current_period = None
-            for period_start_index in reversed(sorted_period_starts):
-                if period_start_index < current_match_start:
-                    current_period = period_locations[period_start_index]
-                    break
+            while (
+                next_period < len(period_starts)
+                and period_starts[next_period] < current_match_start
+            ):
+                self._current_period = period_values[next_period]
+                next_period += 1
 
-            if not current_period:
+            if not self._current_period:
                 continue
 
             try:
-                disciplines.append(
+                self.disciplines.append(
                     {
-                        "period": current_period,
+                        "period": self._current_period,
                         "code": course_code,
                         "name": course_name,
                         "status": status,
@@ -109,19 +505,520 @@ def extract_disciplines(pdf_path: Path) -> List[Dict]:
             except (ValueError, IndexError):
                 continue
 
-    return disciplines
+        # Markers after the last match may still precede a row in the next chunk
+        self._period_pos = (
+            period_starts[next_period] if next_period < len(period_starts) else end
+        )
 
 
-def extract_credit_hour_summary(pdf_path: Path) -> Dict[str, int]:
+def _code_start(token: str) -> int:
     """
-    Parses the PDF to find the summary of total and optional credit hours.
+    Returns where the course code at the end of the token starts, or -1.
+
+    The code is the token's trailing digits (at least 4), preceded by the
+    2 or 3 capital letters right before them, as DATA_LINE_REGEX matches it.
+    """
+    digits_start = len(token)
+    while digits_start > 0 and token[digits_start - 1].isdecimal():
+        digits_start -= 1
+    if len(token) - digits_start < 4:
+        return -1
+
+    letters_start = digits_start
+    while (
+        letters_start > 0
+        and digits_start - letters_start < 3
+        and "A" <= token[letters_start - 1] <= "Z"
+    ):
+        letters_start -= 1
+    return letters_start if digits_start - letters_start >= 2 else -1
+
+
+def _hours_suffix(token: str) -> Optional[str]:
+    """Returns the credit hours (like "64.00") at the end of the token, if any."""
+    if not token.endswith(".00"):
+        return None
+    digits_start = len(token) - 3
+    while digits_start > 0 and token[digits_start - 1].isdecimal():
+        digits_start -= 1
+    return token[digits_start:] if digits_start < len(token) - 3 else None
+
+
+def _grade_suffix(token: str) -> Optional[str]:
+    """Returns the longest grade (like "8.5" or "10") at the end of the token, if any."""
+    for size in range(min(5, len(token)), 0, -1):
+        if GRADE_REGEX.fullmatch(token, len(token) - size):
+            return token[-size:]
+    return None
+
+
+def _status_at(line: str, pos: int) -> Optional[str]:
+    for status in ROW_STATUSES:
+        if line.startswith(status, pos):
+            return status
+    return None
+
+
+def _is_course_name_line(line: str) -> bool:
+    return COURSE_NAME_LINE_REGEX.fullmatch(line) is not None
+
+
+def _block_name(lines: List[Tuple[int, str]], default: Optional[str]) -> Optional[str]:
+    name = "\n".join(line for _, line in lines)
+    return name.strip() if len(name) >= 3 else default
+
+
+class LineDisciplineParser:
+    """
+    Finds the disciplines line by line with a deterministic state machine, in
+    time linear in the length of the text.
+
+    It accepts the same rows as DisciplineMatcher and returns the same
+    dictionaries, but never backtracks: each whitespace-separated token is
+    looked at once, while the parser waits for, in order, a course code, the
+    credit hours, and a grade followed by a status. Like DATA_LINE_REGEX, a
+    row may continue on the next line only after a token that ends its line;
+    the few alternatives the regex would backtrack into from there (see
+    _end_line) are kept as fallbacks for the next line. Course names follow
+    COURSE_NAME_REGEX, including the lines it cannot see (see _new_row).
+
+    Text can be fed in arbitrary chunks; lines are processed once complete.
+    Matching stops at the legend.
+
+    Attributes:
+        disciplines: The valid disciplines found so far.
+        done: Whether the legend has been seen (or finish has been called).
+    """
+
+    _SEEK_CODE, _SEEK_HOURS, _SEEK_GRADE, _SEEK_STATUS = range(4)
+
+    def __init__(self):
+        self.disciplines: List[Dict] = []
+        self.done = False
+        # Text after the last complete line
+        self._buffer = ""
+        self._line_number = 0
+
+        self._state = self._SEEK_CODE
+        # The row being recognized: where it starts (line number, offset),
+        # its symbol, course code, credit hours and grade
+        self._row_start: Tuple[int, int] = (0, 0)
+        self._row_code_token: Tuple[int, int] = (0, 0)
+        self._row_symbol = ""
+        self._row_code = ""
+        self._row_hours = ""
+        self._row_hours_line = 0
+        self._row_grade: Optional[str] = None
+        # The row (see _new_row), the credit hours or both to try instead if
+        # the grade ends a line and the next line does not start with a status
+        self._row_fallback_start: Optional[Tuple] = None
+        self._row_fallback_hours: Optional[Tuple[int, str]] = None
+
+        # The last token seen, whose final character may be the symbol of a
+        # course code in the next token: (line number, end offset, text)
+        self._previous_token: Optional[Tuple[int, int, str]] = None
+
+        # Period markers not yet reached by a row: (line number, offset, period)
+        self._pending_periods: Deque[Tuple[int, int, str]] = deque()
+        self._current_period: Optional[str] = None
+
+        # Consecutive course name lines, as (line number, text), and the
+        # last block of them, the name it gives and the name before it, all
+        # since the last valid discipline
+        self._name_lines: List[Tuple[int, str]] = []
+        self._name_block: List[Tuple[int, str]] = []
+        self._last_name: Optional[str] = None
+        self._name_before_block: Optional[str] = None
+        # The last line with any text, and the name of the current row
+        self._last_content_line: Optional[int] = None
+        self._row_name: Optional[str] = None
+
+    def feed(self, text: str):
+        """Adds the next chunk of text and processes every complete line."""
+        if self.done:
+            return
+
+        legend_search_start = max(0, len(self._buffer) - len(LEGEND_MARKER) + 1)
+        self._buffer += text
+
+        legend_pos = self._buffer.find(LEGEND_MARKER, legend_search_start)
+        if legend_pos != -1:
+            self._process_lines(self._buffer[:legend_pos])
+            self._close()
+            return
+
+        last_line_end = self._buffer.rfind("\n")
+        if last_line_end != -1:
+            self._process_lines(self._buffer[:last_line_end])
+            self._buffer = self._buffer[last_line_end + 1 :]
+
+    def finish(self) -> List[Dict]:
+        """Processes the remaining text and returns every valid discipline."""
+        if not self.done:
+            self._process_lines(self._buffer)
+            self._close()
+        return self.disciplines
+
+    def _close(self):
+        self.done = True
+        self._buffer = ""
+        self._pending_periods.clear()
+        self._name_lines = []
+
+    def _process_lines(self, text: str):
+        for line in text.split("\n"):
+            self._process_line(line)
+
+    def _process_line(self, line: str):
+        line_number = self._line_number
+        self._line_number += 1
+
+        for period_match in PERIOD_REGEX.finditer(line):
+            self._pending_periods.append(
+                (line_number, period_match.start(), period_match.group(1))
+            )
+
+        if self._state == self._SEEK_CODE and not CODE_REGEX.search(line):
+            # No row can start on this line, as on most lines outside the rows
+            words = line.split()
+            if words:
+                self._previous_token = (line_number, len(line.rstrip()), words[-1])
+            self._end_name_line(line_number, line, bool(words), row_on_line=False)
+            return
+
+        tokens = [(m.start(), m.group()) for m in TOKEN_REGEX.finditer(line)]
+        row_on_line = False
+        skip_until = 0
+        # The first course code on a line where the grade is sought, whose
+        # row may take credit hours that end the line
+        grade_line_code = None
+        # The token before the last one, for a code that ends the line
+        previous_before_last = self._previous_token
+        for pos, token in tokens:
+            previous_before_last = self._previous_token
+            if pos < skip_until:
+                # Second word of a two-word status
+                continue
+
+            if self._state == self._SEEK_STATUS:
+                # The grade ended the previous line: the status must come next
+                status = _status_at(line, pos)
+                if status:
+                    row_on_line |= self._complete_row(status)
+                    skip_until = pos + len(status)
+                    grade_line_code = None
+                    continue
+                self._state = self._SEEK_CODE
+                if self._row_fallback_start:
+                    self._begin_row(self._row_fallback_start)
+                if self._row_fallback_hours:
+                    self._row_hours_line, self._row_hours = self._row_fallback_hours
+                    self._row_grade = None
+                    self._state = self._SEEK_GRADE
+
+            if self._state == self._SEEK_GRADE:
+                if self._row_grade is not None:
+                    status = _status_at(line, pos)
+                    if status:
+                        row_on_line |= self._complete_row(status)
+                        skip_until = pos + len(status)
+                        grade_line_code = None
+                        continue
+                self._row_grade = _grade_suffix(token)
+                if (
+                    grade_line_code is None
+                    and self._row_hours_line != line_number
+                    and _code_start(token) != -1
+                ):
+                    grade_line_code = (
+                        pos,
+                        token,
+                        self._previous_token,
+                        pos == tokens[0][0],
+                    )
+
+            elif self._state == self._SEEK_HOURS:
+                hours = _hours_suffix(token)
+                if hours:
+                    self._row_hours = hours
+                    self._row_hours_line = line_number
+                    self._row_grade = None
+                    self._state = self._SEEK_GRADE
+
+            elif self._start_row(
+                line_number, pos, token, self._previous_token, pos == tokens[0][0]
+            ):
+                row_on_line = True
+
+            self._previous_token = (line_number, pos + len(token), token)
+
+        if self._end_line(line_number, tokens, previous_before_last, grade_line_code):
+            row_on_line = True
+
+        self._end_name_line(line_number, line, bool(tokens), row_on_line)
+
+    def _end_name_line(
+        self, line_number: int, line: str, has_content: bool, row_on_line: bool
+    ):
+        # The first line is never a name, since COURSE_NAME_REGEX needs the
+        # newline before it
+        if row_on_line or not (line_number > 0 and _is_course_name_line(line)):
+            self._close_name()
+        else:
+            self._name_lines.append((line_number, line))
+        if has_content:
+            self._last_content_line = line_number
+
+    def _start_row(
+        self,
+        line_number: int,
+        pos: int,
+        token: str,
+        previous_token: Optional[Tuple[int, int, str]],
+        first_on_line: bool,
+    ) -> bool:
+        row = self._new_row(line_number, pos, token, previous_token, first_on_line)
+        if row is None:
+            return False
+        self._begin_row(row)
+        return True
+
+    def _new_row(
+        self,
+        line_number: int,
+        pos: int,
+        token: str,
+        previous_token: Optional[Tuple[int, int, str]],
+        first_on_line: bool,
+    ) -> Optional[Tuple]:
+        """Returns the fields of a row starting at the token, if it holds a course code."""
+        code_start = _code_start(token)
+        if code_start == -1:
+            return None
+
+        symbol = ""
+        start = (line_number, pos + code_start)
+        if code_start > 0:
+            if token[code_start - 1] in ROW_SYMBOLS:
+                symbol = token[code_start - 1]
+                start = (line_number, start[1] - 1)
+        elif previous_token and previous_token[2][-1] in ROW_SYMBOLS:
+            # The symbol may be separated from the code by whitespace
+            previous_line, previous_end, previous_text = previous_token
+            symbol = previous_text[-1]
+            start = (previous_line, previous_end - 1)
+
+        # The name is searched in the text before the match of DATA_LINE_REGEX,
+        # which starts at the symbol or else at the whitespace before the code
+        if start[0] < line_number:
+            name_end_line = start[0]
+        elif code_start == 0 and first_on_line:
+            name_end_line = (
+                self._last_content_line if self._last_content_line is not None else 0
+            )
+        else:
+            name_end_line = line_number
+
+        return (
+            (line_number, pos),
+            start,
+            symbol,
+            token[code_start:],
+            self._name_until(name_end_line),
+        )
+
+    def _begin_row(self, row: Tuple):
+        self._state = self._SEEK_HOURS
+        (
+            self._row_code_token,
+            self._row_start,
+            self._row_symbol,
+            self._row_code,
+            self._row_name,
+        ) = row
+
+    def _end_line(
+        self,
+        line_number: int,
+        tokens: List[Tuple[int, str]],
+        previous_token: Optional[Tuple[int, int, str]],
+        grade_line_code: Optional[Tuple],
+    ) -> bool:
+        """
+        Decides whether the unfinished row continues on the next line, which
+        is only possible after a token that ends this line. Returns whether a
+        new row starts at that token.
+        """
+        if not tokens or self._state == self._SEEK_CODE:
+            return False
+        last_pos, last_token = tokens[-1]
+
+        if self._state == self._SEEK_GRADE and self._row_grade is not None:
+            self._state = self._SEEK_STATUS
+            # Following DATA_LINE_REGEX's backtracking, the next candidate is
+            # credit hours that end the line, for this row if they are on its
+            # credit hours line or else for the first course code before
+            # them, or a course code that ends the line
+            hours = _hours_suffix(last_token)
+            self._row_fallback_start = self._row_fallback_hours = None
+            if hours:
+                if self._row_hours_line == line_number:
+                    self._row_fallback_hours = (line_number, hours)
+                elif grade_line_code:
+                    self._row_fallback_start = self._new_row(
+                        line_number, *grade_line_code
+                    )
+                    self._row_fallback_hours = (line_number, hours)
+            else:
+                self._row_fallback_start = self._new_row(
+                    line_number,
+                    last_pos,
+                    last_token,
+                    previous_token,
+                    last_pos == tokens[0][0],
+                )
+        elif self._state == self._SEEK_GRADE and _hours_suffix(last_token):
+            self._row_hours = _hours_suffix(last_token)
+            self._row_hours_line = line_number
+        elif self._row_code_token == (line_number, last_pos):
+            pass
+        elif _code_start(last_token) != -1:
+            return self._start_row(
+                line_number,
+                last_pos,
+                last_token,
+                previous_token,
+                last_pos == tokens[0][0],
+            )
+        else:
+            self._state = self._SEEK_CODE
+        return False
+
+    def _close_name(self):
+        if not self._name_lines:
+            return
+        # Like COURSE_NAME_REGEX, a block of at least 3 characters replaces
+        # the names found before it
+        self._name_block = self._name_lines
+        self._name_before_block = self._last_name
+        self._last_name = _block_name(self._name_block, self._name_before_block)
+        self._name_lines = []
+
+    def _name_until(self, end_line: int) -> Optional[str]:
+        """Returns the last course name on the lines before end_line."""
+        self._close_name()
+        if not self._name_block or self._name_block[-1][0] < end_line:
+            return self._last_name
+        lines = [line for line in self._name_block if line[0] < end_line]
+        return _block_name(lines, self._name_before_block)
+
+    def _complete_row(self, status: str) -> bool:
+        """
+        Ends the current row with the status. Returns False if the row is
+        skipped, in which case its line may still be part of a course name.
+        """
+        self._state = self._SEEK_CODE
+        self._previous_token = None
+
+        while self._pending_periods and self._pending_periods[0][:2] < self._row_start:
+            self._current_period = self._pending_periods.popleft()[2]
+
+        if self._row_symbol in SKIPPED_SYMBOLS or status in SKIPPED_STATUSES:
+            return False
+
+        course_name = self._row_name
+        if course_name is None:
+            course_name = "NOME NÃO ENCONTRADO"
+        self._name_lines = []
+        self._name_block = []
+        self._last_name = self._name_before_block = None
+
+        if not self._current_period:
+            return True
+
+        self.disciplines.append(
+            {
+                "period": self._current_period,
+                "code": self._row_code,
+                "name": course_name,
+                "status": status,
+                "grade": float(self._row_grade),
+                "credit_hours": float(self._row_hours),
+                "symbol": self._row_symbol,
+            }
+        )
+        return True
+
+
+DISCIPLINE_PARSERS = {
+    "regex": DisciplineMatcher,
+    "lines": LineDisciplineParser,
+}
+
+# Discipline parser used when none is given. "lines" runs in linear time on
+# any input, while "regex" backtracks for seconds on some corrupted PDFs; both
+# find the same disciplines on well-formed transcripts, which
+# benchmarks/discipline_parsers.py checks. "regex" is kept to compare against.
+DEFAULT_DISCIPLINE_PARSER = os.getenv("IRA_DISCIPLINE_PARSER", "lines")
+
+# Processes the app lays a long upload out with (see parse_transcript). The
+# default of 1 always streams the pages; raise it only on hosts with spare
+# CPUs, together with PARALLEL_PAGE_THRESHOLD.
+DEFAULT_PAGE_WORKERS = int(os.getenv("IRA_PAGE_WORKERS", 1))
+
+
+def new_discipline_parser(name: Optional[str] = None):
+    """
+    Returns a new incremental discipline parser (see DisciplineMatcher).
+
+    Args:
+        name: A key of DISCIPLINE_PARSERS. Defaults to DEFAULT_DISCIPLINE_PARSER.
+
+    Raises:
+        ValueError: If the parser is unknown.
+    """
+    name = name or DEFAULT_DISCIPLINE_PARSER
+    try:
+        return DISCIPLINE_PARSERS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown discipline parser '{name}'. Options: {', '.join(DISCIPLINE_PARSERS)}"
+        )
+
+
+def parse_disciplines(full_text: str, parser: Optional[str] = None) -> List[Dict]:
+    """
+    Extracts course information from the text of a student transcript.
+
+    The whole text is fed at once to a new incremental parser (see
+    DisciplineMatcher), which matches the rows in a single forward pass up to
+    the legend, carrying the current period and the course name along, and
+    leaves out the rows that do not count towards the IRA. The streaming
+    parse_transcript feeds the same parser one page at a time instead.
+
+    Args:
+        full_text: The transcript text, laid out with DISCIPLINES_X_TOLERANCE.
+        parser: The discipline parser (see DISCIPLINE_PARSERS). Defaults to
+            DEFAULT_DISCIPLINE_PARSER.
+
+    Returns:
+        A list of dictionaries, each representing a valid discipline for calculation.
+    """
+    matcher = new_discipline_parser(parser)
+    matcher.feed(full_text)
+    return matcher.finish()
+
+
+def parse_credit_hour_summary(full_text: str) -> Dict[str, int]:
+    """
+    Parses the transcript text to find the summary of total and optional credit hours.
 
     This function looks for the lines starting with "Carga Horária Total" and
     "Carga Horária Optativa" and extracts the 'required', 'completed', and
     'pending' hours for each category.
 
     Args:
-        pdf_path: The Path object for the PDF file.
+        full_text: The transcript text, laid out with pdfplumber's defaults.
 
     Returns:
         A dictionary containing the summary of credit hours. Returns a dictionary
@@ -136,19 +1033,12 @@ def extract_credit_hour_summary(pdf_path: Path) -> Dict[str, int]:
     }
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            full_text = "".join([page.extract_text() or "" for page in pdf.pages])
-
-        total_pattern = re.compile(r"Carga Horária Total\s+(\d+)\s+(\d+)")
-        total_match = total_pattern.search(full_text)
+        total_match = TOTAL_HOURS_REGEX.search(full_text)
         if total_match:
             summary["required_hours"] = int(total_match.group(1))
             summary["completed_hours"] = int(total_match.group(2))
 
-        optional_pattern = re.compile(
-            r"Carga Horária Optativa\s+(\d+)\s+(\d+)\s+\d+\s+(\d+)"
-        )
-        optional_match = optional_pattern.search(full_text)
+        optional_match = OPTIONAL_HOURS_REGEX.search(full_text)
         if optional_match:
             summary["optional_required_hours"] = int(optional_match.group(1))
             summary["optional_completed_hours"] = int(optional_match.group(2))
@@ -160,16 +1050,16 @@ def extract_credit_hour_summary(pdf_path: Path) -> Dict[str, int]:
     return summary
 
 
-def extract_pending_courses(pdf_path: Path) -> List[Dict]:
+def parse_pending_courses(full_text: str) -> List[Dict]:
     """
-    Parses the PDF transcript to find and extract the list of pending mandatory courses.
+    Parses the transcript text to find and extract the list of pending mandatory courses.
 
     This function searches for the specific section and then uses regular expressions
     to parse each subsequent line, extracting the course code, name, and
     credit hours for each pending course.
 
     Args:
-        pdf_path: The Path object for the PDF file.
+        full_text: The transcript text, laid out with pdfplumber's defaults.
 
     Returns:
         A list of dictionaries, where each dictionary represents a pending course
@@ -178,31 +1068,23 @@ def extract_pending_courses(pdf_path: Path) -> List[Dict]:
     """
     pending_courses = []
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            full_text = "".join([page.extract_text() or "" for page in pdf.pages])
-
         # 1. Isolate the relevant section of the text
         # Find the start of the pending courses section
-        start_marker = "Componentes Curriculares Obrigatórios Pendentes"
-        start_index = full_text.find(start_marker)
+        start_index = full_text.find(PENDING_START_MARKER)
 
         if start_index == -1:
             return []
 
         # The relevant text is everything after the marker
-        relevant_text = full_text[start_index + len(start_marker) :]
-        end_marker = "Equivalências:"
-        end_index = relevant_text.find(end_marker)
+        relevant_text = full_text[start_index + len(PENDING_START_MARKER) :]
+        end_index = relevant_text.find(PENDING_END_MARKER)
         if end_index != -1:
             relevant_text = relevant_text[:end_index]
 
-        # 2. Define the regex to find each course line
-        course_pattern = re.compile(r"([A-Z]{2,3}\d{4,})\s+(.*?)\s+(\d+)\s*h")
-
-        # 3. Find all matches in the isolated text
-        matches = course_pattern.findall(relevant_text)
+        # 2. Find all course lines in the isolated text
+        matches = PENDING_COURSE_REGEX.findall(relevant_text)
 
-        # 4. Process each match and create a dictionary
+        # 3. Process each match and create a dictionary
         for match in matches:
             pending_courses.append(
                 {
@@ -217,3 +1099,61 @@ def extract_pending_courses(pdf_path: Path) -> List[Dict]:
 
     pending_courses.sort(key=lambda x: x["name"])
     return pending_courses
+
+
+def extract_disciplines(path_or_fp: PdfSource) -> List[Dict]:
+    """
+    Reads a student transcript PDF file and extracts course information.
+
+    Prefer parse_transcript when more than one section of the transcript is
+    needed, so the PDF is only laid out once.
+
+    Args:
+        path_or_fp: The transcript PDF, as a path, bytes or a binary file object.
+
+    Returns:
+        A list of dictionaries, each representing a valid discipline for calculation.
+    """
+    page_texts = _read_page_texts(path_or_fp, x_tolerance=DISCIPLINES_X_TOLERANCE)
+    return parse_disciplines("".join(page_texts))
+
+
+def extract_credit_hour_summary(path_or_fp: PdfSource) -> Dict[str, int]:
+    """
+    Parses the PDF to find the summary of total and optional credit hours.
+
+    Args:
+        path_or_fp: The transcript PDF, as a path, bytes or a binary file object.
+
+    Returns:
+        A dictionary containing the summary of credit hours. Returns a dictionary
+        with default zero values if data cannot be found or an error occurs.
+    """
+    try:
+        page_texts = _read_page_texts(path_or_fp)
+    except Exception as e:
+        print(f"Could not parse credit hour summary: {e}")
+        page_texts = []
+
+    return parse_credit_hour_summary("".join(page_texts))
+
+
+def extract_pending_courses(path_or_fp: PdfSource) -> List[Dict]:
+    """
+    Parses the PDF transcript to find and extract the list of pending mandatory courses.
+
+    Args:
+        path_or_fp: The transcript PDF, as a path, bytes or a binary file object.
+
+    Returns:
+        A list of dictionaries, where each dictionary represents a pending course
+        with 'code', 'name', and 'credit_hours'. Returns an empty list if the
+        section is not found or an error occurs.
+    """
+    try:
+        page_texts = _read_page_texts(path_or_fp)
+    except Exception as e:
+        print(f"Could not parse pending courses: {e}")
+        return []
+
+    return parse_pending_courses("".join(page_texts))
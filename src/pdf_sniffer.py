@@ -0,0 +1,190 @@
+import io
+import itertools
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from pdfminer.converter import TextConverter
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.psparser import PSLiteral
+from pdfminer.pdftypes import resolve1
+from pdfminer.utils import decode_text
+
+from src.text_backends import PdfSource
+
+# Transcripts have a few pages; anything much longer is rejected before any
+# page is read
+MAX_TRANSCRIPT_PAGES = int(os.getenv("IRA_MAX_TRANSCRIPT_PAGES", 30))
+
+# Markers of a SIGAA transcript from UFC. Each group must be found on the first
+# page or in the PDF metadata; any of the alternatives of a group will do.
+TRANSCRIPT_MARKERS = (
+    ("UNIVERSIDADE FEDERAL DO CEARÁ",),
+    ("SIGAA", "SISTEMA INTEGRADO DE GESTÃO DE ATIVIDADES ACADÊMICAS"),
+    ("HISTÓRICO",),
+)
+
+# Layout versions reported by sniff_transcript. LAYOUT_TABLE_V1 is the
+# disciplines table the parsers are written for (course codes followed by the
+# credit hours as "64.00"), seen on the first page. LAYOUT_UNRECOGNIZED is a
+# transcript whose first page has no such row.
+LAYOUT_TABLE_V1 = "sigaa-ufc-1"
+LAYOUT_UNRECOGNIZED = "sigaa-ufc"
+
+# A course code followed by decimal credit hours, in text without whitespace
+TABLE_V1_ROW_REGEX = re.compile(r"[A-Z]{2,3}\d{4,}\D{0,40}?\d+\.00")
+
+# Metadata fields searched for the markers
+METADATA_FIELDS = ("Title", "Subject", "Keywords", "Author", "Creator", "Producer")
+
+
+@dataclass(frozen=True)
+class SniffResult:
+    """
+    What a quick look at a PDF tells about it.
+
+    Attributes:
+        is_transcript: Whether the PDF looks like a SIGAA transcript from UFC.
+        layout_version: The detected layout (LAYOUT_TABLE_V1 or
+            LAYOUT_UNRECOGNIZED), or None if the PDF is not a transcript.
+        page_count: The number of pages, or 0 if the PDF could not be opened.
+        reason: Why the PDF was rejected, to be shown to the user.
+    """
+
+    is_transcript: bool
+    layout_version: Optional[str] = None
+    page_count: int = 0
+    reason: Optional[str] = None
+
+
+def _normalize(text: str) -> str:
+    """Upper-cases the text and drops its accents and whitespace, so that the
+    markers are found however the PDF spaces its words."""
+    decomposed = unicodedata.normalize("NFKD", text.upper())
+    return "".join(
+        char
+        for char in decomposed
+        if not unicodedata.combining(char) and not char.isspace()
+    )
+
+
+NORMALIZED_MARKERS = tuple(
+    tuple(_normalize(marker) for marker in group) for group in TRANSCRIPT_MARKERS
+)
+
+
+def _metadata_text(document: PDFDocument) -> str:
+    values = []
+    for info in document.info:
+        for key in METADATA_FIELDS:
+            value = resolve1(info.get(key))
+            if isinstance(value, bytes):
+                values.append(decode_text(value))
+            elif isinstance(value, PSLiteral):
+                values.append(str(value.name))
+            elif isinstance(value, str):
+                values.append(value)
+    return "\n".join(values)
+
+
+def _page_count(document: PDFDocument, max_pages: int) -> int:
+    """Reads the page count from the page tree, counting at most max_pages + 1
+    pages if the tree does not declare it."""
+    pages = resolve1(document.catalog.get("Pages"))
+    if isinstance(pages, dict):
+        count = resolve1(pages.get("Count"))
+        if isinstance(count, int) and count >= 0:
+            return count
+    return sum(
+        1 for _ in itertools.islice(PDFPage.create_pages(document), max_pages + 1)
+    )
+
+
+def _first_page_text(document: PDFDocument) -> str:
+    """Returns the characters of the first page in content stream order,
+    without any layout analysis."""
+    page = next(PDFPage.create_pages(document), None)
+    if page is None:
+        return ""
+    rsrcmgr = PDFResourceManager(caching=True)
+    output = io.StringIO()
+    device = TextConverter(rsrcmgr, output, laparams=None)
+    try:
+        PDFPageInterpreter(rsrcmgr, device).process_page(page)
+    finally:
+        device.close()
+    return output.getvalue()
+
+
+def sniff_transcript(
+    path_or_fp: PdfSource, max_pages: int = MAX_TRANSCRIPT_PAGES
+) -> SniffResult:
+    """
+    Checks, in a few milliseconds, whether a PDF is a SIGAA transcript, before
+    the full extraction runs.
+
+    Only the PDF header, the metadata, the page count and the characters of
+    the first page are read; no page is laid out.
+
+    Args:
+        path_or_fp: The PDF, as a path, bytes or a binary file object.
+        max_pages: PDFs with more pages are rejected without reading any page.
+
+    Returns:
+        A SniffResult. Rejected PDFs have is_transcript False and a reason.
+    """
+    if isinstance(path_or_fp, (str, Path)):
+        stream = open(path_or_fp, "rb")
+    elif isinstance(path_or_fp, (bytes, bytearray, memoryview)):
+        stream = io.BytesIO(path_or_fp)
+    else:
+        stream = path_or_fp
+        stream.seek(0)
+
+    try:
+        if b"%PDF-" not in stream.read(1024):
+            return SniffResult(False, reason="O arquivo não é um PDF.")
+        stream.seek(0)
+
+        try:
+            document = PDFDocument(PDFParser(stream))
+            page_count = _page_count(document, max_pages)
+            if page_count > max_pages:
+                return SniffResult(
+                    False,
+                    page_count=page_count,
+                    reason=(
+                        f"O PDF tem {page_count} páginas, mais do que um histórico "
+                        f"do SIGAA ({max_pages} no máximo)."
+                    ),
+                )
+            metadata = _metadata_text(document)
+            first_page = _first_page_text(document)
+        except Exception as e:
+            # pdfminer fails on corrupted files with all sorts of errors,
+            # assertions included
+            print(f"Could not read the PDF: {type(e).__name__}: {e}")
+            return SniffResult(
+                False,
+                reason="O PDF não pôde ser lido. Ele pode estar corrompido ou protegido.",
+            )
+    finally:
+        if isinstance(path_or_fp, (str, Path)):
+            stream.close()
+
+    text = _normalize(first_page + "\n" + metadata)
+    if not all(any(marker in text for marker in group) for group in NORMALIZED_MARKERS):
+        return SniffResult(
+            False,
+            page_count=page_count,
+            reason="O PDF não parece ser um histórico escolar do SIGAA da UFC.",
+        )
+
+    layout = LAYOUT_TABLE_V1 if TABLE_V1_ROW_REGEX.search(text) else LAYOUT_UNRECOGNIZED
+    return SniffResult(True, layout_version=layout, page_count=page_count)
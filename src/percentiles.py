@@ -0,0 +1,156 @@
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Points kept per course. Up to this many students, a course's sketch holds
+# every IRA and its percentiles are exact; beyond it, they are accurate to
+# about 100 / PERCENTILE_SKETCH_SIZE percentage points.
+PERCENTILE_SKETCH_SIZE = int(os.getenv("IRA_PERCENTILE_SKETCH_SIZE", 256))
+
+
+class PercentileSketch:
+    """
+    A compact summary of a course's Individual IRA distribution: sorted
+    points, each standing for a number of students (its weight).
+
+    The percentile of an IRA is the share of the weight at or below it,
+    found by binary search over the points. Sketches merge, so new students
+    are added without the values the sketch was built from.
+
+    Attributes:
+        points: The sorted IRA values.
+        weights: The number of students each point stands for.
+        size: The maximum number of points kept.
+    """
+
+    __slots__ = ("points", "weights", "size", "_cumulative")
+
+    def __init__(
+        self,
+        points: Iterable[float],
+        weights: Iterable[float],
+        size: int = PERCENTILE_SKETCH_SIZE,
+    ):
+        points = np.asarray(points, dtype=np.float64)
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(points) != len(weights):
+            raise ValueError("A sketch needs one weight per point")
+        order = np.argsort(points, kind="stable")
+        self.points, self.weights = _compress(points[order], weights[order], size)
+        self.size = size
+        self._cumulative = np.cumsum(self.weights)
+
+    @classmethod
+    def from_values(
+        cls, values: Iterable[float], size: int = PERCENTILE_SKETCH_SIZE
+    ) -> "PercentileSketch":
+        """Builds the sketch of a list of IRA values."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        return cls(values, np.ones(len(values)), size)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def __repr__(self) -> str:
+        return f"PercentileSketch({self.count:.0f} students, {len(self)} points)"
+
+    @property
+    def count(self) -> float:
+        """The number of students summarized."""
+        return float(self._cumulative[-1]) if len(self) else 0.0
+
+    def merge(self, other: "PercentileSketch") -> "PercentileSketch":
+        """Returns the sketch of the students of both sketches."""
+        return PercentileSketch(
+            np.concatenate([self.points, other.points]),
+            np.concatenate([self.weights, other.weights]),
+            self.size,
+        )
+
+    def add_values(self, values: Iterable[float]) -> "PercentileSketch":
+        """Returns the sketch with more students' IRA values added."""
+        return self.merge(PercentileSketch.from_values(values, self.size))
+
+    def percentile(self, individual_ira: float) -> Optional[float]:
+        """
+        Returns the percentage of students with an Individual IRA at or below
+        the given one, or None if the sketch is empty.
+        """
+        if not len(self):
+            return None
+        position = np.searchsorted(self.points, individual_ira, side="right")
+        if position == 0:
+            return 0.0
+        return 100.0 * float(self._cumulative[position - 1]) / self.count
+
+
+def _compress(
+    points: np.ndarray, weights: np.ndarray, size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    # Sorted points beyond the size are replaced by size points of equal
+    # weight, each the point at the middle of its share of the total weight
+    if len(points) <= size:
+        return points, weights
+    cumulative = np.cumsum(weights)
+    total = cumulative[-1]
+    middles = (np.arange(size) + 0.5) * total / size
+    indices = np.minimum(np.searchsorted(cumulative, middles), len(points) - 1)
+    return points[indices], np.full(size, total / size)
+
+
+class PercentileIndex:
+    """
+    The percentile sketches of every course, keyed by the course name in
+    upper case, as in the 'ira' table.
+    """
+
+    def __init__(self, sketches: Optional[Dict[str, PercentileSketch]] = None):
+        self.sketches: Dict[str, PercentileSketch] = {}
+        for course, sketch in (sketches or {}).items():
+            self.sketches[course.strip().upper()] = sketch
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple]) -> "PercentileIndex":
+        """Builds the index from (curso, pontos, pesos) rows of the 'ira_percentis' table."""
+        return cls(
+            {
+                course: PercentileSketch(points, weights)
+                for course, points, weights in rows
+            }
+        )
+
+    def to_rows(self) -> List[Tuple[str, List[float], List[float], int]]:
+        """Returns (curso, pontos, pesos, estudantes) rows for the 'ira_percentis' table."""
+        return [
+            (
+                course,
+                sketch.points.tolist(),
+                sketch.weights.tolist(),
+                round(sketch.count),
+            )
+            for course, sketch in sorted(self.sketches.items())
+        ]
+
+    def __contains__(self, course: str) -> bool:
+        return course.strip().upper() in self.sketches
+
+    def get(self, course: str) -> Optional[PercentileSketch]:
+        return self.sketches.get(course.strip().upper())
+
+    def update(self, course: str, values: Iterable[float]):
+        """Adds more students' Individual IRA to the course's sketch."""
+        key = course.strip().upper()
+        sketch = self.sketches.get(key)
+        if sketch is None:
+            self.sketches[key] = PercentileSketch.from_values(values)
+        else:
+            self.sketches[key] = sketch.add_values(values)
+
+    def percentile(self, course: str, individual_ira: float) -> Optional[float]:
+        """
+        Returns the percentage of the course's students with an Individual IRA
+        at or below the given one, or None if the course is not indexed.
+        """
+        sketch = self.get(course)
+        return sketch.percentile(individual_ira) if sketch is not None else None
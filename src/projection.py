@@ -0,0 +1,134 @@
+import os
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.calculations import IraSums, calculate_general_iras
+from src.transcript import Status, Transcript
+
+# Scenarios sampled per projection; 20 000 keep the 5th and 95th percentiles
+# stable to about 0.01 and take a few milliseconds
+PROJECTION_SCENARIOS = int(os.getenv("IRA_PROJECTION_SCENARIOS", 20000))
+PROJECTION_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(frozen=True)
+class GradeModel:
+    """
+    A distribution of future grades fitted to a student's history: a
+    smoothed bootstrap of their graded disciplines (each sample is a past
+    grade plus Gaussian noise, kept between 0 and 10) and the share of
+    their disciplines they dropped.
+
+    Attributes:
+        grades: The grades of the graded disciplines of the history.
+        bandwidth: The standard deviation of the noise added to each sample,
+            by Silverman's rule of thumb.
+        drop_rate: The fraction of the history's disciplines that were dropped.
+    """
+
+    grades: np.ndarray
+    bandwidth: float
+    drop_rate: float
+
+    @classmethod
+    def fit(cls, history: Transcript) -> Optional["GradeModel"]:
+        """Fits the model to a transcript, or returns None if it has no grades."""
+        grades = history.grades[history.graded_mask()]
+        if not len(grades):
+            return None
+        bandwidth = 1.06 * float(grades.std()) * len(grades) ** (-1 / 5)
+        drop_rate = float(np.mean(history.statuses == Status.TRANCADO))
+        return cls(grades=grades, bandwidth=bandwidth, drop_rate=drop_rate)
+
+    def sample(self, shape, rng: np.random.Generator):
+        """Returns sampled grades and whether each discipline was dropped."""
+        grades = rng.choice(self.grades, size=shape)
+        if self.bandwidth > 0:
+            grades = np.clip(grades + rng.normal(0, self.bandwidth, shape), 0, 10)
+        dropped = rng.random(shape) < self.drop_rate
+        return grades, dropped
+
+
+@dataclass(frozen=True)
+class IraProjection:
+    """
+    The Individual and General IRA of every sampled scenario.
+
+    Attributes:
+        individual_iras: The Individual IRA of each scenario.
+        general_iras: The General IRA of each scenario.
+    """
+
+    individual_iras: np.ndarray
+    general_iras: np.ndarray
+
+    def bands(self, percentiles: Sequence[float] = PROJECTION_PERCENTILES):
+        """
+        Returns a DataFrame indexed by percentile with the columns
+        "individual" and "general".
+        """
+        return pd.DataFrame(
+            {
+                "individual": np.percentile(self.individual_iras, percentiles),
+                "general": np.percentile(self.general_iras, percentiles),
+            },
+            index=pd.Index(percentiles, name="percentile"),
+        )
+
+
+def project_ira(
+    current: IraSums,
+    model: GradeModel,
+    semesters: np.ndarray,
+    credit_hours: np.ndarray,
+    course_avg: float,
+    course_dev: float,
+    scenarios: int = PROJECTION_SCENARIOS,
+    seed: Optional[int] = 0,
+) -> IraProjection:
+    """
+    Projects the IRA after the planned disciplines, sampling their grades
+    (and whether they are dropped) from the model in every scenario.
+
+    All the scenarios are evaluated at once: each is a row of a scenarios x
+    disciplines matrix, added to the sums of the current transcript.
+
+    Args:
+        current: The sums of the disciplines already taken.
+        model: The distribution of the future grades.
+        semesters: The semester index (year * 2 + semester) of each planned
+            discipline's period.
+        credit_hours: The credit hours of each planned discipline.
+        course_avg: The average IRA for the course.
+        course_dev: The standard deviation of the IRA for the course.
+        scenarios: The number of scenarios.
+        seed: The seed of the random generator. The default keeps the
+            projection the same across reruns of the app.
+
+    Returns:
+        The IraProjection of the scenarios.
+    """
+    credit_hours = np.asarray(credit_hours, dtype=np.float64)
+    weighted_hours = current.period_weights(semesters) * credit_hours
+
+    rng = np.random.default_rng(seed)
+    grades, dropped = model.sample((scenarios, len(credit_hours)), rng)
+    taken = ~dropped
+
+    numerators = current.numerator + (grades * taken) @ weighted_hours
+    denominators = current.denominator + taken @ weighted_hours
+    dropped_hours = current.dropped_hours + dropped @ credit_hours
+    total_hours = current.total_hours + credit_hours.sum()
+
+    valid = (total_hours != 0) & (denominators != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        penalty_factors = 1.0 - (0.5 * dropped_hours) / total_hours
+        individual_iras = np.where(
+            valid, penalty_factors * (numerators / denominators), 0.0
+        )
+
+    general_iras = calculate_general_iras(individual_iras, course_avg, course_dev)
+    return IraProjection(individual_iras=individual_iras, general_iras=general_iras)
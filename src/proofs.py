@@ -0,0 +1,129 @@
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Largest proof stored, in bytes; bigger images are downscaled and recompressed
+PROOF_MAX_BYTES = int(os.getenv("IRA_PROOF_MAX_BYTES", 300_000))
+# Longest side, in pixels, of a stored proof
+PROOF_MAX_SIDE = int(os.getenv("IRA_PROOF_MAX_SIDE", 1600))
+# Below this longest side, a proof is no longer shrunk to fit the budget
+PROOF_MIN_SIDE = 480
+JPEG_QUALITIES = (85, 70, 55)
+
+CONTENT_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg"}
+
+
+@dataclass(frozen=True)
+class Proof:
+    """
+    A proof image as stored in the 'forms' table.
+
+    Attributes:
+        data: The image file.
+        content_type: Its MIME type, "image/png" or "image/jpeg".
+        sha256: The hexadecimal SHA-256 of data.
+        original_size: The size in bytes of the file that was uploaded.
+    """
+
+    data: bytes
+    content_type: str
+    sha256: str
+    original_size: int
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def extension(self) -> str:
+        return ".jpg" if self.content_type == "image/jpeg" else ".png"
+
+
+def prepare_proof(
+    image_bytes: bytes,
+    max_bytes: int = PROOF_MAX_BYTES,
+    max_side: int = PROOF_MAX_SIDE,
+) -> Proof:
+    """
+    Fits an uploaded screenshot into the storage budget.
+
+    An image within max_bytes is stored as uploaded. A bigger screenshot
+    with at most 256 colors is first saved as a palette PNG at full size,
+    which keeps its text sharp. Otherwise the image is downscaled to
+    max_side and saved as a JPEG of decreasing quality, shrinking it further
+    (down to PROOF_MIN_SIDE) until it fits; if nothing fits, the smallest
+    attempt is kept.
+
+    Args:
+        image_bytes: The uploaded PNG or JPEG file.
+        max_bytes: The largest size to store, in bytes.
+        max_side: The longest side, in pixels, of a downscaled image.
+
+    Returns:
+        The Proof to store.
+
+    Raises:
+        ValueError: If the file is not a PNG or JPEG image.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        if image.format not in CONTENT_TYPES:
+            raise ValueError(f"Unsupported proof format: {image.format}")
+        if len(image_bytes) > max_bytes and image.format == "JPEG":
+            # Decodes the JPEG already reduced by a power of two, much faster
+            image.draft("RGB", (max_side, max_side))
+        image.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise ValueError("The proof is not a valid image") from e
+
+    if len(image_bytes) <= max_bytes:
+        return _proof(image_bytes, CONTENT_TYPES[image.format], len(image_bytes))
+
+    best = (image_bytes, CONTENT_TYPES[image.format])
+    if image.getcolors(256) is not None:
+        buffer = io.BytesIO()
+        palette = _flatten(image).quantize(256, method=Image.Quantize.FASTOCTREE)
+        palette.save(buffer, "PNG", compress_level=6)
+        best = min(best, (buffer.getvalue(), "image/png"), key=lambda b: len(b[0]))
+        if len(best[0]) <= max_bytes:
+            return _proof(best[0], best[1], len(image_bytes))
+
+    # Photos of screens carry their rotation in the EXIF data, which is dropped
+    image = _flatten(ImageOps.exif_transpose(image))
+    side = max_side
+    while True:
+        scaled = image.copy()
+        scaled.thumbnail((side, side))
+        for quality in JPEG_QUALITIES:
+            buffer = io.BytesIO()
+            scaled.save(buffer, "JPEG", quality=quality)
+            data = buffer.getvalue()
+            if len(data) < len(best[0]):
+                best = (data, "image/jpeg")
+            if len(data) <= max_bytes:
+                return _proof(data, "image/jpeg", len(image_bytes))
+        if side <= PROOF_MIN_SIDE:
+            return _proof(best[0], best[1], len(image_bytes))
+        side = max(PROOF_MIN_SIDE, int(side * 0.75))
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    # JPEG has no transparency, so it is painted over white
+    if image.mode in ("RGB", "L"):
+        return image
+    image = image.convert("RGBA")
+    background = Image.new("RGB", image.size, "white")
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def _proof(data: bytes, content_type: str, original_size: int) -> Proof:
+    return Proof(
+        data=data,
+        content_type=content_type,
+        sha256=hashlib.sha256(data).hexdigest(),
+        original_size=original_size,
+    )
@@ -0,0 +1,243 @@
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, List, Optional
+
+import psycopg2
+
+from src.proofs import Proof, prepare_proof
+
+# Suggestions waiting to be written; submits beyond it are refused
+SUGGESTION_QUEUE_SIZE = int(os.getenv("IRA_SUGGESTION_QUEUE_SIZE", 100))
+# Suggestions written in one transaction at most
+SUGGESTION_BATCH_SIZE = int(os.getenv("IRA_SUGGESTION_BATCH_SIZE", 20))
+# Attempts to write a batch while the database is unreachable
+SUGGESTION_MAX_ATTEMPTS = int(os.getenv("IRA_SUGGESTION_MAX_ATTEMPTS", 5))
+# Seconds before the first retry, doubled on each of the next ones
+SUGGESTION_RETRY_DELAY = float(os.getenv("IRA_SUGGESTION_RETRY_DELAY", 1))
+# Finished tickets kept for polling
+TICKETS_KEPT = 1000
+
+
+class SuggestionStatus(Enum):
+    PENDING = "pending"
+    SAVED = "saved"
+    FAILED = "failed"
+
+
+@dataclass
+class CourseSuggestion:
+    """
+    A course suggestion waiting to be written.
+
+    Attributes:
+        ticket_id: The id of its ticket.
+        course_name: The suggested course name.
+        average: The course average (IRAm).
+        deviation: The course standard deviation (IRAdp).
+        proof_bytes: The uploaded proof image.
+        proof: The proof as stored, once prepared by the worker.
+    """
+
+    ticket_id: str
+    course_name: str
+    average: float
+    deviation: float
+    proof_bytes: bytes
+    proof: Optional[Proof] = None
+
+
+@dataclass
+class SuggestionTicket:
+    """
+    The status of a submitted suggestion.
+
+    Attributes:
+        id: The ticket id.
+        status: Whether the suggestion is pending, saved or failed.
+        error: The message to show if it failed.
+    """
+
+    id: str
+    status: SuggestionStatus = SuggestionStatus.PENDING
+    error: Optional[str] = None
+
+
+class SuggestionQueue:
+    """
+    A bounded queue of course suggestions written to the database by a
+    background thread, so that submitting one returns at once.
+
+    The worker prepares the proofs, writes every suggestion waiting (up to
+    batch_size) in a single call to insert_batch, and retries the batch with
+    exponential backoff while the database is unreachable. A batch rejected
+    for another reason is retried one suggestion at a time, so that only the
+    faulty ones fail. An unexpected error fails the tickets of its batch but
+    never stops the worker.
+    """
+
+    def __init__(
+        self,
+        insert_batch: Callable[[List[CourseSuggestion]], None],
+        maxsize: int = SUGGESTION_QUEUE_SIZE,
+        batch_size: int = SUGGESTION_BATCH_SIZE,
+        max_attempts: int = SUGGESTION_MAX_ATTEMPTS,
+        retry_delay: float = SUGGESTION_RETRY_DELAY,
+    ):
+        """
+        Args:
+            insert_batch: Writes suggestions in one transaction, raising
+                psycopg2.Error on failure.
+            maxsize: Suggestions waiting at most.
+            batch_size: Suggestions written together at most.
+            max_attempts: Attempts to write a batch while the database is
+                unreachable.
+            retry_delay: Seconds before the first retry.
+        """
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._insert_batch = insert_batch
+        self._queue: "queue.Queue[CourseSuggestion]" = queue.Queue(maxsize)
+        self._tickets: "OrderedDict[str, SuggestionTicket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        threading.Thread(
+            target=self._work, name="suggestion-writer", daemon=True
+        ).start()
+
+    def submit(
+        self, course_name: str, average: float, deviation: float, proof_bytes: bytes
+    ) -> Optional[SuggestionTicket]:
+        """
+        Queues a suggestion and returns its ticket, or None if the queue is full.
+        """
+        ticket = SuggestionTicket(id=uuid.uuid4().hex)
+        suggestion = CourseSuggestion(
+            ticket.id, course_name, average, deviation, proof_bytes
+        )
+        with self._lock:
+            self._tickets[ticket.id] = ticket
+            self._prune_tickets()
+        try:
+            self._queue.put_nowait(suggestion)
+        except queue.Full:
+            with self._lock:
+                del self._tickets[ticket.id]
+            return None
+        return ticket
+
+    def ticket(self, ticket_id: str) -> Optional[SuggestionTicket]:
+        """Returns the ticket with the id, or None if it is unknown."""
+        with self._lock:
+            return self._tickets.get(ticket_id)
+
+    def pending(self) -> int:
+        """The number of suggestions waiting to be written."""
+        return self._queue.qsize()
+
+    def close(self):
+        """Stops the worker after the batch it is writing."""
+        self._closed.set()
+
+    def _prune_tickets(self):
+        # The oldest finished tickets; pending ones are bounded by the queue
+        excess = len(self._tickets) - TICKETS_KEPT
+        for ticket_id in list(self._tickets):
+            if excess <= 0:
+                break
+            if self._tickets[ticket_id].status is not SuggestionStatus.PENDING:
+                del self._tickets[ticket_id]
+                excess -= 1
+
+    def _finish(
+        self, suggestions, status: SuggestionStatus, error=None, only_pending=False
+    ):
+        with self._lock:
+            for suggestion in suggestions:
+                ticket = self._tickets.get(suggestion.ticket_id)
+                if ticket is None:
+                    continue
+                if only_pending and ticket.status is not SuggestionStatus.PENDING:
+                    continue
+                ticket.status, ticket.error = status, error
+
+    def _work(self):
+        while not self._closed.is_set():
+            try:
+                batch = [self._queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._process(batch)
+            except Exception as e:
+                # The worker must outlive any error, or every ticket would
+                # stay pending forever
+                print(f"Could not process {len(batch)} suggestion(s): {e!r}")
+                self._finish(
+                    batch,
+                    SuggestionStatus.FAILED,
+                    "Erro ao tentar salvar sugestão.",
+                    only_pending=True,
+                )
+
+    def _process(self, batch: List[CourseSuggestion]):
+        prepared = []
+        for suggestion in batch:
+            try:
+                suggestion.proof = prepare_proof(suggestion.proof_bytes)
+                prepared.append(suggestion)
+            except ValueError:
+                self._finish(
+                    [suggestion],
+                    SuggestionStatus.FAILED,
+                    "O comprovante não é uma imagem PNG ou JPEG válida.",
+                )
+            except Exception as e:
+                print(f"Could not prepare the proof of a suggestion: {e!r}")
+                self._finish(
+                    [suggestion],
+                    SuggestionStatus.FAILED,
+                    "Erro ao processar o comprovante.",
+                )
+        if prepared:
+            self._write(prepared)
+
+    def _write(self, batch: List[CourseSuggestion]):
+        delay = self.retry_delay
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self._insert_batch(batch)
+                self._finish(batch, SuggestionStatus.SAVED)
+                return
+            except psycopg2.OperationalError as e:
+                print(f"Could not write {len(batch)} suggestion(s), try {attempt}: {e}")
+                if attempt == self.max_attempts or self._closed.wait(delay):
+                    break
+                delay *= 2
+            except Exception as e:
+                # Rejected by the database, or not even sent to it
+                print(f"Could not write {len(batch)} suggestion(s): {e!r}")
+                if len(batch) > 1:
+                    for suggestion in batch:
+                        self._write([suggestion])
+                    return
+                self._finish(
+                    batch, SuggestionStatus.FAILED, "Erro ao tentar salvar sugestão."
+                )
+                return
+        self._finish(
+            batch,
+            SuggestionStatus.FAILED,
+            "Não foi possível conectar ao banco de dados. Tente novamente mais tarde.",
+        )
@@ -0,0 +1,307 @@
+import io
+import itertools
+import os
+from pathlib import Path
+from typing import (
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import pdfplumber
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LTChar, LTContainer, LTPage
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+
+# Same defaults as pdfplumber's extract_text
+DEFAULT_X_TOLERANCE = 3
+DEFAULT_Y_TOLERANCE = 3
+
+# Ligatures expanded by pdfplumber when extracting text
+LIGATURES = {
+    "ﬀ": "ff",
+    "ﬃ": "ffi",
+    "ﬄ": "ffl",
+    "ﬁ": "fi",
+    "ﬂ": "fl",
+    "ﬆ": "st",
+    "ﬅ": "st",
+}
+
+
+class TextPage(Protocol):
+    """A page whose text can be extracted, as needed by the transcript parser."""
+
+    def extract_text(self, **kwargs) -> str: ...
+
+    def close(self) -> None: ...
+
+
+class TextDocument(Protocol):
+    """An open PDF, used as a context manager, exposing its pages in order."""
+
+    pages: Sequence[TextPage]
+
+    def __enter__(self) -> "TextDocument": ...
+
+    def __exit__(self, *args) -> None: ...
+
+
+# A PDF given by its path, its content or a binary file object (such as a
+# Streamlit UploadedFile)
+PdfSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+def read_pdf_bytes(path_or_fp: PdfSource) -> bytes:
+    """Returns the whole content of the PDF, wherever it comes from."""
+    if isinstance(path_or_fp, (str, Path)):
+        return Path(path_or_fp).read_bytes()
+    if isinstance(path_or_fp, (bytes, bytearray, memoryview)):
+        return bytes(path_or_fp)
+    path_or_fp.seek(0)
+    return path_or_fp.read()
+
+
+# Char tuples: (text, x0, x1, top, bottom, upright)
+_Char = Tuple[str, float, float, float, float, bool]
+_TEXT, _X0, _X1, _TOP, _BOTTOM, _UPRIGHT = range(6)
+
+
+class _CharAggregator(PDFPageAggregator):
+    """Page aggregator that skips the drawing and image operators, which the
+    transcript parser never looks at."""
+
+    def paint_path(self, *args, **kwargs) -> None:
+        pass
+
+    def render_image(self, *args, **kwargs) -> None:
+        pass
+
+
+def _iter_layout_chars(objs: Iterable, page_height: float) -> Iterable[_Char]:
+    for obj in objs:
+        if isinstance(obj, LTChar):
+            yield (
+                obj.get_text(),
+                obj.x0,
+                obj.x1,
+                page_height - obj.y1,
+                page_height - obj.y0,
+                obj.upright,
+            )
+        elif isinstance(obj, LTContainer):
+            yield from _iter_layout_chars(obj, page_height)
+
+
+def _cluster(
+    items: List, key: Callable, tolerance: float, preserve_order: bool = False
+) -> List[List]:
+    """Groups the items whose keys chain together within the tolerance, in the
+    same way as pdfplumber's cluster_objects."""
+    values = sorted(set(map(key, items)))
+    cluster_of = {}
+    cluster_id = 0
+    for i, value in enumerate(values):
+        if i > 0 and value > values[i - 1] + tolerance:
+            cluster_id += 1
+        cluster_of[value] = cluster_id
+
+    tagged = [(item, cluster_of[key(item)]) for item in items]
+    if not preserve_order:
+        tagged.sort(key=lambda pair: pair[1])
+    return [
+        [item for item, _ in group]
+        for _, group in itertools.groupby(tagged, key=lambda pair: pair[1])
+    ]
+
+
+def _iter_words(
+    line_chars: List[_Char], upright: bool, x_tolerance: float, y_tolerance: float
+) -> Iterable[List[_Char]]:
+    # Upright words run left to right along a line; rotated ones top to bottom
+    if upright:
+        start, end, cross = _X0, _X1, _TOP
+        along_tolerance, cross_tolerance = x_tolerance, y_tolerance
+    else:
+        start, end, cross = _TOP, _BOTTOM, _X0
+        along_tolerance, cross_tolerance = y_tolerance, x_tolerance
+
+    word: List[_Char] = []
+    for char in line_chars:
+        text = char[_TEXT]
+        if text.isspace():
+            if word:
+                yield word
+            word = []
+        elif text == "":
+            # pdfplumber splits "at punctuation" with an empty punctuation set,
+            # which only catches empty chars: they become words of their own
+            if word:
+                yield word
+            yield [char]
+            word = []
+        elif word and (
+            char[start] < word[-1][start]
+            or char[start] > word[-1][end] + along_tolerance
+            or abs(char[cross] - word[-1][cross]) > cross_tolerance
+        ):
+            yield word
+            word = [char]
+        else:
+            word.append(char)
+    if word:
+        yield word
+
+
+def chars_to_text(
+    chars: List[_Char],
+    x_tolerance: float = DEFAULT_X_TOLERANCE,
+    y_tolerance: float = DEFAULT_Y_TOLERANCE,
+) -> str:
+    """
+    Lays out the chars of a page as text, reproducing pdfplumber's
+    extract_text with its default (non-layout) settings.
+    """
+    # (top, text) of each word, in reading order
+    words: List[Tuple[float, str]] = []
+    for upright, group in itertools.groupby(chars, key=lambda c: c[_UPRIGHT]):
+        group = list(group)
+        if upright:
+            lines = _cluster(group, lambda c: c[_TOP], y_tolerance)
+            sort_key = lambda c: c[_X0]
+        else:
+            lines = _cluster(group, lambda c: c[_X0], x_tolerance)
+            sort_key = lambda c: (c[_TOP], c[_BOTTOM])
+
+        for line in lines:
+            line.sort(key=sort_key)
+            for word in _iter_words(line, upright, x_tolerance, y_tolerance):
+                words.append(
+                    (
+                        min(c[_TOP] for c in word),
+                        "".join(LIGATURES.get(c[_TEXT], c[_TEXT]) for c in word),
+                    )
+                )
+
+    lines = _cluster(words, lambda w: w[0], y_tolerance, preserve_order=True)
+    return "\n".join(" ".join(text for _, text in line) for line in lines)
+
+
+class PdfminerPage:
+    """A page laid out directly with pdfminer, keeping only its characters."""
+
+    def __init__(self, document: "PdfminerDocument", page: PDFPage, page_number: int):
+        self._document = document
+        self._page = page
+        self.page_number = page_number
+        self._chars: Optional[List[_Char]] = None
+
+    @property
+    def chars(self) -> List[_Char]:
+        if self._chars is None:
+            device = _CharAggregator(self._document.rsrcmgr, pageno=self.page_number)
+            PDFPageInterpreter(self._document.rsrcmgr, device).process_page(self._page)
+            layout: LTPage = device.get_result()
+            self._chars = list(_iter_layout_chars(layout, layout.height))
+        return self._chars
+
+    def extract_text(
+        self,
+        x_tolerance: float = DEFAULT_X_TOLERANCE,
+        y_tolerance: float = DEFAULT_Y_TOLERANCE,
+    ) -> str:
+        return chars_to_text(self.chars, x_tolerance, y_tolerance)
+
+    def close(self):
+        self._chars = None
+
+
+class PdfminerDocument:
+    """
+    Opens a PDF with pdfminer only, without pdfplumber's object model.
+
+    Mirrors the subset of pdfplumber.open used by the transcript parser: the
+    'pages' argument takes 1-based page numbers, and the document must be used
+    as a context manager or closed explicitly.
+    """
+
+    def __init__(self, path_or_fp, pages: Optional[Iterable[int]] = None):
+        if isinstance(path_or_fp, (str, Path)):
+            self._stream = open(path_or_fp, "rb")
+            self._owns_stream = True
+        else:
+            self._stream = path_or_fp
+            self._owns_stream = False
+
+        self.rsrcmgr = PDFResourceManager(caching=True)
+        document = PDFDocument(PDFParser(self._stream))
+        wanted = None if pages is None else set(pages)
+        self.pages = [
+            PdfminerPage(self, page, page_number)
+            for page_number, page in enumerate(PDFPage.create_pages(document), 1)
+            if wanted is None or page_number in wanted
+        ]
+
+    def close(self):
+        self.pages = []
+        if self._owns_stream:
+            self._stream.close()
+
+    def __enter__(self) -> "PdfminerDocument":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+TEXT_BACKENDS: Dict[str, Callable[..., TextDocument]] = {
+    "pdfplumber": pdfplumber.open,
+    "pdfminer": PdfminerDocument,
+}
+
+# Backend used when none is given. Only switch a deployment to another backend
+# after benchmarks/backend_harness.py shows full agreement on its transcripts.
+DEFAULT_TEXT_BACKEND = os.getenv("IRA_PDF_BACKEND", "pdfplumber")
+
+
+def open_pdf(
+    path_or_fp: PdfSource,
+    backend: Optional[str] = None,
+    pages: Optional[Iterable[int]] = None,
+) -> TextDocument:
+    """
+    Opens a PDF with the given text extraction backend.
+
+    Args:
+        path_or_fp: The path to the PDF file, its content, or a binary file
+            object. File objects are read from their start and left open.
+        backend: A key of TEXT_BACKENDS. Defaults to DEFAULT_TEXT_BACKEND.
+        pages: The 1-based numbers of the pages to load. Defaults to all pages.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend = backend or DEFAULT_TEXT_BACKEND
+    try:
+        opener = TEXT_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(
+            f"Unknown text backend '{backend}'. Options: {', '.join(TEXT_BACKENDS)}"
+        )
+    if pages is not None:
+        pages = list(pages)
+    if isinstance(path_or_fp, (bytes, bytearray, memoryview)):
+        path_or_fp = io.BytesIO(path_or_fp)
+    elif not isinstance(path_or_fp, (str, Path)):
+        path_or_fp.seek(0)
+    return opener(path_or_fp, pages=pages)
@@ -0,0 +1,230 @@
+from enum import IntEnum
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+class Status(IntEnum):
+    """The status of a discipline, as printed on the transcript."""
+
+    APROVADO = 0
+    APROVADO_MEDIA = 1
+    REPROVADO = 2
+    TRANCADO = 3
+
+    @property
+    def label(self) -> str:
+        return STATUS_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label: str) -> "Status":
+        try:
+            return STATUS_BY_LABEL[label]
+        except KeyError:
+            raise ValueError(f"Unknown discipline status '{label}'")
+
+
+STATUS_LABELS = {
+    Status.APROVADO: "APROVADO",
+    Status.APROVADO_MEDIA: "APROVADO MÉDIA",
+    Status.REPROVADO: "REPROVADO",
+    Status.TRANCADO: "TRANCADO",
+}
+STATUS_BY_LABEL = {label: status for status, label in STATUS_LABELS.items()}
+
+# Statuses whose grade counts towards the IRA
+GRADED_STATUSES = (Status.APROVADO, Status.APROVADO_MEDIA, Status.REPROVADO)
+
+
+def period_code(period: str) -> int:
+    """Encodes a period like "2022.1" as the integer 20221, which sorts the same way."""
+    year, semester = map(int, period.split("."))
+    return year * 10 + semester
+
+
+def period_label(code: int) -> str:
+    """Decodes a period code back to its label, e.g. 20221 -> "2022.1"."""
+    return f"{code // 10}.{code % 10}"
+
+
+def frozen_view(array: np.ndarray) -> np.ndarray:
+    """
+    Returns a read-only view of the array. The columns of the tables are
+    shared with DataFrames and other tables, so they are exposed this way.
+    """
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class Transcript:
+    """
+    A column-oriented table of disciplines.
+
+    Each column is a read-only NumPy array (or a list, for the text columns),
+    so the calculations work on whole columns at once and never parse the
+    period strings again.
+
+    Attributes:
+        periods: The period of each discipline, encoded by period_code.
+        semesters: The semester index of each period (year * 2 + semester), so
+            that the difference between two indices is the number of semesters
+            between them.
+        statuses: The Status of each discipline.
+        grades: The grade of each discipline.
+        credit_hours: The credit hours of each discipline.
+        codes: The course code of each discipline.
+        names: The course name of each discipline.
+        symbols: The symbol printed before each course code (may be empty).
+    """
+
+    __slots__ = (
+        "periods",
+        "semesters",
+        "statuses",
+        "grades",
+        "credit_hours",
+        "codes",
+        "names",
+        "symbols",
+    )
+
+    def __init__(
+        self,
+        periods: Iterable[int],
+        statuses: Iterable[int],
+        grades: Iterable[float],
+        credit_hours: Iterable[float],
+        codes: Optional[Sequence[str]] = None,
+        names: Optional[Sequence[str]] = None,
+        symbols: Optional[Sequence[str]] = None,
+    ):
+        self.periods = frozen_view(np.asarray(periods, dtype=np.int32))
+        self.semesters = frozen_view(self.periods // 10 * 2 + self.periods % 10)
+        self.statuses = frozen_view(np.asarray(statuses, dtype=np.uint8))
+        self.grades = frozen_view(np.asarray(grades, dtype=np.float64))
+        self.credit_hours = frozen_view(np.asarray(credit_hours, dtype=np.float64))
+
+        size = len(self.periods)
+        self.codes = list(codes) if codes is not None else [""] * size
+        self.names = list(names) if names is not None else [""] * size
+        self.symbols = list(symbols) if symbols is not None else [""] * size
+
+    @classmethod
+    def from_disciplines(cls, disciplines: List[Dict]) -> "Transcript":
+        """
+        Builds the table from discipline dictionaries, as returned by the parser.
+
+        Raises:
+            ValueError: If a discipline has an unknown status or a malformed period.
+        """
+        return cls(
+            periods=[period_code(d["period"]) for d in disciplines],
+            statuses=[Status.from_label(d["status"]) for d in disciplines],
+            grades=[d["grade"] for d in disciplines],
+            credit_hours=[d["credit_hours"] for d in disciplines],
+            codes=[d.get("code", "") for d in disciplines],
+            names=[d.get("name", "") for d in disciplines],
+            symbols=[d.get("symbol", "") for d in disciplines],
+        )
+
+    @classmethod
+    def coerce(cls, disciplines: Union[List[Dict], "Transcript"]) -> "Transcript":
+        """Returns the argument itself if it is a Transcript, or builds one from it."""
+        if isinstance(disciplines, cls):
+            return disciplines
+        return cls.from_disciplines(disciplines)
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def __repr__(self) -> str:
+        return f"Transcript({len(self)} disciplines)"
+
+    @property
+    def period_labels(self) -> List[str]:
+        """The period label (e.g. "2022.1") of each discipline."""
+        codes, inverse = np.unique(self.periods, return_inverse=True)
+        labels = [period_label(int(code)) for code in codes]
+        return [labels[i] for i in inverse]
+
+    @property
+    def first_period(self) -> Optional[str]:
+        return period_label(int(self.periods.min())) if len(self) else None
+
+    @property
+    def last_period(self) -> Optional[str]:
+        return period_label(int(self.periods.max())) if len(self) else None
+
+    def graded_mask(self) -> np.ndarray:
+        """Whether each discipline's grade counts towards the IRA."""
+        return np.isin(self.statuses, GRADED_STATUSES)
+
+    def select(self, mask: np.ndarray) -> "Transcript":
+        """Returns the disciplines where the boolean mask is true."""
+        indices = np.flatnonzero(mask)
+        return Transcript(
+            self.periods[indices],
+            self.statuses[indices],
+            self.grades[indices],
+            self.credit_hours[indices],
+            codes=[self.codes[i] for i in indices],
+            names=[self.names[i] for i in indices],
+            symbols=[self.symbols[i] for i in indices],
+        )
+
+    def concat(self, other: "Transcript") -> "Transcript":
+        """Returns a new table with the disciplines of both tables."""
+        return Transcript(
+            np.concatenate([self.periods, other.periods]),
+            np.concatenate([self.statuses, other.statuses]),
+            np.concatenate([self.grades, other.grades]),
+            np.concatenate([self.credit_hours, other.credit_hours]),
+            codes=self.codes + other.codes,
+            names=self.names + other.names,
+            symbols=self.symbols + other.symbols,
+        )
+
+    def to_disciplines(self) -> List[Dict]:
+        """Returns the disciplines as dictionaries, in the parser's format."""
+        return [
+            {
+                "period": period,
+                "code": code,
+                "name": name,
+                "status": STATUS_LABELS[Status(status)],
+                "grade": float(grade),
+                "credit_hours": float(hours),
+                "symbol": symbol,
+            }
+            for period, code, name, status, grade, hours, symbol in zip(
+                self.period_labels,
+                self.codes,
+                self.names,
+                self.statuses.tolist(),
+                self.grades,
+                self.credit_hours,
+                self.symbols,
+            )
+        ]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the disciplines as a DataFrame with the same columns as
+        pd.DataFrame(self.to_disciplines()). The numeric columns share memory
+        with the arrays of this table.
+        """
+        status_labels = np.array([STATUS_LABELS[s] for s in Status], dtype=object)
+        return pd.DataFrame(
+            {
+                "period": self.period_labels,
+                "code": self.codes,
+                "name": self.names,
+                "status": status_labels[self.statuses],
+                "grade": self.grades,
+                "credit_hours": self.credit_hours,
+                "symbol": self.symbols,
+            },
+            copy=False,
+        )